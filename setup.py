@@ -11,7 +11,9 @@ ROOT_DIR = os.path.abspath(os.path.dirname(__file__))
 
 # Dependencies
 build_exe_options = {
-    "packages": ["PyQt6", "src.gui", "src.database", "src.utils"],
+    "packages": [
+        "PyQt6", "src.api", "src.gui", "src.database", "src.models", "src.utils"
+    ],
     "includes": [
         "PyQt6.QtCore",
         "PyQt6.QtGui",
@@ -21,9 +23,12 @@ build_exe_options = {
         "fpdf"
     ],
     "include_files": [
+        (os.path.join(ROOT_DIR, "src/api"), "src/api"),
         (os.path.join(ROOT_DIR, "src/gui"), "src/gui"),
         (os.path.join(ROOT_DIR, "src/database"), "src/database"),
+        (os.path.join(ROOT_DIR, "src/models"), "src/models"),
         (os.path.join(ROOT_DIR, "src/utils"), "src/utils"),
+        (os.path.join(ROOT_DIR, "src/data/vin_wmi.bin"), "src/data/vin_wmi.bin"),
         (os.path.join(ROOT_DIR, "config.yml"), "config.yml")
     ],
     "excludes": ["tkinter", "test"],
@@ -51,5 +56,5 @@ setup(
     description="Car Management System with SQLite and PyQt6",
     options={"build_exe": build_exe_options},
     executables=executables,
-    packages=['src', 'src.gui', 'src.database', 'src.utils']
+    packages=['src', 'src.api', 'src.gui', 'src.database', 'src.models', 'src.utils']
 )
@@ -0,0 +1,21 @@
+from .defaults import DEFAULT_HOST, DEFAULT_PORT
+
+__all__ = [
+    'ApiServer',
+    'DEFAULT_HOST',
+    'DEFAULT_PORT',
+    'RemoteDatabaseManager',
+    'RemoteError'
+]
+
+
+def __getattr__(name):
+    # The server and client pull in asyncio and http.client; load them
+    # only when asked for so the CLI starts quickly
+    if name == 'ApiServer':
+        from .server import ApiServer
+        return ApiServer
+    if name in ('RemoteDatabaseManager', 'RemoteError'):
+        from . import client
+        return getattr(client, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
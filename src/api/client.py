@@ -0,0 +1,465 @@
+"""DatabaseManager-compatible client for the local API server"""
+
+import http.client
+import json
+import logging
+import os
+import select
+import socket
+import sqlite3
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import quote, urlencode, urlsplit
+
+from database.connections import ThreadConnections
+from database.db_manager import iter_estimate_file
+from database.diagnostics import DEFAULT_SLOW_QUERY_MS, QueryMonitor, instrument_methods
+from models.service_scheduler import (
+    SERVICE_INTERVAL_DAYS, SERVICE_INTERVAL_MILEAGE, ServiceScheduler
+)
+
+from .protocol import dumps, loads
+
+DEFAULT_TIMEOUT = 30.0
+
+
+class RemoteError(sqlite3.DatabaseError):
+    """
+    Error response from the API server
+
+    Subclasses sqlite3.DatabaseError so callers written against
+    DatabaseManager handle it the same way.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _is_stale(conn: http.client.HTTPConnection) -> bool:
+    """True if an idle connection's socket has been closed by the peer"""
+    if conn.sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    # An idle HTTP connection has nothing to read unless it hit EOF
+    return bool(readable)
+
+
+@instrument_methods(exclude=(
+    'request', 'close', 'query_stats', 'reset_query_stats', 'cache_stats',
+    'invalidate_estimate', 'initialize_tables', 'setup_database',
+    'server_query_stats', 'write_stats', 'is_own_change',
+))
+class RemoteDatabaseManager:
+    """
+    Talks to an ApiServer with the same methods as DatabaseManager
+
+    Each thread keeps its own persistent HTTP connection, so the GUI's
+    background query threads can call it concurrently. query_stats()
+    reports round-trip times seen by this client; server_query_stats()
+    the database timings on the server.
+    """
+
+    def __init__(self, base_url: str, timeout: float = DEFAULT_TIMEOUT,
+                 slow_query_ms: Optional[float] = DEFAULT_SLOW_QUERY_MS,
+                 token: Optional[str] = None):
+        url = urlsplit(base_url if '//' in base_url else f"http://{base_url}")
+        self.base_url = base_url
+        self.host = url.hostname or '127.0.0.1'
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self._auth = {'Authorization': f"Bearer {token}"} if token else {}
+        self._connections = ThreadConnections(
+            lambda conn: conn.close()
+        )
+        self.monitor = QueryMonitor(slow_query_ms)
+        self.scheduler: Optional[ServiceScheduler] = None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = self._connections.get()
+        if conn is not None and _is_stale(conn):
+            # The server closed this kept-alive connection while it sat
+            # idle; reconnect before sending anything on it
+            conn.close()
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port,
+                                              timeout=self.timeout)
+            self._connections.set(conn)
+        return conn
+
+    def request(self, method: str, path: str, body: Any = None,
+                **query) -> Any:
+        """Send one request and return its 'result', raising RemoteError"""
+        query = {key: value for key, value in query.items()
+                 if value is not None}
+        target = self.prefix + path
+        if query:
+            target += '?' + urlencode(query)
+        payload = dumps(body) if body is not None else None
+        headers = dict(self._auth)
+        if payload:
+            headers['Content-Type'] = 'application/json'
+        # Only GETs are safe to send twice: a write that timed out or lost
+        # its connection may already have been committed by the server
+        attempts = 2 if method == 'GET' else 1
+        for attempt in range(attempts):
+            conn = self._connection()
+            try:
+                conn.request(method, target, payload, headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (TimeoutError, socket.timeout):
+                conn.close()
+                raise
+            except (ConnectionError, http.client.HTTPException, OSError):
+                conn.close()
+                if attempt == attempts - 1:
+                    raise
+        decoded = loads(data) or {}
+        if response.status >= 400:
+            raise RemoteError(
+                response.status,
+                decoded.get('error', f"HTTP {response.status}"),
+            )
+        return decoded.get('result')
+
+    def initialize_tables(self):
+        """The server owns the schema; just check it is reachable"""
+        self.request('GET', '/health')
+
+    setup_database = initialize_tables
+
+    def close(self) -> None:
+        self._connections.close_all()
+
+    # Estimates
+
+    def create_estimate(self, estimate_data, return_row: bool = False):
+        result = self.request('POST', '/estimates', estimate_data,
+                              return_row=1 if return_row else None)
+        if self.scheduler is not None:
+            # The server may have created the vehicle or moved its first
+            # visit earlier
+            estimate = self.get_estimate(result[0] if return_row else result)
+            if estimate and estimate.get('vehicle_id'):
+                self._reschedule(estimate['vehicle_id'])
+        return tuple(result) if return_row else result
+
+    def add_estimate(self, data: Dict) -> Optional[int]:
+        try:
+            return self.create_estimate(data)
+        except Exception as e:
+            logging.error(f"Error adding estimate: {e}")
+            return None
+
+    def bulk_create_estimates(
+        self,
+        estimates: Iterable[Dict],
+        batch_size: int = 5000,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        total = 0
+        batch: List[Dict] = []
+        for estimate_data in estimates:
+            batch.append(estimate_data)
+            if len(batch) >= batch_size:
+                total += self.request('POST', '/estimates/batch', batch)
+                batch = []
+                if progress:
+                    progress(total)
+        if batch:
+            total += self.request('POST', '/estimates/batch', batch)
+            if progress:
+                progress(total)
+        if self.scheduler is not None and total:
+            # Cheaper than asking which vehicles each batch touched
+            self.scheduler.load(self.get_service_due_rows(
+                self.scheduler.interval_days, self.scheduler.mileage_interval
+            ))
+        return total
+
+    def import_estimates_file(
+        self,
+        file_path: str,
+        batch_size: int = 5000,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """Read the file locally and send it to the server in batches"""
+        return self.bulk_create_estimates(
+            iter_estimate_file(file_path), batch_size, progress
+        )
+
+    def get_estimate(self, estimate_id: int) -> Optional[Dict]:
+        try:
+            return self.request('GET', f'/estimates/{int(estimate_id)}')
+        except RemoteError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def get_services_for_estimate(self, estimate_id: int) -> List[Dict]:
+        return self.request('GET', f'/estimates/{int(estimate_id)}/services')
+
+    def add_service(self, service_data: Dict) -> int:
+        return self.request('POST', '/services', service_data)
+
+    def update_estimate_status(self, estimate_id: int, status: str) -> bool:
+        try:
+            return self.request('PATCH', f'/estimates/{int(estimate_id)}',
+                                {'status': status})
+        except RemoteError as e:
+            if e.status == 404:
+                return False
+            raise
+
+    def invalidate_estimate(self, estimate_id: Optional[int]) -> None:
+        """Nothing is cached client-side"""
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {'enabled': False}
+
+    def get_all_estimates(self) -> List[tuple]:
+        return [tuple(row) for row in self.request('GET', '/estimates', all=1)]
+
+    def get_estimates_page(self, after: Optional[tuple] = None,
+                           limit: int = 200) -> List[tuple]:
+        after_date, after_id = after if after is not None else (None, None)
+        rows = self.request('GET', '/estimates', after_date=after_date,
+                            after_id=after_id, limit=limit)
+        return [tuple(row) for row in rows]
+
+    def search_estimates(self, query: str, limit: int = 50) -> List[tuple]:
+        rows = self.request('GET', '/estimates/search', q=query, limit=limit)
+        return [tuple(row) for row in rows]
+
+    def iter_estimates_with_services(
+        self,
+        estimate_ids: Optional[Iterable[int]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        chunk_size: int = 500,
+    ) -> Iterator[tuple]:
+        if estimate_ids is None:
+            # Page through the date range so neither side holds all of it
+            after_date = after_id = None
+            while True:
+                rows = self.request('GET', '/estimates/export', **{
+                    'from': date_from, 'to': date_to, 'limit': chunk_size,
+                    'after_date': after_date, 'after_id': after_id,
+                })
+                for estimate, services in rows:
+                    yield estimate, services
+                if len(rows) < chunk_size:
+                    return
+                last = rows[-1][0]
+                after_date, after_id = str(last['date']), last['id']
+        ids = [int(estimate_id) for estimate_id in estimate_ids]
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            rows = self.request('GET', '/estimates/export',
+                                ids=','.join(map(str, chunk)))
+            for estimate, services in rows:
+                yield estimate, services
+
+    def get_revenue_report(self, date_from: str,
+                           date_to: str) -> Dict[str, Any]:
+        return self.request('GET', '/reports/revenue', **{
+            'from': str(date_from), 'to': str(date_to),
+        })
+
+    def recompute_estimate_taxes(
+        self,
+        chunk_size: int = 5000,
+        progress: Optional[Callable[[int], None]] = None,
+        rates: Optional[Dict[str, int]] = None,
+    ) -> int:
+        total = self.request('POST', '/maintenance/recompute-taxes',
+                             {'chunk_size': chunk_size, 'rates': rates})
+        if progress:
+            progress(total)
+        return total
+
+    def rebuild_daily_totals(self) -> None:
+        self.request('POST', '/maintenance/daily-totals', {})
+
+    def vacuum(self) -> Dict[str, int]:
+        return self.request('POST', '/maintenance/vacuum', {})
+
+    # Customers and vehicles
+
+    def find_customer(self, phone: Optional[str] = None,
+                      email: Optional[str] = None) -> Optional[Dict]:
+        try:
+            return self.request('GET', '/customers', phone=phone, email=email)
+        except RemoteError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def get_customer_vehicles(self, customer_id: int) -> List[Dict]:
+        return self.request('GET', f'/customers/{int(customer_id)}/vehicles')
+
+    def get_estimates_for_customer(self, customer_id: int) -> List[tuple]:
+        rows = self.request('GET', f'/customers/{int(customer_id)}/estimates')
+        return [tuple(row) for row in rows]
+
+    def get_estimates_for_vehicle(self, vehicle_id: int) -> List[tuple]:
+        rows = self.request('GET', f'/vehicles/{int(vehicle_id)}/estimates')
+        return [tuple(row) for row in rows]
+
+    def get_service_due_rows(
+        self,
+        interval_days: int = SERVICE_INTERVAL_DAYS,
+        mileage_interval: int = SERVICE_INTERVAL_MILEAGE,
+        vehicle_id: Optional[int] = None,
+    ) -> List[tuple]:
+        rows = self.request('GET', '/vehicles/due',
+                            interval_days=interval_days,
+                            mileage_interval=mileage_interval,
+                            vehicle_id=vehicle_id)
+        return [tuple(row) for row in rows]
+
+    def load_service_scheduler(
+        self,
+        interval_days: int = SERVICE_INTERVAL_DAYS,
+        mileage_interval: int = SERVICE_INTERVAL_MILEAGE,
+    ) -> ServiceScheduler:
+        scheduler = ServiceScheduler(interval_days, mileage_interval)
+        scheduler.load(self.get_service_due_rows(interval_days,
+                                                 mileage_interval))
+        self.scheduler = scheduler
+        return scheduler
+
+    def _reschedule(self, vehicle_id: int) -> None:
+        if self.scheduler is None:
+            return
+        rows = self.get_service_due_rows(self.scheduler.interval_days,
+                                         self.scheduler.mileage_interval,
+                                         vehicle_id)
+        if rows:
+            self.scheduler.update_row(rows[0])
+        else:
+            self.scheduler.remove(vehicle_id)
+
+    def record_service(self, vehicle_id: int, service_date: str,
+                       mileage: Optional[int] = None) -> bool:
+        try:
+            self.request('POST', f'/vehicles/{int(vehicle_id)}/services',
+                         {'service_date': str(service_date),
+                          'mileage': mileage})
+        except RemoteError as e:
+            if e.status != 404:
+                logging.error(f"Error recording service: {e}")
+            return False
+        self._reschedule(vehicle_id)
+        return True
+
+    def update_mileage(self, vehicle_id: int, mileage: int) -> bool:
+        try:
+            self.request('PUT', f'/vehicles/{int(vehicle_id)}/mileage',
+                         {'mileage': mileage})
+        except RemoteError as e:
+            if e.status != 404:
+                logging.error(f"Error updating mileage: {e}")
+            return False
+        self._reschedule(vehicle_id)
+        return True
+
+    # Inventory
+
+    def update_inventory(self, item_data: Dict, return_row: bool = False):
+        try:
+            saved = self.request(
+                'PUT', f"/inventory/{quote(str(item_data['item_code']), safe='')}",
+                item_data,
+            )
+        except RemoteError:
+            return None if return_row else False
+        return saved if return_row else True
+
+    def get_inventory_items(self) -> List[Dict]:
+        return self.request('GET', '/inventory')
+
+    def iter_inventory_items(self, chunk_size: int = 1000,
+                             after: Optional[str] = None) -> Iterator[Dict]:
+        while True:
+            items = self.request('GET', '/inventory', after=after,
+                                 limit=chunk_size)
+            yield from items
+            if len(items) < chunk_size:
+                return
+            after = items[-1]['item_code']
+
+    # Job cards
+
+    def add_jobcard(self, jobcard_data: Dict) -> int:
+        return self.request('POST', '/jobcards', jobcard_data)
+
+    def add_job_card(self, data) -> bool:
+        try:
+            return self.request('POST', '/jobcards', data, simple=1)
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return False
+
+    def get_jobcards(self) -> List[Dict]:
+        return self.request('GET', '/jobcards')
+
+    def get_job_cards(self) -> List[Dict[str, Any]]:
+        return self.request('GET', '/jobcards', vehicles=1)
+
+    # Change log
+
+    def is_own_change(self, seq: int) -> bool:
+        """The server does not say which client wrote what"""
+        return False
+
+    def latest_change_seq(self) -> int:
+        return self.request('GET', '/changes/latest')
+
+    def changes_since(self, seq: int, limit: int = 1000) -> List[Dict]:
+        return self.request('GET', '/changes', since=seq, limit=limit)
+
+    def iter_change_deltas(self, since_seq: int = 0,
+                           chunk_size: int = 500) -> Iterator[Dict]:
+        while True:
+            changes = self.request('GET', '/changes/deltas', since=since_seq,
+                                   limit=chunk_size)
+            yield from changes
+            if len(changes) < chunk_size:
+                return
+            since_seq = changes[-1]['seq']
+
+    def export_changes(self, output, since_seq: int = 0) -> Dict[str, int]:
+        if isinstance(output, (str, os.PathLike)):
+            with open(output, 'w', encoding='utf-8') as f:
+                return self.export_changes(f, since_seq)
+        count = 0
+        last_seq = since_seq
+        for change in self.iter_change_deltas(since_seq):
+            output.write(json.dumps(change, default=str) + '\n')
+            count += 1
+            last_seq = max(last_seq, change['seq'])
+        return {'rows': count, 'last_seq': last_seq}
+
+    def prune_change_log(self, before_seq: int) -> int:
+        return self.request('DELETE', '/changes', before=before_seq)
+
+    # Diagnostics
+
+    def query_stats(self) -> List[Dict[str, Any]]:
+        return self.monitor.snapshot()
+
+    def reset_query_stats(self) -> None:
+        self.monitor.reset()
+
+    def server_query_stats(self) -> List[Dict[str, Any]]:
+        return self.request('GET', '/diagnostics')
+
+    def write_stats(self) -> Dict[str, Any]:
+        """The server's write queue counters"""
+        return self.request('GET', '/diagnostics/writes')
@@ -0,0 +1,4 @@
+"""Server address defaults, importable without loading the API stack"""
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
@@ -0,0 +1,34 @@
+"""JSON encoding shared by the API server and client"""
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from models.money import Money
+
+# Money travels as {"$money": "12.34"} so it comes back as Money, not float
+MONEY_TAG = '$money'
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Money):
+        return {MONEY_TAG: str(value)}
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _object_hook(obj: dict) -> Any:
+    if len(obj) == 1 and MONEY_TAG in obj:
+        return Money.from_decimal(obj[MONEY_TAG])
+    return obj
+
+
+def dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_default, separators=(',', ':')).encode()
+
+
+def loads(data: bytes) -> Any:
+    if not data:
+        return None
+    return json.loads(data, object_hook=_object_hook)
@@ -0,0 +1,497 @@
+"""
+Local HTTP API that owns the shop database
+
+One process opens the SQLite file and every workstation talks to it over
+HTTP instead of sharing the file, which avoids lock contention on network
+shares. Reads run concurrently on a thread pool (each thread has its own
+connection, and WAL lets them read alongside a writer); writes are queued
+and applied one at a time by a single writer task.
+"""
+
+import asyncio
+import hmac
+import ipaddress
+import logging
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from database.db_manager import DatabaseManager
+from models.service_scheduler import (
+    SERVICE_INTERVAL_DAYS, SERVICE_INTERVAL_MILEAGE
+)
+
+from .defaults import DEFAULT_HOST, DEFAULT_PORT
+from .protocol import dumps, loads
+
+DEFAULT_READ_WORKERS = 4
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+STATUS_TEXT = {
+    200: 'OK', 201: 'Created', 400: 'Bad Request', 401: 'Unauthorized',
+    404: 'Not Found',
+    405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class ApiError(Exception):
+    """Request failure reported to the client with an HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def is_loopback(host: str) -> bool:
+    """True if host only accepts connections from this machine"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class Request:
+    def __init__(self, method: str, path: str, query: Dict[str, str],
+                 body: Any, params: Tuple[str, ...] = ()):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.body = body
+        self.params = params
+
+    def int_param(self, index: int = 0) -> int:
+        return int(self.params[index])
+
+    def query_int(self, name: str, default: Optional[int] = None):
+        value = self.query.get(name)
+        if value is None or value == '':
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ApiError(400, f"{name} must be an integer")
+
+    def json_body(self) -> Dict:
+        if not isinstance(self.body, dict):
+            raise ApiError(400, "Expected a JSON object body")
+        return self.body
+
+
+def _found(value):
+    if value is None:
+        raise ApiError(404, "Not found")
+    return value
+
+
+def _page(rows: Iterator, limit: Optional[int]) -> List:
+    """At most limit items of a streaming iterator, closing it afterwards"""
+    try:
+        return list(rows if limit is None else islice(rows, limit))
+    finally:
+        rows.close()
+
+
+def _estimates_with_services(db: DatabaseManager, request: Request) -> List:
+    ids = request.query.get('ids')
+    estimate_ids = [int(part) for part in ids.split(',') if part] \
+        if ids else None
+    after = None
+    if request.query.get('after_date') is not None:
+        after = (request.query['after_date'], request.query_int('after_id'))
+    return [
+        [estimate, services]
+        for estimate, services in _page(db.iter_estimates_with_services(
+            estimate_ids, request.query.get('from'), request.query.get('to'),
+            after=after,
+        ), request.query_int('limit'))
+    ]
+
+
+def _inventory(db: DatabaseManager, request: Request) -> List:
+    limit = request.query_int('limit')
+    if limit is None:
+        return db.get_inventory_items()
+    return _page(db.iter_inventory_items(after=request.query.get('after')),
+                 limit)
+
+
+def _estimates_page(db: DatabaseManager, request: Request) -> List:
+    if request.query.get('all'):
+        return db.get_all_estimates()
+    after = None
+    if request.query.get('after_date') is not None:
+        after = (request.query['after_date'], request.query_int('after_id'))
+    return db.get_estimates_page(after, request.query_int('limit', 200))
+
+
+def _update_inventory(db: DatabaseManager, request: Request) -> Dict:
+    item = dict(request.json_body(), item_code=request.params[0])
+    saved = db.update_inventory(item, return_row=True)
+    if saved is None:
+        raise ApiError(409, f"Could not save item {item['item_code']}")
+    return saved
+
+
+def _service_due_rows(db: DatabaseManager, request: Request) -> List:
+    return db.get_service_due_rows(
+        request.query_int('interval_days', SERVICE_INTERVAL_DAYS),
+        request.query_int('mileage_interval', SERVICE_INTERVAL_MILEAGE),
+        request.query_int('vehicle_id'),
+    )
+
+
+def _record_service(db: DatabaseManager, request: Request) -> bool:
+    body = request.json_body()
+    return _found(db.record_service(request.int_param(),
+                                    body['service_date'],
+                                    body.get('mileage')) or None)
+
+
+def _recompute_taxes(db: DatabaseManager, request: Request) -> int:
+    body = request.body or {}
+    return db.recompute_estimate_taxes(body.get('chunk_size', 5000),
+                                       rates=body.get('rates'))
+
+
+# (HTTP method, path pattern, 'read' or 'write', handler(db, request));
+# write handlers run on the single writer task, reads on the reader pool
+ROUTES: List[Tuple[str, str, str, Callable[[DatabaseManager, Request], Any]]] = [
+    ('GET', r'/health', 'read', lambda db, r: {'status': 'ok'}),
+    ('GET', r'/estimates', 'read', _estimates_page),
+    ('POST', r'/estimates', 'write',
+     lambda db, r: db.create_estimate(
+         r.json_body(), return_row=bool(r.query.get('return_row')))),
+    ('POST', r'/estimates/batch', 'write',
+     lambda db, r: db.bulk_create_estimates(r.body or [])),
+    ('GET', r'/estimates/search', 'read',
+     lambda db, r: db.search_estimates(r.query.get('q', ''),
+                                       r.query_int('limit', 50))),
+    ('GET', r'/estimates/export', 'read', _estimates_with_services),
+    ('GET', r'/estimates/(\d+)', 'read',
+     lambda db, r: _found(db.get_estimate(r.int_param()))),
+    ('PATCH', r'/estimates/(\d+)', 'write',
+     lambda db, r: _found(db.update_estimate_status(
+         r.int_param(), r.json_body()['status']) or None)),
+    ('GET', r'/estimates/(\d+)/services', 'read',
+     lambda db, r: db.get_services_for_estimate(r.int_param())),
+    ('POST', r'/services', 'write',
+     lambda db, r: db.add_service(r.json_body())),
+    ('GET', r'/inventory', 'read', _inventory),
+    ('PUT', r'/inventory/([^/]+)', 'write', _update_inventory),
+    ('GET', r'/jobcards', 'read',
+     lambda db, r: db.get_job_cards() if r.query.get('vehicles')
+     else db.get_jobcards()),
+    ('POST', r'/jobcards', 'write',
+     lambda db, r: db.add_job_card(r.json_body()) if r.query.get('simple')
+     else db.add_jobcard(r.json_body())),
+    ('GET', r'/reports/revenue', 'read',
+     lambda db, r: db.get_revenue_report(r.query['from'], r.query['to'])),
+    ('GET', r'/customers', 'read',
+     lambda db, r: _found(db.find_customer(r.query.get('phone'),
+                                           r.query.get('email')))),
+    ('GET', r'/customers/(\d+)/vehicles', 'read',
+     lambda db, r: db.get_customer_vehicles(r.int_param())),
+    ('GET', r'/customers/(\d+)/estimates', 'read',
+     lambda db, r: db.get_estimates_for_customer(r.int_param())),
+    ('GET', r'/vehicles/due', 'read', _service_due_rows),
+    ('GET', r'/vehicles/(\d+)/estimates', 'read',
+     lambda db, r: db.get_estimates_for_vehicle(r.int_param())),
+    ('POST', r'/vehicles/(\d+)/services', 'write', _record_service),
+    ('PUT', r'/vehicles/(\d+)/mileage', 'write',
+     lambda db, r: _found(db.update_mileage(
+         r.int_param(), r.json_body()['mileage']) or None)),
+    ('GET', r'/changes', 'read',
+     lambda db, r: db.changes_since(r.query_int('since', 0),
+                                    r.query_int('limit', 1000))),
+    ('GET', r'/changes/latest', 'read',
+     lambda db, r: db.latest_change_seq()),
+    ('GET', r'/changes/deltas', 'read',
+     lambda db, r: _page(db.iter_change_deltas(r.query_int('since', 0)),
+                         r.query_int('limit'))),
+    ('DELETE', r'/changes', 'write',
+     lambda db, r: db.prune_change_log(r.query_int('before', 0))),
+    ('POST', r'/maintenance/recompute-taxes', 'write', _recompute_taxes),
+    ('POST', r'/maintenance/daily-totals', 'write',
+     lambda db, r: db.rebuild_daily_totals()),
+    ('POST', r'/maintenance/vacuum', 'write', lambda db, r: db.vacuum()),
+    ('GET', r'/diagnostics', 'read', lambda db, r: db.query_stats()),
+    ('GET', r'/diagnostics/writes', 'read', lambda db, r: db.write_stats()),
+    ('DELETE', r'/diagnostics', 'read',
+     lambda db, r: db.reset_query_stats()),
+]
+_COMPILED_ROUTES = [
+    (method, re.compile(pattern + r'/?'), kind, handler)
+    for method, pattern, kind, handler in ROUTES
+]
+
+
+def match_route(method: str, path: str):
+    """Return (kind, handler, params) for a request, or raise ApiError"""
+    allowed = False
+    for route_method, pattern, kind, handler in _COMPILED_ROUTES:
+        found = pattern.fullmatch(path)
+        if found is None:
+            continue
+        if route_method == method:
+            return kind, handler, tuple(unquote(g) for g in found.groups())
+        allowed = True
+    if allowed:
+        raise ApiError(405, f"{method} not allowed on {path}")
+    raise ApiError(404, f"No route for {path}")
+
+
+class ApiServer:
+    """
+    asyncio HTTP/1.1 server exposing DatabaseManager as JSON endpoints
+
+    Usage:
+        server = ApiServer(DatabaseManager(path))
+        asyncio.run(server.serve_forever())
+
+    or, from synchronous code and tests, start_in_thread() / stop().
+
+    With a token every request must send "Authorization: Bearer <token>".
+    Binding to anything but a loopback address requires one.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT,
+                 read_workers: int = DEFAULT_READ_WORKERS,
+                 token: Optional[str] = None):
+        self.db_manager = db_manager
+        self.host = host
+        self.token = token
+        self.port = port
+        self.read_workers = read_workers
+        self._readers: Optional[ThreadPoolExecutor] = None
+        self._writer_thread: Optional[ThreadPoolExecutor] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # Open connections and the tasks serving them
+        self._clients: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    async def start(self) -> int:
+        """Bind and start serving; returns the bound port"""
+        if not self.token and not is_loopback(self.host):
+            raise ValueError(
+                f"Refusing to serve on {self.host} without an API token; "
+                f"set server.token"
+            )
+        self._loop = asyncio.get_running_loop()
+        self._readers = ThreadPoolExecutor(self.read_workers,
+                                           thread_name_prefix='api-read')
+        self._writer_thread = ThreadPoolExecutor(1,
+                                                 thread_name_prefix='api-write')
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer())
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port,
+            limit=MAX_HEADER_BYTES,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info(f"API server listening on {self.host}:{self.port}")
+        return self.port
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.shutdown()
+
+    async def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed.
+            # Closing them ends their handlers at the next read (requests
+            # in flight still finish); wait so none is left pending
+            clients = list(self._clients.items())
+            for client, _ in clients:
+                client.close()
+            await asyncio.gather(*(task for _, task in clients),
+                                 return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._writer_task is not None:
+            # Let queued writes finish before the writer stops
+            await self._write_queue.join()
+            self._writer_task.cancel()
+            await asyncio.gather(self._writer_task, return_exceptions=True)
+            self._writer_task = None
+        for pool in (self._readers, self._writer_thread):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._readers = self._writer_thread = None
+
+    def start_in_thread(self) -> int:
+        """Run the server on a background event loop; returns the port"""
+        started = threading.Event()
+        errors = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.shutdown())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name='api-server',
+                                        daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self.port
+
+    def stop(self) -> None:
+        """Stop a server started with start_in_thread"""
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    async def _writer(self) -> None:
+        """Apply queued writes one at a time on the writer thread"""
+        while True:
+            handler, request, future = await self._write_queue.get()
+            try:
+                result = await self._loop.run_in_executor(
+                    self._writer_thread, handler, self.db_manager, request
+                )
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                self._write_queue.task_done()
+
+    async def dispatch(self, request: Request) -> Any:
+        kind, handler, request.params = match_route(request.method,
+                                                    request.path)
+        if kind == 'read':
+            return await self._loop.run_in_executor(
+                self._readers, handler, self.db_manager, request
+            )
+        future = self._loop.create_future()
+        await self._write_queue.put((handler, request, future))
+        return await future
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    request, keep_alive = await self._read_request(reader)
+                except ApiError as e:
+                    await self._respond(writer, e.status,
+                                        {'error': str(e)}, False)
+                    return
+                if request is None:
+                    return
+                status, payload = await self._run(request)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+    async def _run(self, request: Request) -> Tuple[int, Any]:
+        try:
+            result = await self.dispatch(request)
+        except ApiError as e:
+            return e.status, {'error': str(e)}
+        except (KeyError, ValueError, TypeError) as e:
+            return 400, {'error': f"Bad request: {e}"}
+        except sqlite3.IntegrityError as e:
+            return 409, {'error': str(e)}
+        except Exception as e:
+            logging.error(f"API {request.method} {request.path} failed: {e}")
+            return 500, {'error': str(e)}
+        return (201 if request.method == 'POST' else 200), {'result': result}
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Parse one request; returns (None, False) at end of stream"""
+        try:
+            line = await reader.readline()
+        except (asyncio.LimitOverrunError, ValueError):
+            raise ApiError(400, "Request line too long")
+        if not line:
+            return None, False
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise ApiError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except (asyncio.LimitOverrunError, ValueError):
+                raise ApiError(400, "Header too long")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if self.token and not hmac.compare_digest(
+            headers.get('authorization', '').encode(),
+            f"Bearer {self.token}".encode(),
+        ):
+            raise ApiError(401, "Missing or invalid API token")
+
+        length = headers.get('content-length') or '0'
+        if not (length.isascii() and length.isdigit()):
+            raise ApiError(400, "Invalid Content-Length")
+        length = int(length)
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+        try:
+            body = loads(body)
+        except ValueError:
+            raise ApiError(400, "Body is not valid JSON")
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' \
+            else connection == 'keep-alive'
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in
+                 parse_qs(url.query, keep_blank_values=True).items()}
+        return Request(method.upper(), url.path, query, body), keep_alive
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int,
+                       payload: Any, keep_alive: bool) -> None:
+        body = dumps(payload)
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
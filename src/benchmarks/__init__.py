@@ -0,0 +1,11 @@
+from .dataset import generate_dataset, iter_estimates
+from .suite import compare_results, load_results, run_suite, write_results
+
+__all__ = [
+    'compare_results',
+    'generate_dataset',
+    'iter_estimates',
+    'load_results',
+    'run_suite',
+    'write_results'
+]
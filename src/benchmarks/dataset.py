@@ -0,0 +1,180 @@
+"""Reproducible synthetic databases for benchmarking"""
+
+import random
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, Optional
+
+from database.db_manager import DatabaseManager
+from models.money import Money
+from models.tax import compute_taxes
+
+MAKES = {
+    'Toyota': ['Corolla', 'Camry', 'RAV4', 'Hilux', 'Yaris'],
+    'Honda': ['Civic', 'Accord', 'CR-V', 'Fit'],
+    'Nissan': ['Sentra', 'Altima', 'X-Trail', 'Navara'],
+    'Hyundai': ['Elantra', 'Tucson', 'Santa Fe', 'Accent'],
+    'Kia': ['Rio', 'Sportage', 'Sorento', 'Picanto'],
+    'Mercedes-Benz': ['C-Class', 'E-Class', 'GLE'],
+    'Ford': ['Focus', 'Ranger', 'Explorer'],
+}
+FIRST_NAMES = [
+    'Kwame', 'Ama', 'Kofi', 'Akosua', 'Yaw', 'Abena', 'Kojo', 'Efua',
+    'Kwesi', 'Adwoa', 'Fiifi', 'Esi', 'Nana', 'Afua', 'Kobby', 'Yaa',
+]
+LAST_NAMES = [
+    'Mensah', 'Owusu', 'Boateng', 'Asante', 'Osei', 'Agyeman', 'Darko',
+    'Addo', 'Appiah', 'Ofori', 'Amoah', 'Acheampong', 'Quaye', 'Tetteh',
+]
+SERVICES = [
+    'Oil change', 'Brake pads', 'Wheel alignment', 'Battery replacement',
+    'Air filter', 'Spark plugs', 'Suspension check', 'AC service',
+    'Timing belt', 'Diagnostics', 'Tyre rotation', 'Coolant flush',
+]
+STATUSES = ['Pending', 'Approved', 'Completed', 'Cancelled']
+TECHNICIANS = ['Ebo', 'Kwabena', 'Selorm', 'Mawuli', 'Ato', 'Delali']
+START_DATE = date(2020, 1, 1)
+DAYS = 5 * 365
+_SERVICE_INSERT = '''
+    INSERT INTO services (estimate_id, description, parts_cost, labor_cost,
+                          total_cost)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+
+def _customer(rng: random.Random, customer_number: int) -> Dict:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    return {
+        'customer_name': name,
+        'customer_phone': f"02{customer_number:08d}",
+        'customer_email': (
+            f"{name.split()[0].lower()}.{customer_number}@example.com"
+        ),
+    }
+
+
+def iter_estimates(count: int, seed: int = 42) -> Iterator[Dict]:
+    """
+    Estimate dicts in create_estimate format, identical for a given seed
+
+    About one customer per three estimates, so the customers and vehicles
+    tables get realistic repeat visits.
+    """
+    rng = random.Random(seed)
+    customers = max(count // 3, 1)
+    for _ in range(count):
+        customer_number = rng.randrange(customers)
+        make = rng.choice(list(MAKES))
+        subtotal = Money(rng.randrange(5000, 2500000))
+        taxes = compute_taxes(subtotal)
+        yield {
+            **_customer(random.Random(customer_number), customer_number),
+            'vehicle_make': make,
+            'vehicle_model': rng.choice(MAKES[make]),
+            'vehicle_year': rng.randint(2000, 2024),
+            'vehicle_vin': '',
+            'subtotal': subtotal,
+            'nhil': taxes['nhil'],
+            'getfund': taxes['getfund'],
+            'covid_levy': taxes['covid_levy'],
+            'vat': taxes['vat'],
+            'total_amount': taxes['total_amount'],
+            'date': (START_DATE + timedelta(rng.randrange(DAYS))).isoformat(),
+            'status': rng.choice(STATUSES),
+        }
+
+
+def generate_dataset(
+    db_path: str,
+    estimates: int,
+    seed: int = 42,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Dict:
+    """
+    Build a database with estimates plus matching services, inventory
+    and job cards
+
+    Estimates go through DatabaseManager.bulk_create_estimates, so the
+    insert timing doubles as the bulk-insert benchmark. Services, stock
+    and job cards are written with plain executemany since only their
+    presence matters.
+
+    Returns:
+        Dict: Row counts and seconds spent on each table
+    """
+    rng = random.Random(seed + 1)
+    db = DatabaseManager(db_path, slow_query_ms=None)
+    timings = {}
+    try:
+        start = time.perf_counter()
+        inserted = db.bulk_create_estimates(
+            iter_estimates(estimates, seed), batch_size=10000,
+            progress=progress,
+        )
+        timings['estimates_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        services = 0
+        with db.get_connection() as cursor:
+            batch = []
+            for estimate_id in range(1, inserted + 1):
+                for _ in range(rng.randint(0, 4)):
+                    parts = rng.randrange(0, 500000)
+                    labor = rng.randrange(2000, 200000)
+                    batch.append((estimate_id, rng.choice(SERVICES), parts,
+                                  labor, parts + labor))
+                if len(batch) >= 10000:
+                    cursor.executemany(_SERVICE_INSERT, batch)
+                    services += len(batch)
+                    batch = []
+            cursor.executemany(_SERVICE_INSERT, batch)
+            services += len(batch)
+        timings['services_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        inventory = max(estimates // 10, 10)
+        with db.get_connection() as cursor:
+            cursor.executemany('''
+                INSERT INTO inventory (item_code, description, quantity,
+                                       unit_price)
+                VALUES (?, ?, ?, ?)
+            ''', [
+                (f"SKU{number:07d}",
+                 f"{rng.choice(SERVICES)} part {number}",
+                 rng.randrange(0, 500), rng.randrange(500, 500000))
+                for number in range(inventory)
+            ])
+        timings['inventory_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        job_cards = estimates // 5
+        with db.get_connection() as cursor:
+            rows = []
+            for _ in range(job_cards):
+                started = START_DATE + timedelta(rng.randrange(DAYS))
+                rows.append((
+                    rng.randint(1, inserted), rng.choice(SERVICES),
+                    rng.choice(TECHNICIANS), started.isoformat(),
+                    (started + timedelta(rng.randint(0, 5))).isoformat(),
+                    rng.choice(['Open', 'In Progress', 'Completed']),
+                ))
+            cursor.executemany('''
+                INSERT INTO job_cards (estimate_id, description, technician,
+                                       start_date, completion_date, status)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+        timings['job_cards_seconds'] = time.perf_counter() - start
+
+        db.conn.execute("ANALYZE")
+    finally:
+        db.close()
+
+    return {
+        'estimates': inserted,
+        'services': services,
+        'inventory': inventory,
+        'job_cards': job_cards,
+        'seed': seed,
+        **timings,
+    }
+
@@ -0,0 +1,374 @@
+"""Timed benchmarks over synthetic databases, with JSON results"""
+
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from database.db_manager import DatabaseManager
+
+from .dataset import generate_dataset, iter_estimates
+
+DEFAULT_SIZES = (10000, 100000)
+DEFAULT_REPEAT = 10
+# Each sample times enough back-to-back calls to last at least this long,
+# so millisecond operations are not lost in timer and scheduler noise
+MIN_SAMPLE_SECONDS = 0.05
+# Slowdown of the fastest sample above which compare_results flags a
+# regression; the minimum varies far less between runs than the median
+DEFAULT_THRESHOLD = 1.5
+SERVICE_LOOKUPS = 200
+PDF_ESTIMATES = 20
+
+
+def measure_group(benchmarks: Dict[str, Callable[[], object]],
+                  repeat: int = DEFAULT_REPEAT,
+                  min_sample: float = MIN_SAMPLE_SECONDS) -> Dict[str, Dict]:
+    """
+    Time each function repeat times and summarise the seconds per call
+
+    Untimed calibration runs warm caches and size the samples: like
+    timeit's autorange, the call count doubles until a batch takes at
+    least min_sample seconds. Samples are taken round-robin across the
+    group, so a burst of load on the machine slows one sample of each
+    benchmark rather than every sample of one.
+    """
+    numbers = {}
+    for name, func in benchmarks.items():
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start >= min_sample:
+                break
+            number *= 2
+        numbers[name] = number
+    samples: Dict[str, List[float]] = {name: [] for name in benchmarks}
+    for _ in range(repeat):
+        for name, func in benchmarks.items():
+            number = numbers[name]
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples[name].append((time.perf_counter() - start) / number)
+    return {
+        name: {
+            'repeat': repeat,
+            'number': numbers[name],
+            'min': min(times),
+            'median': statistics.median(times),
+            'mean': statistics.fmean(times),
+            'max': max(times),
+        }
+        for name, times in samples.items()
+    }
+
+
+def measure(func: Callable[[], object], repeat: int = DEFAULT_REPEAT,
+            min_sample: float = MIN_SAMPLE_SECONDS) -> Dict:
+    """measure_group for a single function"""
+    return measure_group({'': func}, repeat, min_sample)['']
+
+
+def bench_database(db_path: str, repeat: int = DEFAULT_REPEAT,
+                   seed: int = 42) -> Dict[str, Dict]:
+    """Time the core DatabaseManager reads and single-row writes"""
+    rng = random.Random(seed + 2)
+    db = DatabaseManager(db_path, cache_size=0, slow_query_ms=None)
+    try:
+        estimate_count = db.conn.execute(
+            "SELECT MAX(id) FROM estimates"
+        ).fetchone()[0] or 0
+        # Lazy, so it never runs out however many calls a sample makes
+        new_estimates = iter_estimates(10 ** 9, seed + 3)
+        lookup_ids = [rng.randint(1, estimate_count)
+                      for _ in range(SERVICE_LOOKUPS)] if estimate_count else []
+
+        def services_for_estimates():
+            for estimate_id in lookup_ids:
+                db.get_services_for_estimate(estimate_id)
+
+        results = measure_group({
+            'create_estimate': lambda: db.create_estimate(next(new_estimates)),
+            'get_all_estimates': db.get_all_estimates,
+            'get_estimates_page': db.get_estimates_page,
+            'get_inventory_items': db.get_inventory_items,
+            'get_services_for_estimate': services_for_estimates,
+        }, repeat)
+        results['get_services_for_estimate']['calls'] = len(lookup_ids)
+        return results
+    finally:
+        db.close()
+
+
+def bench_gui(db_path: str, repeat: int = DEFAULT_REPEAT) -> Dict[str, Dict]:
+    """
+    Time MainWindow start-up and table population offscreen
+
+    PyQt6 is imported here so the database benchmarks run without it.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+
+    from gui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    db = DatabaseManager(db_path, slow_query_ms=None)
+    windows = []
+    try:
+        def open_window():
+            window = MainWindow(db)
+            window.show()
+            app.processEvents()
+            # The first page loads in the background; wait until it shows
+            window.query_executor.wait_for_done()
+            app.processEvents()
+            windows.append(window)
+
+        # One window per sample: each call leaves a window open
+        results = {'main_window_first_page': measure(open_window, repeat, 0)}
+        window = windows[-1]
+        for title in ("Inventory", "JobCards"):
+            window.show_tab(title)
+        app.processEvents()
+
+        inventory = db.get_inventory_items()
+        jobcards = db.get_jobcards()
+        results['populate_inventory_table'] = measure(
+            lambda: window.populate_inventory_table(inventory), repeat
+        )
+        results['populate_inventory_table']['rows'] = len(inventory)
+        results['populate_jobcards_table'] = measure(
+            lambda: window.populate_jobcards_table(jobcards), repeat
+        )
+        results['populate_jobcards_table']['rows'] = len(jobcards)
+        return results
+    finally:
+        for window in windows:
+            window.close()
+            window.deleteLater()
+        app.processEvents()
+        db.close()
+
+
+def bench_pdf(db_path: str, output_dir: str,
+              repeat: int = DEFAULT_REPEAT) -> Dict[str, Dict]:
+    """Time estimate and inventory report rendering with PDFGenerator"""
+    from utils.pdf_generator import PDFGenerator, _render_estimate_file
+
+    # Each estimate gets a fresh document, as generate_estimates_batch does;
+    # a shared generator would keep appending to one growing PDF
+    os.makedirs(output_dir, exist_ok=True)
+    generator = PDFGenerator(output_dir)
+    db = DatabaseManager(db_path, slow_query_ms=None)
+    try:
+        estimates = list(db.iter_estimates_with_services(
+            range(1, PDF_ESTIMATES + 1)
+        ))
+        inventory = db.get_inventory_items()
+
+        def render_estimates():
+            for estimate_data, services in estimates:
+                entry = _render_estimate_file(estimate_data, services,
+                                              output_dir)
+                if entry['error']:
+                    raise RuntimeError(entry['error'])
+
+        results = {
+            'generate_estimate': measure(render_estimates, repeat),
+            'generate_inventory_report_stream': measure(
+                lambda: generator.generate_inventory_report_stream(inventory),
+                repeat,
+            ),
+        }
+        results['generate_estimate']['documents'] = len(estimates)
+        results['generate_inventory_report_stream']['rows'] = len(inventory)
+        return results
+    finally:
+        db.close()
+
+
+def run_suite(sizes=DEFAULT_SIZES, workdir: str = '.', seed: int = 42,
+              repeat: int = DEFAULT_REPEAT, gui: bool = True,
+              pdf: bool = True, keep: bool = False,
+              log: Callable[[str], None] = print) -> Dict:
+    """
+    Generate a database per size and run every benchmark against it
+
+    Returns:
+        Dict: 'meta' describing the run and 'results' keyed by size
+    """
+    os.makedirs(workdir, exist_ok=True)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': {},
+    }
+    for size in sizes:
+        db_path = os.path.join(workdir, f"bench_{size}_{seed}.db")
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+        log(f"[{size}] generating dataset")
+        result = {'dataset': generate_dataset(db_path, size, seed)}
+        result['dataset']['estimates_per_second'] = (
+            size / result['dataset']['estimates_seconds']
+            if result['dataset']['estimates_seconds'] else 0.0
+        )
+        log(f"[{size}] database")
+        result['database'] = bench_database(db_path, repeat, seed)
+        if gui:
+            log(f"[{size}] gui")
+            result['gui'] = bench_gui(db_path, repeat)
+        if pdf:
+            log(f"[{size}] pdf")
+            result['pdf'] = bench_pdf(
+                db_path, os.path.join(workdir, 'reports'), repeat
+            )
+        report['results'][str(size)] = result
+
+        if not keep:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+    return report
+
+
+def write_results(report: Dict, path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict:
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def compare_results(baseline: Dict, current: Dict,
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Fastest-sample ratios (current / baseline) for benchmarks in both runs
+
+    Returns:
+        List[Dict]: One entry per benchmark with size, group, name,
+            baseline, current, ratio and regression (ratio > threshold)
+    """
+    comparison = []
+    for size, result in current.get('results', {}).items():
+        previous = baseline.get('results', {}).get(size)
+        if previous is None:
+            continue
+        for group in ('database', 'gui', 'pdf'):
+            for name, timing in result.get(group, {}).items():
+                old = previous.get(group, {}).get(name)
+                if old is None or not old.get('min'):
+                    continue
+                ratio = timing['min'] / old['min']
+                comparison.append({
+                    'size': size,
+                    'group': group,
+                    'name': name,
+                    'baseline': old['min'],
+                    'current': timing['min'],
+                    'ratio': ratio,
+                    'regression': ratio > threshold,
+                })
+    return comparison
+
+
+def format_results(report: Dict) -> str:
+    lines = []
+    for size, result in report['results'].items():
+        dataset = result['dataset']
+        lines.append(
+            f"{size} estimates: {dataset['services']} services, "
+            f"{dataset['inventory']} items, {dataset['job_cards']} job cards, "
+            f"{dataset['estimates_per_second']:.0f} estimates/s inserted"
+        )
+        for group in ('database', 'gui', 'pdf'):
+            for name, timing in result.get(group, {}).items():
+                lines.append(
+                    f"  {group + '.' + name:<45} "
+                    f"median {timing['median'] * 1000:10.2f} ms  "
+                    f"min {timing['min'] * 1000:10.2f} ms"
+                )
+    return "\n".join(lines)
+
+
+def format_comparison(comparison: List[Dict]) -> str:
+    lines = []
+    for entry in comparison:
+        flag = '  REGRESSION' if entry['regression'] else ''
+        lines.append(
+            f"{entry['size']:>8} {entry['group'] + '.' + entry['name']:<45} "
+            f"{entry['baseline'] * 1000:10.2f} -> "
+            f"{entry['current'] * 1000:10.2f} ms  x{entry['ratio']:.2f}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(
+        prog='benchmarks',
+        description="Benchmark the database, GUI tables and PDF rendering "
+                    "against synthetic data",
+    )
+    parser.add_argument(
+        '--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated estimate counts, e.g. 10000,100000,1000000",
+    )
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="JSON results of an earlier run to compare with")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown of the fastest sample counted as a "
+                             "regression")
+    parser.add_argument('--workdir',
+                        help="Where to build databases (default: temp dir)")
+    parser.add_argument('--keep', action='store_true',
+                        help="Keep the generated databases")
+    parser.add_argument('--skip-gui', action='store_true')
+    parser.add_argument('--skip-pdf', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    with tempfile.TemporaryDirectory(prefix='car-bench-') as tmp:
+        report = run_suite(
+            sizes, args.workdir or tmp, args.seed, args.repeat,
+            gui=not args.skip_gui, pdf=not args.skip_pdf,
+            keep=args.keep and args.workdir is not None,
+        )
+    print(format_results(report))
+    if args.output:
+        write_results(report, args.output)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        comparison = compare_results(
+            load_results(args.compare), report, args.threshold
+        )
+        print(format_comparison(comparison))
+        if any(entry['regression'] for entry in comparison):
+            return 1
+    return 0
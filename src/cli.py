@@ -0,0 +1,326 @@
+"""
+Headless command line for batch jobs: import, export, change deltas,
+reports, vacuum, and the API server other workstations connect to
+
+Shares the configuration and DatabaseManager with the GUI but never
+imports PyQt6, so it starts quickly and runs from cron without a display.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from typing import Dict, List, Optional
+
+from api.defaults import DEFAULT_HOST, DEFAULT_PORT
+from main import CONFIG_FILE, initialize_database
+from utils.config import load_config
+
+# Estimate columns in the order import_estimates_file reads them back
+ESTIMATE_FIELDS = [
+    'id', 'customer_name', 'customer_phone', 'customer_email',
+    'vehicle_make', 'vehicle_model', 'vehicle_year', 'vehicle_vin',
+    'subtotal', 'nhil', 'getfund', 'covid_levy', 'vat', 'total_amount',
+    'date', 'status',
+]
+INVENTORY_FIELDS = [
+    'item_id', 'item_code', 'description', 'quantity', 'unit_price',
+    'last_updated',
+]
+
+
+def _plain(record: Dict, fields: Optional[List[str]] = None) -> Dict:
+    """Record with Money turned into decimal strings for CSV/JSON"""
+    keys = fields if fields is not None else list(record)
+    return {
+        key: str(record[key]) if hasattr(record.get(key), 'minor')
+        else record.get(key)
+        for key in keys
+    }
+
+
+def open_database(args, local: bool = False):
+    """
+    Open the configured database; local=True ignores database.server_url
+    for commands that must run on the machine holding the file
+    """
+    config = load_config(args.config)
+    database = dict(config.get('database', {}))
+    if args.db:
+        database.update(path=os.path.dirname(args.db) or '.',
+                        name=os.path.basename(args.db))
+    if args.db or local:
+        database.pop('server_url', None)
+    config = dict(config, database=database)
+    return config, initialize_database(config)
+
+
+def _progress(count: int) -> None:
+    print(f"\r{count} rows", end='', file=sys.stderr, flush=True)
+
+
+def cmd_import(args) -> int:
+    _, db = open_database(args)
+    try:
+        total = db.import_estimates_file(
+            args.file, args.batch_size,
+            progress=_progress if args.progress else None,
+        )
+    finally:
+        db.close()
+    if args.progress:
+        print(file=sys.stderr)
+    print(f"Imported {total} estimates from {args.file}")
+    return 0
+
+
+def cmd_export(args) -> int:
+    _, db = open_database(args)
+    output = (open(args.output, 'w', newline='', encoding='utf-8')
+              if args.output else sys.stdout)
+    count = 0
+    records = (record for record in ())
+    try:
+        if args.table == 'estimates':
+            fields = ESTIMATE_FIELDS
+            records = (
+                dict(_plain(estimate, fields),
+                     services=[_plain(service) for service in services])
+                for estimate, services in db.iter_estimates_with_services(
+                    None, args.date_from, args.date_to
+                )
+            )
+        else:
+            fields = INVENTORY_FIELDS
+            records = (_plain(item, fields)
+                       for item in db.iter_inventory_items())
+
+        if args.format == 'csv':
+            writer = csv.DictWriter(output, fieldnames=fields,
+                                    extrasaction='ignore')
+            writer.writeheader()
+            for record in records:
+                writer.writerow(record)
+                count += 1
+        else:
+            for record in records:
+                output.write(json.dumps(record, default=str) + "\n")
+                count += 1
+    finally:
+        # Finish the database cursor before its connection goes away
+        records.close()
+        if output is not sys.stdout:
+            output.close()
+        db.close()
+    if args.output:
+        print(f"Exported {count} {args.table} rows to {args.output}")
+    return 0
+
+
+def cmd_changes(args) -> int:
+    _, db = open_database(args)
+    try:
+        if args.latest:
+            print(db.latest_change_seq())
+            return 0
+        output = args.output or sys.stdout
+        result = db.export_changes(output, args.since)
+        if args.prune is not None:
+            db.prune_change_log(args.prune)
+    finally:
+        db.close()
+    print(f"Exported {result['rows']} changed rows; resume with "
+          f"--since {result['last_seq']}",
+          file=sys.stderr if output is sys.stdout else sys.stdout)
+    return 0
+
+
+def cmd_report(args) -> int:
+    config, db = open_database(args)
+    output_dir = args.output_dir or config.get('reports', {}).get(
+        'output_dir', 'reports'
+    )
+    try:
+        if args.kind == 'revenue':
+            report = db.get_revenue_report(args.date_from or '0000-00-00',
+                                           args.date_to or '9999-12-31')
+            totals = report['totals']
+            print(json.dumps(
+                {'totals': _plain(totals),
+                 'daily': [_plain(day) for day in report['daily']]}
+                if args.json else _plain(totals),
+                indent=2,
+            ))
+            return 0
+
+        from utils.pdf_generator import PDFGenerator
+
+        generator = PDFGenerator(output_dir)
+        if args.kind == 'inventory':
+            path = generator.generate_inventory_report_stream(
+                db.iter_inventory_items()
+            )
+            print(f"Inventory report written to {path}")
+            return 0
+
+        manifest = generator.generate_estimates_batch(
+            db, args.ids or None, args.date_from, args.date_to, args.workers
+        )
+    finally:
+        db.close()
+    failed = [entry for entry in manifest if entry['error']]
+    for entry in failed:
+        print(f"Estimate {entry['estimate_id']} failed: {entry['error']}",
+              file=sys.stderr)
+    print(f"Rendered {len(manifest) - len(failed)} estimates to {output_dir}")
+    return 1 if failed else 0
+
+
+def cmd_vacuum(args) -> int:
+    _, db = open_database(args, local=True)
+    try:
+        sizes = db.vacuum()
+    finally:
+        db.close()
+    print(f"Vacuumed: {sizes['before']} -> {sizes['after']} bytes")
+    return 0
+
+
+def cmd_serve(args) -> int:
+    import asyncio
+
+    from api.server import ApiServer
+
+    config, db = open_database(args, local=True)
+    server_config = config.get('server', {})
+    server = ApiServer(
+        db,
+        args.host or server_config.get('host', DEFAULT_HOST),
+        args.port or server_config.get('port', DEFAULT_PORT),
+        token=args.token or server_config.get('token'),
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
+    return 0
+
+
+def cmd_bench(args) -> int:
+    from benchmarks.suite import main as bench_main
+
+    # Benchmark options are passed through untouched; see main()
+    return bench_main(['--skip-gui', *args.bench_args])
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='car-manager-cli',
+        description="Batch jobs for the Car Management System database",
+    )
+    parser.add_argument('--config', default=CONFIG_FILE)
+    parser.add_argument('--db', help="Database file, overriding the config")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_import = commands.add_parser(
+        'import', help="Bulk import estimates from CSV or JSONL"
+    )
+    parser_import.add_argument('file')
+    parser_import.add_argument('--batch-size', type=int, default=5000)
+    parser_import.add_argument('--progress', action='store_true')
+    parser_import.set_defaults(handler=cmd_import)
+
+    parser_export = commands.add_parser(
+        'export', help="Write estimates or inventory as JSONL or CSV"
+    )
+    parser_export.add_argument('table', choices=('estimates', 'inventory'))
+    parser_export.add_argument('--format', choices=('jsonl', 'csv'),
+                               default='jsonl')
+    parser_export.add_argument('-o', '--output',
+                               help="Output file (default: stdout)")
+    parser_export.add_argument('--from', dest='date_from')
+    parser_export.add_argument('--to', dest='date_to')
+    parser_export.set_defaults(handler=cmd_export)
+
+    parser_changes = commands.add_parser(
+        'changes', help="Write rows changed since a change log sequence "
+                        "number as JSONL"
+    )
+    parser_changes.add_argument('--since', type=int, default=0,
+                                help="Last sequence number already applied")
+    parser_changes.add_argument('-o', '--output',
+                                help="Output file (default: stdout)")
+    parser_changes.add_argument('--latest', action='store_true',
+                                help="Only print the newest sequence number")
+    parser_changes.add_argument('--prune', type=int, metavar='SEQ',
+                                help="Afterwards drop log entries up to SEQ")
+    parser_changes.set_defaults(handler=cmd_changes)
+
+    parser_report = commands.add_parser(
+        'report', help="Render estimate or inventory PDFs, or revenue totals"
+    )
+    parser_report.add_argument('kind',
+                               choices=('estimates', 'inventory', 'revenue'))
+    parser_report.add_argument('--ids', type=int, nargs='*')
+    parser_report.add_argument('--from', dest='date_from')
+    parser_report.add_argument('--to', dest='date_to')
+    parser_report.add_argument('--workers', type=int)
+    parser_report.add_argument('--output-dir')
+    parser_report.add_argument('--json', action='store_true',
+                               help="Include daily revenue rows")
+    parser_report.set_defaults(handler=cmd_report)
+
+    parser_vacuum = commands.add_parser(
+        'vacuum', help="Checkpoint, VACUUM and optimize the database"
+    )
+    parser_vacuum.set_defaults(handler=cmd_vacuum)
+
+    parser_serve = commands.add_parser(
+        'serve', help="Share the database with other workstations over HTTP"
+    )
+    parser_serve.add_argument('--host',
+                              help=f"Address to bind (default {DEFAULT_HOST})")
+    parser_serve.add_argument('--port', type=int,
+                              help=f"Port to listen on (default {DEFAULT_PORT})")
+    parser_serve.add_argument('--token',
+                              help="Shared secret clients must send "
+                                   "(default server.token)")
+    parser_serve.set_defaults(handler=cmd_serve)
+
+    parser_bench = commands.add_parser(
+        'bench', help="Run the database and PDF benchmarks; other options "
+                      "go to python -m benchmarks"
+    )
+    parser_bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == 'bench':
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+    )
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Output piped into e.g. head; stop quietly like other tools do
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except Exception as e:
+        logging.error(f"{args.command} failed: {str(e)}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
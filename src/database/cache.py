@@ -0,0 +1,89 @@
+"""Bounded, thread-safe LRU cache used by DatabaseManager"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+# Invalidation counters are kept in this many hash buckets, so memory stays
+# bounded; keys sharing a bucket only cost each other an occasional put
+GENERATION_SLOTS = 4096
+
+
+class LRUCache:
+    """
+    Least-recently-used cache with hit/miss counters
+
+    Readers that load a value from the database take generation(key) first
+    and pass it to put(); if the key was invalidated in between, the value
+    they read may predate the write and is not stored.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._generations = [0] * GENERATION_SLOTS
+        self._lock = threading.Lock()
+
+    def generation(self, key: Hashable) -> int:
+        """Invalidation counter for key, to be handed back to put()"""
+        with self._lock:
+            return self._generations[hash(key) % GENERATION_SLOTS]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any,
+            generation: Optional[int] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry if full
+
+        With generation, the value is dropped if key was invalidated since
+        that generation was taken.
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            slot = hash(key) % GENERATION_SLOTS
+            if generation is not None and generation != self._generations[slot]:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry if present and reject puts of older reads"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[hash(key) % GENERATION_SLOTS] += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+            }
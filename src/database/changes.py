@@ -0,0 +1,110 @@
+"""Trigger-maintained change log for incremental sync"""
+
+import sqlite3
+from typing import Dict, Iterator, List, Tuple
+
+# Logged tables and their primary key columns
+CHANGE_TABLES: Dict[str, str] = {
+    'estimates': 'id',
+    'services': 'service_id',
+    'inventory': 'item_id',
+    'job_cards': 'id',
+}
+# link_estimates sets these right after every estimate insert; updates
+# touching only them are not worth a change entry
+UNLOGGED_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'estimates': ('customer_id', 'vehicle_id'),
+}
+
+
+def create_change_triggers(conn: sqlite3.Connection) -> None:
+    """
+    (Re)create the triggers logging inserts, updates and deletes
+
+    The update triggers name the logged columns, so they must be rebuilt
+    whenever a table gains one; run_migrations does so after every
+    migration newer than the change log.
+    """
+    for table, key in CHANGE_TABLES.items():
+        unlogged = UNLOGGED_COLUMNS.get(table, ())
+        logged = [
+            row[1] for row in conn.execute(f"PRAGMA table_info({table})")
+            if row[1] not in unlogged
+        ]
+        update = 'UPDATE'
+        if unlogged:
+            update += f" OF {', '.join(logged)}"
+        for op, event, row in (
+            ('insert', 'INSERT', 'new'),
+            ('update', update, 'new'),
+            ('delete', 'DELETE', 'old'),
+        ):
+            conn.execute(f"DROP TRIGGER IF EXISTS change_log_{table}_{op}")
+            conn.execute(f'''
+                CREATE TRIGGER change_log_{table}_{op}
+                AFTER {event} ON {table} BEGIN
+                    INSERT INTO change_log (table_name, row_id, op)
+                    VALUES ('{table}', {row}.{key}, '{op}');
+                END
+            ''')
+
+
+def latest_seq(conn: sqlite3.Connection) -> int:
+    """Sequence number of the newest change, 0 if there are none"""
+    # sqlite_sequence survives pruning, MAX(seq) over the table would not
+    row = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'"
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def changes_since(conn: sqlite3.Connection, seq: int,
+                  limit: int = 1000) -> List[Dict]:
+    """Raw change entries after seq, oldest first"""
+    rows = conn.execute('''
+        SELECT seq, table_name, row_id, op, changed_at
+        FROM change_log
+        WHERE seq > ?
+        ORDER BY seq
+        LIMIT ?
+    ''', (seq, limit)).fetchall()
+    return [dict(zip(
+        ('seq', 'table', 'row_id', 'op', 'changed_at'), row
+    )) for row in rows]
+
+
+def iter_latest_changes(conn: sqlite3.Connection, seq: int,
+                        chunk_size: int = 500) -> Iterator[List[Dict]]:
+    """
+    Yield chunks of the newest change per row after seq, oldest first
+
+    A row changed many times appears once, at its last sequence number,
+    so a consumer only fetches its final state.
+    """
+    cursor = conn.execute('''
+        SELECT c.seq, c.table_name, c.row_id, c.op, c.changed_at
+        FROM change_log c
+        JOIN (
+            SELECT MAX(seq) AS seq FROM change_log
+            WHERE seq > ?
+            GROUP BY table_name, row_id
+        ) latest ON latest.seq = c.seq
+        ORDER BY c.seq
+    ''', (seq,))
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [dict(zip(
+                ('seq', 'table', 'row_id', 'op', 'changed_at'), row
+            )) for row in rows]
+    finally:
+        cursor.close()
+
+
+def prune_changes(conn: sqlite3.Connection, before_seq: int) -> int:
+    """Delete entries up to and including before_seq; returns the count"""
+    return conn.execute(
+        "DELETE FROM change_log WHERE seq <= ?", (before_seq,)
+    ).rowcount
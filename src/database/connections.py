@@ -0,0 +1,47 @@
+"""Per-thread connection registry shared by the local and remote managers"""
+
+import threading
+from typing import Callable, Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class ThreadConnections(Generic[T]):
+    """
+    One connection per OS thread, closed once its thread has exited
+
+    Keyed by thread id rather than threading.local: Qt pool threads get a
+    fresh Python thread state, and so a fresh threading.local, for every
+    task they run, which would open a new connection per query.
+    """
+
+    def __init__(self, close: Callable[[T], None]):
+        self._close = close
+        self._by_thread: Dict[int, T] = {}
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[T]:
+        """Connection owned by the calling thread, if any"""
+        return self._by_thread.get(threading.get_ident())
+
+    def set(self, conn: T) -> None:
+        """Register conn for this thread; close those of exited threads"""
+        # Registers threads started outside Python (e.g. by Qt) as alive
+        threading.current_thread()
+        alive = {thread.ident for thread in threading.enumerate()}
+        with self._lock:
+            stale = [ident for ident in self._by_thread if ident not in alive]
+            closing = [self._by_thread.pop(ident) for ident in stale]
+            self._by_thread[threading.get_ident()] = conn
+        for old in closing:
+            self._close(old)
+
+    def close_all(self) -> None:
+        with self._lock:
+            connections: List[T] = list(self._by_thread.values())
+            self._by_thread.clear()
+        for conn in connections:
+            self._close(conn)
+
+    def __len__(self) -> int:
+        return len(self._by_thread)
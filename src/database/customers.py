@@ -0,0 +1,163 @@
+"""Customer and vehicle records shared between estimates"""
+
+import sqlite3
+from typing import Iterable, Optional
+
+from models.validation import NON_DIGIT_PATTERN, normalize_vin
+
+
+def phone_key(phone: Optional[str]) -> Optional[str]:
+    """Digits of a phone number, the form customers are unique on"""
+    digits = NON_DIGIT_PATTERN.sub('', phone or '')
+    return digits or None
+
+
+def email_key(email: Optional[str]) -> Optional[str]:
+    """Trimmed, lower-cased email"""
+    return (email or '').strip().lower() or None
+
+
+def name_key(name: Optional[str]) -> Optional[str]:
+    """Whitespace- and case-folded name, used only without phone/email"""
+    return ' '.join((name or '').lower().split()) or None
+
+
+def vin_key(vin: Optional[str]) -> Optional[str]:
+    """Space-free upper-case VIN"""
+    return normalize_vin(vin or '') or None
+
+
+def _find_customer(cursor: sqlite3.Cursor, phone: Optional[str],
+                   email: Optional[str], name: Optional[str]) -> Optional[int]:
+    if phone:
+        row = cursor.execute(
+            "SELECT id FROM customers WHERE phone_key = ?", (phone,)
+        ).fetchone()
+        if row:
+            return row[0]
+    if email:
+        row = cursor.execute(
+            "SELECT id FROM customers WHERE email_key = ?", (email,)
+        ).fetchone()
+        if row:
+            return row[0]
+    if not phone and not email and name:
+        row = cursor.execute('''
+            SELECT id FROM customers
+            WHERE name_key = ? AND phone_key IS NULL AND email_key IS NULL
+        ''', (name,)).fetchone()
+        if row:
+            return row[0]
+    return None
+
+
+def resolve_customer(cursor: sqlite3.Cursor, name: str, phone: Optional[str],
+                     email: Optional[str], visit_date: Optional[str]) -> int:
+    """
+    Return the id of the customer with this phone or email, creating it
+
+    Customers match on normalised phone first, then email; contacts
+    without either match on name. A matched customer gains any phone or
+    email it was missing, unless another customer already owns it.
+    """
+    keys = (phone_key(phone), email_key(email), name_key(name))
+    customer_id = _find_customer(cursor, *keys)
+    if customer_id is None:
+        cursor.execute('''
+            INSERT INTO customers (
+                name, phone, email, phone_key, email_key, name_key,
+                created_date, last_visit
+            ) VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?)
+        ''', (name, phone or None, email or None, *keys, visit_date,
+              visit_date))
+        return cursor.lastrowid
+
+    cursor.execute('''
+        UPDATE customers SET last_visit = ?
+        WHERE id = ? AND (last_visit IS NULL OR last_visit < ?)
+    ''', (visit_date, customer_id, visit_date))
+    if keys[0]:
+        cursor.execute('''
+            UPDATE OR IGNORE customers SET phone = ?, phone_key = ?
+            WHERE id = ? AND phone_key IS NULL
+        ''', (phone, keys[0], customer_id))
+    if keys[1]:
+        cursor.execute('''
+            UPDATE OR IGNORE customers SET email = ?, email_key = ?
+            WHERE id = ? AND email_key IS NULL
+        ''', (email, keys[1], customer_id))
+    return customer_id
+
+
+def resolve_vehicle(cursor: sqlite3.Cursor, customer_id: int, make: str,
+                    model: str, year: Optional[int],
+                    vin: Optional[str]) -> int:
+    """
+    Return the id of the vehicle with this VIN, creating it
+
+    Vehicles without a VIN match on make, model and year among the
+    customer's own vehicles.
+    """
+    key = vin_key(vin)
+    if key:
+        row = cursor.execute(
+            "SELECT id FROM vehicles WHERE vin_key = ?", (key,)
+        ).fetchone()
+    else:
+        row = cursor.execute('''
+            SELECT id FROM vehicles
+            WHERE customer_id = ? AND vin_key IS NULL
+              AND lower(make) = lower(?) AND lower(model) = lower(?)
+              AND year IS ?
+        ''', (customer_id, make, model, year)).fetchone()
+    if row:
+        return row[0]
+    cursor.execute('''
+        INSERT INTO vehicles (customer_id, make, model, year, vin, vin_key)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (customer_id, make, model, year, key, key))
+    return cursor.lastrowid
+
+
+def link_estimates(conn: sqlite3.Connection,
+                   estimate_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Point estimates at their customer and vehicle rows, creating them
+
+    Args:
+        conn: Connection inside the caller's transaction
+        estimate_ids: Estimates to link; all unlinked estimates if None
+
+    Returns:
+        int: Number of estimates linked
+    """
+    query = '''
+        SELECT id, customer_name, customer_phone, customer_email,
+               vehicle_make, vehicle_model, vehicle_year, vehicle_vin, date
+        FROM estimates
+    '''
+    if estimate_ids is None:
+        rows = conn.execute(
+            query + " WHERE customer_id IS NULL ORDER BY id"
+        ).fetchall()
+    else:
+        rows = [
+            row for estimate_id in estimate_ids
+            for row in conn.execute(query + " WHERE id = ?", (estimate_id,))
+        ]
+
+    cursor = conn.cursor()
+    links = []
+    for (estimate_id, name, phone, email, make, model, year, vin,
+         date) in rows:
+        customer_id = resolve_customer(cursor, name, phone, email, date)
+        vehicle_id = resolve_vehicle(
+            cursor, customer_id, make, model, year, vin
+        )
+        links.append((customer_id, vehicle_id, estimate_id))
+    cursor.executemany(
+        "UPDATE estimates SET customer_id = ?, vehicle_id = ? WHERE id = ?",
+        links,
+    )
+    cursor.close()
+    return len(links)
@@ -1,38 +1,205 @@
 """Basic implementation of a database manager for SQLite operations"""
 
+import csv
+import json
 import os
 import sqlite3
 import logging
+import threading
+from collections import deque
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+)
 from datetime import datetime
 
+from models.money import Money, from_minor, to_minor
+from models.service_scheduler import (
+    SERVICE_INTERVAL_DAYS, SERVICE_INTERVAL_MILEAGE, ServiceScheduler
+)
+from models.tax import tax_rates, tax_rows
 
+from .cache import LRUCache
+from .changes import (
+    CHANGE_TABLES, changes_since, iter_latest_changes, latest_seq,
+    prune_changes,
+)
+from .connections import ThreadConnections
+from .customers import email_key, link_estimates, phone_key
+from .diagnostics import DEFAULT_SLOW_QUERY_MS, QueryMonitor, instrument_methods
+from .migrations import rebuild_daily_totals, run_migrations
+from .write_queue import DEFAULT_WRITE_QUEUE, WriteCoordinator
+
+
+# Own change log ranges remembered for is_own_change; adjacent ranges
+# merge, so this only fills up when other writers interleave
+OWN_CHANGE_RANGES = 256
+# Up to this many vehicles are rescheduled with a query each; more take
+# one pass over the whole fleet
+RESCHEDULE_QUERIES = 16
+
+# Connection tuning applied to every connection the manager opens.
+# WAL lets readers run alongside a writer, and synchronous=NORMAL only
+# fsyncs at checkpoints instead of on every commit.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,  # negative = KiB, so ~20MB of page cache
+    'mmap_size': 268435456,  # 256MB
+    'busy_timeout': 5000,  # milliseconds
+}
+
+CREATE_ESTIMATE_QUERY = '''
+    INSERT INTO estimates (
+        customer_name, customer_phone, customer_email,
+        vehicle_make, vehicle_model, vehicle_year,
+        vehicle_vin, subtotal, nhil, getfund,
+        covid_levy, vat, total_amount, date, status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+# Columns holding integer minor units; the API exposes them as Money
+MONEY_COLUMNS = frozenset({
+    'subtotal', 'nhil', 'getfund', 'covid_levy', 'vat', 'total_amount',
+    'parts_cost', 'labor_cost', 'total_cost', 'unit_price',
+})
+
+
+def _money_dict(row) -> Dict:
+    """Convert a row to a dict with money columns wrapped as Money"""
+    result = dict(row)
+    for column in MONEY_COLUMNS.intersection(result):
+        result[column] = from_minor(result[column])
+    return result
+
+
+def _close_connection(conn: sqlite3.Connection) -> None:
+    try:
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"Error closing connection: {e}")
+
+
+def _estimate_list_row(row) -> tuple:
+    """Convert an estimates list row, whose total_amount is column 5"""
+    return (*row[:5], from_minor(row[5]), *row[6:])
+
+
+def iter_estimate_file(file_path: str) -> Iterator[Dict]:
+    """Stream estimate dicts from a CSV or JSONL file without loading it"""
+    with open(file_path, 'r', newline='', encoding='utf-8') as f:
+        if file_path.lower().endswith('.csv'):
+            for row in csv.DictReader(f):
+                # Blank CSV cells fall back to the create_estimate defaults
+                yield {k: v for k, v in row.items() if v != ''}
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+@instrument_methods(exclude=(
+    'connect', 'apply_pragmas', 'ensure_connection', 'get_connection',
+    'invalidate_estimate', 'cache_stats', 'query_stats', 'reset_query_stats',
+    'write_stats', 'is_own_change', 'close',
+))
 class DatabaseManager:
     """Database manager class for SQLite operations"""
 
-    def __init__(self, db_path: Optional[str] = None):
-        """Initialize database connection"""
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        pragmas: Optional[Dict[str, Any]] = None,
+        cache_size: int = 0,
+        slow_query_ms: Optional[float] = DEFAULT_SLOW_QUERY_MS,
+        write_queue: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize database connection
+
+        Args:
+            db_path: Path to the SQLite file
+            pragmas: Overrides for DEFAULT_PRAGMAS
+            cache_size: Number of entries (estimate rows and service
+                lists) kept in the read-through LRU cache; 0 disables it
+            slow_query_ms: Calls taking at least this long are logged with
+                their SQL and query plans; None disables the log
+            write_queue: Overrides for DEFAULT_WRITE_QUEUE (batch size and
+                lock retry backoff of the write coordinator)
+        """
         self.db_path = (
             db_path if db_path else os.path.join("data", "car_management.db")
         )
-        self.conn: Optional[sqlite3.Connection] = None
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        # One persistent connection per thread, all tracked for close()
+        self._connections = ThreadConnections(_close_connection)
+        self.estimate_cache: Optional[LRUCache] = (
+            LRUCache(cache_size) if cache_size > 0 else None
+        )
+        # Set by load_service_scheduler, then kept current by writes
+        self.scheduler: Optional[ServiceScheduler] = None
+        # Every public method is timed into this (see instrument_methods)
+        self.monitor = QueryMonitor(slow_query_ms)
+        # Small writes go through this so concurrent saves share commits
+        # and ride out locks held by other processes
+        write_options = dict(DEFAULT_WRITE_QUEUE)
+        if write_queue:
+            write_options.update(write_queue)
+        # (start, end] change log ranges written through this manager, so
+        # its own window can tell them from other instances' changes
+        self._own_changes: Deque[Tuple[int, int]] = deque(
+            maxlen=OWN_CHANGE_RANGES
+        )
+        self._own_changes_lock = threading.Lock()
+        self.writes = WriteCoordinator(
+            self._write_connection,
+            lambda conn: self.monitor.trace_cursor(conn.cursor()),
+            marker=latest_seq,
+            on_commit=self._record_own_changes,
+            **write_options,
+        )
         self.connect()  # Establish connection when initialized
         self.setup_database()
 
+    @property
+    def conn(self) -> Optional[sqlite3.Connection]:
+        """Persistent connection owned by the calling thread"""
+        return self._connections.get()
+
     def connect(self) -> bool:
-        """Establish database connection"""
+        """Establish database connection for the calling thread"""
         try:
             directory = os.path.dirname(self.db_path)
             if directory:
                 os.makedirs(directory, exist_ok=True)
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self.apply_pragmas(conn)
+            self._connections.set(conn)
             return True
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
             return False
 
+    def apply_pragmas(self, conn: sqlite3.Connection) -> None:
+        """Apply the configured pragmas to a freshly opened connection"""
+        for name, value in self.pragmas.items():
+            if value is None:
+                continue
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.Error as e:
+                logging.warning(f"Could not apply PRAGMA {name}: {e}")
+
+    def _write_connection(self) -> sqlite3.Connection:
+        if not self.conn:
+            self.connect()
+        return self.conn
+
     def ensure_connection(self):
         """Ensure database connection exists"""
         if not self.conn:
@@ -44,8 +211,9 @@ class DatabaseManager:
         """Context manager for database connections"""
         if not self.conn:
             self.connect()
+        cursor = None
         try:
-            cursor = self.conn.cursor()
+            cursor = self.monitor.trace_cursor(self.conn.cursor())
             yield cursor
             self.conn.commit()
         except sqlite3.Error as e:
@@ -57,261 +225,835 @@ class DatabaseManager:
                 cursor.close()
 
     def setup_database(self):
+        """Bring the database schema up to date without losing data"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('DROP TABLE IF EXISTS estimates')
-                cursor.execute('''
-                CREATE TABLE estimates (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    customer_name TEXT NOT NULL,
-                    customer_phone TEXT,
-                    customer_email TEXT,
-                    vehicle_make TEXT NOT NULL,
-                    vehicle_model TEXT NOT NULL,
-                    vehicle_year INTEGER,
-                    vehicle_vin TEXT,
-                    subtotal REAL NOT NULL,
-                    nhil REAL,
-                    getfund REAL,
-                    covid_levy REAL,
-                    vat REAL,
-                    total_amount REAL NOT NULL,
-                    date TEXT NOT NULL,
-                    status TEXT NOT NULL DEFAULT 'Pending',
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-                ''')
-                conn.commit()
-                logging.info("Estimates table created successfully")
+            self.ensure_connection()
+            version = run_migrations(self.conn)
+            logging.info(f"Database schema at version {version}")
         except Exception as e:
             logging.error(f"Database setup error: {str(e)}")
             raise
 
     def initialize_tables(self):
         """Create tables if they don't exist"""
-        with self.get_connection() as cursor:
-            try:
-                # Create estimates table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS estimates (
-                        estimate_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        customer_name TEXT NOT NULL,
-                        customer_phone TEXT,
-                        customer_email TEXT,
-                        vehicle_make TEXT NOT NULL,
-                        vehicle_model TEXT NOT NULL,
-                        vehicle_year INTEGER,
-                        vehicle_vin TEXT,
-                        date TEXT NOT NULL,
-                        subtotal REAL NOT NULL,
-                        nhil REAL NOT NULL,
-                        getfund REAL NOT NULL,
-                        covid_levy REAL NOT NULL,
-                        vat REAL NOT NULL,
-                        total_amount REAL NOT NULL,
-                        status TEXT NOT NULL
-                    )
-                """)
-
-                # Create services table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS services (
-                        service_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        estimate_id INTEGER,
-                        description TEXT NOT NULL,
-                        parts_cost REAL,
-                        labor_cost REAL,
-                        total_cost REAL,
-                        FOREIGN KEY (estimate_id) 
-                        REFERENCES estimates (estimate_id)
-                    )
-                """)
-
-                # Create inventory table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS inventory (
-                        item_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        item_code TEXT UNIQUE NOT NULL,
-                        description TEXT NOT NULL,
-                        quantity INTEGER DEFAULT 0,
-                        unit_price REAL,
-                        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                # Add JobCard table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS job_cards (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        estimate_id INTEGER,
-                        description TEXT,
-                        start_date TEXT,
-                        end_date TEXT,
-                        status TEXT,
-                        FOREIGN KEY (estimate_id) REFERENCES estimates(id)
-                    )
-                """)
-            except sqlite3.Error as e:
-                raise sqlite3.DatabaseError(
-                    f"Table creation error: {str(e)}"
-                ) from e
+        try:
+            self.setup_database()
+        except sqlite3.Error as e:
+            raise sqlite3.DatabaseError(
+                f"Table creation error: {str(e)}"
+            ) from e
 
     def add_estimate(self, data: Dict) -> Optional[int]:
         """Add new estimate with tax information"""
+        params = (
+            data['customer_name'],
+            data['customer_phone'],
+            data['customer_email'],
+            data['vehicle_make'],
+            data['vehicle_model'],
+            data['vehicle_year'],
+            data['vehicle_vin'],
+            data['date'],
+            to_minor(data['subtotal']),
+            to_minor(data['nhil']),
+            to_minor(data['getfund']),
+            to_minor(data['covid_levy']),
+            to_minor(data['vat']),
+            to_minor(data['total_amount']),
+            data['status']
+        )
+
+        def write(cursor):
+            cursor.execute("""
+                INSERT INTO estimates (
+                    customer_name, customer_phone, customer_email,
+                    vehicle_make, vehicle_model, vehicle_year, vehicle_vin,
+                    date, subtotal, nhil, getfund, covid_levy, vat,
+                    total_amount, status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, params)
+            link_estimates(cursor.connection, [cursor.lastrowid])
+            return cursor.lastrowid
+
         try:
-            with self.get_connection() as cursor:
-                query = """
-                    INSERT INTO estimates (
-                        customer_name, customer_phone, customer_email,
-                        vehicle_make, vehicle_model, vehicle_year, vehicle_vin,
-                        date, subtotal, nhil, getfund, covid_levy, vat,
-                        total_amount, status
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                cursor.execute(query, (
-                    data['customer_name'],
-                    data['customer_phone'],
-                    data['customer_email'],
-                    data['vehicle_make'],
-                    data['vehicle_model'],
-                    data['vehicle_year'],
-                    data['vehicle_vin'],
-                    data['date'],
-                    data['subtotal'],
-                    data['nhil'],
-                    data['getfund'],
-                    data['covid_levy'],
-                    data['vat'],
-                    data['total_amount'],
-                    data['status']
-                ))
-                return cursor.lastrowid
+            estimate_id = self.writes.submit(write)
+            self.invalidate_estimate(estimate_id)
+            self._schedule_estimates(estimate_id)
+            return estimate_id
         except Exception as e:
             logging.error(f"Error adding estimate: {e}")
             return None
 
-    def create_estimate(self, estimate_data):
+    @staticmethod
+    def _estimate_params(estimate_data: Dict) -> tuple:
+        """
+        Build INSERT parameters for an estimate, applying field defaults
+
+        Money fields may be Money or major-unit amounts (float, str,
+        Decimal) and are stored as integer minor units.
+        """
+        return (
+            estimate_data['customer_name'],
+            estimate_data.get('customer_phone', ''),
+            estimate_data.get('customer_email', ''),
+            estimate_data['vehicle_make'],
+            estimate_data['vehicle_model'],
+            estimate_data.get('vehicle_year', None),
+            estimate_data.get('vehicle_vin', ''),
+            to_minor(estimate_data['subtotal']),
+            to_minor(estimate_data.get('nhil', 0)),
+            to_minor(estimate_data.get('getfund', 0)),
+            to_minor(estimate_data.get('covid_levy', 0)),
+            to_minor(estimate_data.get('vat', 0)),
+            to_minor(estimate_data['total_amount']),
+            estimate_data['date'],
+            estimate_data.get('status', 'Pending')
+        )
+
+    def create_estimate(self, estimate_data, return_row: bool = False):
+        """
+        Insert an estimate and return its ID
+
+        With return_row=True the new row is returned instead, in the
+        get_all_estimates column order, so list views can insert it in
+        place rather than reloading.
+        """
+        def write(cursor):
+            cursor.execute(CREATE_ESTIMATE_QUERY, params)
+            estimate_id = cursor.lastrowid
+            link_estimates(cursor.connection, [estimate_id])
+            if not return_row:
+                return estimate_id
+            cursor.execute('''
+            SELECT id, customer_name, vehicle_make, vehicle_model,
+                   date, total_amount, status
+            FROM estimates
+            WHERE id = ?
+            ''', (estimate_id,))
+            return _estimate_list_row(cursor.fetchone())
+
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                INSERT INTO estimates (
-                    customer_name, customer_phone, customer_email,
-                    vehicle_make, vehicle_model, vehicle_year,
-                    vehicle_vin, subtotal, nhil, getfund,
-                    covid_levy, vat, total_amount, date, status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    estimate_data['customer_name'],
-                    estimate_data.get('customer_phone', ''),
-                    estimate_data.get('customer_email', ''),
-                    estimate_data['vehicle_make'],
-                    estimate_data['vehicle_model'],
-                    estimate_data.get('vehicle_year', None),
-                    estimate_data.get('vehicle_vin', ''),
-                    estimate_data['subtotal'],
-                    estimate_data.get('nhil', 0.0),
-                    estimate_data.get('getfund', 0.0),
-                    estimate_data.get('covid_levy', 0.0),
-                    estimate_data.get('vat', 0.0),
-                    estimate_data['total_amount'],
-                    estimate_data['date'],
-                    estimate_data.get('status', 'Pending')
-                ))
-                conn.commit()
-                return cursor.lastrowid
+            params = self._estimate_params(estimate_data)
+            result = self.writes.submit(write)
+            estimate_id = result[0] if return_row else result
+            self.invalidate_estimate(estimate_id)
+            self._schedule_estimates(estimate_id)
+            return result
         except Exception as e:
             logging.error(f"Failed to create estimate: {str(e)}")
             raise
 
+    def bulk_create_estimates(
+        self,
+        estimates: Iterable[Dict],
+        batch_size: int = 5000,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Insert many estimates using executemany, one transaction per chunk
+
+        Args:
+            estimates: Iterable of estimate dicts in create_estimate format
+            batch_size: Number of rows committed per transaction
+            progress: Optional callback receiving the running row count
+
+        Returns:
+            int: Number of estimates inserted
+        """
+        total = 0
+        batch: List[tuple] = []
+        try:
+            for estimate_data in estimates:
+                batch.append(self._estimate_params(estimate_data))
+                if len(batch) >= batch_size:
+                    total += self._insert_estimate_batch(batch)
+                    batch = []
+                    if progress:
+                        progress(total)
+            if batch:
+                total += self._insert_estimate_batch(batch)
+                if progress:
+                    progress(total)
+            logging.info(f"Bulk imported {total} estimates")
+            return total
+        except Exception as e:
+            logging.error(
+                f"Bulk estimate import failed after {total} rows: {str(e)}"
+            )
+            raise
+
+    def _insert_estimate_batch(self, batch: List[tuple]) -> int:
+        """Insert one chunk of estimate rows in a single transaction"""
+        def write(cursor):
+            # Exact with the write lock held: the batch gets the next ids
+            cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM estimates")
+            first_id = cursor.fetchone()[0]
+            cursor.executemany(CREATE_ESTIMATE_QUERY, batch)
+            link_estimates(cursor.connection)
+            return first_id
+
+        self._schedule_estimates(self.writes.submit(write))
+        return len(batch)
+
+    def import_estimates_file(
+        self,
+        file_path: str,
+        batch_size: int = 5000,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Bulk import estimates from a CSV (with header row) or JSONL file
+
+        Returns:
+            int: Number of estimates inserted
+        """
+        return self.bulk_create_estimates(
+            iter_estimate_file(file_path), batch_size, progress
+        )
+
     def add_service(self, service_data: Dict) -> int:
         """Add new service and return its ID"""
-        with self.get_connection() as cursor:
-            query = """
+        params = (
+            service_data["estimate_id"],
+            service_data["description"],
+            to_minor(service_data["parts_cost"]),
+            to_minor(service_data["labor_cost"]),
+            to_minor(service_data["total_cost"]),
+        )
+
+        def write(cursor):
+            cursor.execute("""
                 INSERT INTO services (
                     estimate_id, description, parts_cost,
                     labor_cost, total_cost
                 ) VALUES (?, ?, ?, ?, ?)
-            """
-            cursor.execute(
-                query,
-                (
-                    service_data["estimate_id"],
-                    service_data["description"],
-                    service_data["parts_cost"],
-                    service_data["labor_cost"],
-                    service_data["total_cost"],
-                ),
-            )
-            if cursor:
-                if cursor.lastrowid is not None:
-                    return cursor.lastrowid
-                else:
-                    raise sqlite3.DatabaseError("Failed to retrieve lastrowid")
-            else:
-                raise sqlite3.DatabaseError(
-                    "Cursor is None, cannot fetch lastrowid"
-                )
+            """, params)
+            if cursor.lastrowid is None:
+                raise sqlite3.DatabaseError("Failed to retrieve lastrowid")
+            return cursor.lastrowid
+
+        service_id = self.writes.submit(write)
+        # Readers that loaded the old list before the commit hold an older
+        # cache generation, so their put is rejected after this
+        self.invalidate_estimate(service_data["estimate_id"])
+        return service_id
 
     def get_estimate(self, estimate_id: int) -> Optional[Dict]:
         """Retrieve estimate by ID"""
+        cache_key = ('estimate', estimate_id)
+        generation = None
+        if self.estimate_cache is not None:
+            cached = self.estimate_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+            generation = self.estimate_cache.generation(cache_key)
         with self.get_connection() as cursor:
-            query = "SELECT * FROM estimates WHERE estimate_id = ?"
+            query = """
+                SELECT e.*, e.id AS estimate_id
+                FROM estimates e
+                WHERE e.id = ?
+            """
             cursor.execute(query, (estimate_id,))
-            if cursor:
-                result = cursor.fetchone()
-                if result:
-                    return dict(
-                        zip([col[0] for col in cursor.description], result)
-                    )
-            return None
+            result = cursor.fetchone()
+            if not result:
+                return None
+            estimate = _money_dict(result)
+        if self.estimate_cache is not None:
+            self.estimate_cache.put(cache_key, estimate, generation)
+            return dict(estimate)
+        return estimate
 
     def get_services_for_estimate(self, estimate_id: int) -> List[Dict]:
         """Retrieve all services for an estimate"""
+        cache_key = ('services', estimate_id)
+        generation = None
+        if self.estimate_cache is not None:
+            cached = self.estimate_cache.get(cache_key)
+            if cached is not None:
+                return [dict(service) for service in cached]
+            generation = self.estimate_cache.generation(cache_key)
         with self.get_connection() as cursor:
             query = "SELECT * FROM services WHERE estimate_id = ?"
             cursor.execute(query, (estimate_id,))
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            services = [_money_dict(row) for row in cursor.fetchall()]
+        if self.estimate_cache is not None:
+            self.estimate_cache.put(cache_key, services, generation)
+            return [dict(service) for service in services]
+        return services
+
+    def update_estimate_status(self, estimate_id: int, status: str) -> bool:
+        """Change an estimate's status, returning False if it doesn't exist"""
+        def write(cursor):
+            cursor.execute(
+                "UPDATE estimates SET status = ? WHERE id = ?",
+                (status, estimate_id),
+            )
+            return cursor.rowcount > 0
+
+        updated = self.writes.submit(write)
+        self.invalidate_estimate(estimate_id)
+        return updated
+
+    def invalidate_estimate(self, estimate_id: Optional[int]) -> None:
+        """Drop cached rows for one estimate after it or its services change"""
+        if self.estimate_cache is None or estimate_id is None:
+            return
+        self.estimate_cache.invalidate(('estimate', estimate_id))
+        self.estimate_cache.invalidate(('services', estimate_id))
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return estimate cache hit/miss counters for sizing the cache"""
+        if self.estimate_cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.estimate_cache.stats()}
 
-    def update_inventory(self, item_data: Dict) -> bool:
-        """Update or insert inventory item"""
+    def query_stats(self) -> List[Dict[str, Any]]:
+        """Call counts, rows and latency percentiles per method"""
+        return self.monitor.snapshot()
+
+    def write_stats(self) -> Dict[str, Any]:
+        """Write queue depth, group commit sizes and lock retry counts"""
+        return self.writes.stats()
+
+    def reset_query_stats(self) -> None:
+        self.monitor.reset()
+        self.writes.reset_stats()
+
+    def iter_estimates_with_services(
+        self,
+        estimate_ids: Optional[Iterable[int]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        chunk_size: int = 500,
+        after: Optional[tuple] = None,
+    ) -> Iterator[tuple]:
+        """
+        Stream (estimate, services) pairs for an ID list or date range
+
+        Estimates are read chunk by chunk and each chunk's services are
+        fetched with one IN query, so memory stays bounded by chunk_size.
+
+        Args:
+            estimate_ids: Specific estimates to stream; overrides the dates
+            date_from: Inclusive lower bound on estimate date (YYYY-MM-DD)
+            date_to: Inclusive upper bound on estimate date (YYYY-MM-DD)
+            chunk_size: Number of estimates fetched per round trip
+            after: (date, id) of the last estimate already read, to resume
+                a date range stream page by page
+        """
+        if estimate_ids is not None:
+            ids = list(estimate_ids)
+            chunks = (
+                ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)
+            )
+            for chunk in chunks:
+                placeholders = ", ".join("?" * len(chunk))
+                with self.get_connection() as cursor:
+                    cursor.execute(f"""
+                        SELECT e.*, e.id AS estimate_id
+                        FROM estimates e
+                        WHERE e.id IN ({placeholders})
+                        ORDER BY e.id
+                    """, chunk)
+                    estimates = [_money_dict(row) for row in cursor.fetchall()]
+                yield from self._attach_services(estimates)
+            return
+
+        conditions = []
+        params: List[Any] = []
+        if date_from is not None:
+            conditions.append("e.date >= ?")
+            params.append(str(date_from))
+        if date_to is not None:
+            conditions.append("e.date <= ?")
+            params.append(str(date_to))
+        if after is not None:
+            conditions.append("(e.date, e.id) > (?, ?)")
+            params.extend((str(after[0]), int(after[1])))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
         with self.get_connection() as cursor:
-            try:
-                query = """
-                    INSERT OR REPLACE INTO inventory (
-                        item_code, description, quantity, unit_price
-                    ) VALUES (?, ?, ?, ?)
-                """
-                cursor.execute(
-                    query,
-                    (
-                        item_data["item_code"],
-                        item_data["description"],
-                        item_data["quantity"],
-                        item_data["unit_price"],
-                    ),
+            cursor.execute(f"""
+                SELECT e.*, e.id AS estimate_id
+                FROM estimates e
+                {where}
+                ORDER BY e.date, e.id
+            """, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from self._attach_services(
+                    [_money_dict(row) for row in rows]
                 )
+
+    def _attach_services(self, estimates: List[Dict]) -> Iterator[tuple]:
+        """Yield (estimate, services) for a chunk using one services query"""
+        if not estimates:
+            return
+        ids = [estimate['id'] for estimate in estimates]
+        services: Dict[int, List[Dict]] = {estimate_id: [] for estimate_id in ids}
+        placeholders = ", ".join("?" * len(ids))
+        with self.get_connection() as cursor:
+            cursor.execute(f"""
+                SELECT * FROM services
+                WHERE estimate_id IN ({placeholders})
+                ORDER BY service_id
+            """, ids)
+            for row in cursor.fetchall():
+                services[row['estimate_id']].append(_money_dict(row))
+        for estimate in estimates:
+            yield estimate, services[estimate['id']]
+
+    def update_inventory(self, item_data: Dict, return_row: bool = False):
+        """
+        Update or insert inventory item
+
+        Returns True on success and False on failure, or with
+        return_row=True the saved item as a dict (None on failure).
+        """
+        def write(cursor):
+            cursor.execute(
+                """
+                INSERT INTO inventory (
+                    item_code, description, quantity, unit_price
+                ) VALUES (?, ?, ?, ?)
+                ON CONFLICT(item_code) DO UPDATE SET
+                    description = excluded.description,
+                    quantity = excluded.quantity,
+                    unit_price = excluded.unit_price,
+                    last_updated = CURRENT_TIMESTAMP
+                """,
+                (
+                    item_data["item_code"],
+                    item_data["description"],
+                    item_data["quantity"],
+                    to_minor(item_data["unit_price"]),
+                ),
+            )
+            if not return_row:
                 return True
-            except sqlite3.Error:
-                return False
+            cursor.execute(
+                "SELECT * FROM inventory WHERE item_code = ?",
+                (item_data["item_code"],),
+            )
+            return _money_dict(cursor.fetchone())
+
+        try:
+            return self.writes.submit(write)
+        except sqlite3.Error as e:
+            logging.error(f"Error saving inventory item: {str(e)}")
+            return None if return_row else False
 
     def get_all_estimates(self):
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self.get_connection() as cursor:
                 cursor.execute('''
                 SELECT id, customer_name, vehicle_make, vehicle_model, 
                        date, total_amount, status 
                 FROM estimates 
                 ORDER BY date DESC
                 ''')
-                return cursor.fetchall()
+                return [_estimate_list_row(row) for row in cursor.fetchall()]
         except Exception as e:
             logging.error(f"Error fetching estimates: {str(e)}")
             raise
 
+    def get_estimates_page(
+        self,
+        after: Optional[tuple] = None,
+        limit: int = 200,
+    ) -> List[tuple]:
+        """
+        Fetch one page of estimates, newest first, using keyset pagination
+
+        Args:
+            after: (date, id) of the last row of the previous page, or None
+                for the first page
+            limit: Maximum number of rows to return
+
+        Returns:
+            List[tuple]: Rows in the same column order as
+                get_all_estimates
+        """
+        try:
+            with self.get_connection() as cursor:
+                if after is None:
+                    cursor.execute('''
+                    SELECT id, customer_name, vehicle_make, vehicle_model,
+                           date, total_amount, status
+                    FROM estimates
+                    ORDER BY date DESC, id DESC
+                    LIMIT ?
+                    ''', (limit,))
+                else:
+                    # Seek past the previous page instead of using OFFSET
+                    cursor.execute('''
+                    SELECT id, customer_name, vehicle_make, vehicle_model,
+                           date, total_amount, status
+                    FROM estimates
+                    WHERE (date, id) < (?, ?)
+                    ORDER BY date DESC, id DESC
+                    LIMIT ?
+                    ''', (after[0], after[1], limit))
+                return [_estimate_list_row(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logging.error(f"Error fetching estimates page: {str(e)}")
+            raise
+
+    def search_estimates(self, query: str, limit: int = 50) -> List[tuple]:
+        """
+        Full-text search over estimate customer and vehicle fields
+
+        Every word in the query is matched as a prefix, so partial names,
+        phone fragments and VIN prefixes all work while typing.
+
+        Returns:
+            List[tuple]: Best matches first, in the same column order
+                as get_all_estimates
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        match = " ".join(
+            '"{}"*'.format(term.replace('"', '""')) for term in terms
+        )
+        try:
+            with self.get_connection() as cursor:
+                cursor.execute('''
+                SELECT e.id, e.customer_name, e.vehicle_make, e.vehicle_model,
+                       e.date, e.total_amount, e.status
+                FROM estimates_fts
+                JOIN estimates e ON e.id = estimates_fts.rowid
+                WHERE estimates_fts MATCH ?
+                ORDER BY estimates_fts.rank
+                LIMIT ?
+                ''', (match, limit))
+                return [_estimate_list_row(row) for row in cursor.fetchall()]
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e):
+                logging.error(f"Error searching estimates: {str(e)}")
+                raise
+        # No FTS5 index in this SQLite build, fall back to a LIKE scan
+        pattern = f"%{query.strip()}%"
+        with self.get_connection() as cursor:
+            cursor.execute('''
+            SELECT id, customer_name, vehicle_make, vehicle_model,
+                   date, total_amount, status
+            FROM estimates
+            WHERE customer_name LIKE :p OR customer_phone LIKE :p
+               OR customer_email LIKE :p OR vehicle_make LIKE :p
+               OR vehicle_model LIKE :p OR vehicle_vin LIKE :p
+            ORDER BY date DESC, id DESC
+            LIMIT :limit
+            ''', {'p': pattern, 'limit': limit})
+            return [_estimate_list_row(row) for row in cursor.fetchall()]
+
+    def find_customer(self, phone: Optional[str] = None,
+                      email: Optional[str] = None) -> Optional[Dict]:
+        """Look up a customer by phone or email, normalised as on insert"""
+        keys = [
+            ('phone_key', phone_key(phone)), ('email_key', email_key(email))
+        ]
+        with self.get_connection() as cursor:
+            for column, key in keys:
+                if key is None:
+                    continue
+                cursor.execute(
+                    f"SELECT * FROM customers WHERE {column} = ?", (key,)
+                )
+                row = cursor.fetchone()
+                if row is not None:
+                    return dict(row)
+        return None
+
+    def get_customer_vehicles(self, customer_id: int) -> List[Dict]:
+        """Vehicles first brought in by a customer"""
+        with self.get_connection() as cursor:
+            cursor.execute(
+                "SELECT * FROM vehicles WHERE customer_id = ? ORDER BY id",
+                (customer_id,),
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_estimates_for_customer(self, customer_id: int) -> List[tuple]:
+        """All estimates for a customer, newest first, in list-row format"""
+        with self.get_connection() as cursor:
+            cursor.execute('''
+            SELECT id, customer_name, vehicle_make, vehicle_model,
+                   date, total_amount, status
+            FROM estimates
+            WHERE customer_id = ?
+            ORDER BY date DESC, id DESC
+            ''', (customer_id,))
+            return [_estimate_list_row(row) for row in cursor.fetchall()]
+
+    def get_estimates_for_vehicle(self, vehicle_id: int) -> List[tuple]:
+        """All estimates for a vehicle, newest first, in list-row format"""
+        with self.get_connection() as cursor:
+            cursor.execute('''
+            SELECT id, customer_name, vehicle_make, vehicle_model,
+                   date, total_amount, status
+            FROM estimates
+            WHERE vehicle_id = ?
+            ORDER BY date DESC, id DESC
+            ''', (vehicle_id,))
+            return [_estimate_list_row(row) for row in cursor.fetchall()]
+
+    def get_service_due_rows(
+        self,
+        interval_days: int = SERVICE_INTERVAL_DAYS,
+        mileage_interval: int = SERVICE_INTERVAL_MILEAGE,
+        vehicle_id: Optional[int] = None,
+    ) -> List[tuple]:
+        """
+        Next service due for every vehicle, or just vehicle_id
+
+        The due date and mileage are computed in the query itself.
+        Vehicles with no recorded service are due from the date of their
+        first estimate (today if they have none), with no mileage limit.
+
+        Returns:
+            List[tuple]: (vehicle_id, due_date, due_mileage, mileage) rows,
+                ready for ServiceScheduler.load
+        """
+        with self.get_connection() as cursor:
+            cursor.execute(f'''
+            SELECT v.id,
+                   CASE WHEN v.last_service_date IS NOT NULL
+                        THEN date(v.last_service_date, '+' || ? || ' days')
+                        ELSE COALESCE(
+                            (SELECT MIN(e.date) FROM estimates e
+                             WHERE e.vehicle_id = v.id),
+                            date('now')
+                        )
+                   END,
+                   v.last_service_mileage + ?,
+                   v.mileage
+            FROM vehicles v
+            {'WHERE v.id = ?' if vehicle_id is not None else ''}
+            ''', (interval_days, mileage_interval) + (
+                (vehicle_id,) if vehicle_id is not None else ()
+            ))
+            return [tuple(row) for row in cursor.fetchall()]
+
+    def load_service_scheduler(
+        self,
+        interval_days: int = SERVICE_INTERVAL_DAYS,
+        mileage_interval: int = SERVICE_INTERVAL_MILEAGE,
+    ) -> ServiceScheduler:
+        """
+        Load the fleet into a ServiceScheduler and keep it current
+
+        record_service and update_mileage update the returned scheduler
+        along with the vehicle row, so callers need not do both.
+        """
+        scheduler = ServiceScheduler(interval_days, mileage_interval)
+        scheduler.load(self.get_service_due_rows(interval_days,
+                                                 mileage_interval))
+        self.scheduler = scheduler
+        return scheduler
+
+    def _reschedule(self, *vehicle_ids: int) -> None:
+        """Refresh the loaded scheduler's entries for vehicle_ids"""
+        if self.scheduler is None or not vehicle_ids:
+            return
+        interval_days = self.scheduler.interval_days
+        mileage_interval = self.scheduler.mileage_interval
+        if len(vehicle_ids) <= RESCHEDULE_QUERIES:
+            rows = [row for vehicle_id in vehicle_ids
+                    for row in self.get_service_due_rows(
+                        interval_days, mileage_interval, vehicle_id
+                    )]
+        else:
+            # One pass over the fleet beats a query per vehicle
+            wanted = set(vehicle_ids)
+            rows = [row for row in self.get_service_due_rows(
+                interval_days, mileage_interval
+            ) if row[0] in wanted]
+        for row in rows:
+            self.scheduler.update_row(row)
+        for vehicle_id in set(vehicle_ids) - {row[0] for row in rows}:
+            self.scheduler.remove(vehicle_id)
+
+    def _schedule_estimates(self, first_id: int) -> None:
+        """
+        Reschedule the vehicles of estimates from first_id on
+
+        Linking an estimate can create a vehicle, or give a never-serviced
+        one an earlier first visit, which is when it falls due.
+        """
+        if self.scheduler is None:
+            return
+        with self.get_connection() as cursor:
+            cursor.execute(
+                "SELECT DISTINCT vehicle_id FROM estimates "
+                "WHERE id >= ? AND vehicle_id IS NOT NULL",
+                (first_id,),
+            )
+            vehicle_ids = [row[0] for row in cursor.fetchall()]
+        self._reschedule(*vehicle_ids)
+
+    def record_service(self, vehicle_id: int, service_date: str,
+                       mileage: Optional[int] = None) -> bool:
+        """Store a vehicle's latest service date and odometer reading"""
+        def write(cursor):
+            cursor.execute('''
+            UPDATE vehicles
+            SET last_service_date = ?,
+                last_service_mileage = COALESCE(?, last_service_mileage),
+                mileage = COALESCE(MAX(mileage, ?), ?, mileage)
+            WHERE id = ?
+            ''', (service_date, mileage, mileage, mileage, vehicle_id))
+            return cursor.rowcount > 0
+
+        try:
+            recorded = self.writes.submit(write)
+        except sqlite3.Error as e:
+            logging.error(f"Error recording service: {str(e)}")
+            return False
+        if recorded:
+            self._reschedule(vehicle_id)
+        return recorded
+
+    def update_mileage(self, vehicle_id: int, mileage: int) -> bool:
+        """Store a new odometer reading; readings never go backwards"""
+        def write(cursor):
+            cursor.execute(
+                "UPDATE vehicles SET mileage = MAX(COALESCE(mileage, ?), ?) "
+                "WHERE id = ?",
+                (mileage, mileage, vehicle_id),
+            )
+            return cursor.rowcount > 0
+
+        try:
+            updated = self.writes.submit(write)
+        except sqlite3.Error as e:
+            logging.error(f"Error updating mileage: {str(e)}")
+            return False
+        if updated:
+            self._reschedule(vehicle_id)
+        return updated
+
+    def get_revenue_report(self, date_from: str, date_to: str) -> Dict[str, Any]:
+        """
+        Revenue and tax breakdown for an inclusive date range
+
+        Answered from the trigger-maintained daily_estimate_totals table,
+        so the cost depends on the number of days, not estimates.
+
+        Returns:
+            Dict: 'totals' for the whole range and 'daily' rows per date
+        """
+        with self.get_connection() as cursor:
+            cursor.execute('''
+            SELECT date, estimate_count, subtotal, nhil, getfund,
+                   covid_levy, vat, total_amount
+            FROM daily_estimate_totals
+            WHERE date BETWEEN ? AND ? AND estimate_count > 0
+            ORDER BY date
+            ''', (str(date_from), str(date_to)))
+            daily = [_money_dict(row) for row in cursor.fetchall()]
+        totals: Dict[str, Any] = {
+            'estimate_count': sum(day['estimate_count'] for day in daily)
+        }
+        for column in (
+            'subtotal', 'nhil', 'getfund', 'covid_levy', 'vat', 'total_amount'
+        ):
+            totals[column] = sum((day[column] for day in daily), Money(0))
+        return {'totals': totals, 'daily': daily}
+
+    def rebuild_daily_totals(self) -> None:
+        """Recompute the daily revenue summary, e.g. after a backfill"""
+        def write(cursor):
+            rebuild_daily_totals(cursor.connection)
+
+        self.writes.submit(write)
+        logging.info("Daily estimate totals rebuilt")
+
+    def vacuum(self) -> Dict[str, int]:
+        """
+        Checkpoint the WAL, rebuild the file and refresh planner statistics
+
+        VACUUM needs every other connection idle, so run it from
+        maintenance jobs rather than while the GUI is open.
+
+        Returns:
+            Dict: File size in bytes 'before' and 'after'
+        """
+        before = self._file_size()
+        self.ensure_connection()
+        self.conn.commit()
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.conn.execute("VACUUM")
+        self.conn.execute("PRAGMA optimize")
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        after = self._file_size()
+        logging.info(f"Vacuumed {self.db_path}: {before} -> {after} bytes")
+        return {'before': before, 'after': after}
+
+    def _file_size(self) -> int:
+        return sum(
+            os.path.getsize(self.db_path + suffix)
+            for suffix in ('', '-wal')
+            if os.path.exists(self.db_path + suffix)
+        )
+
+    def recompute_estimate_taxes(
+        self,
+        chunk_size: int = 5000,
+        progress: Optional[Callable[[int], None]] = None,
+        rates: Optional[Dict[str, int]] = None,
+    ) -> int:
+        """
+        Recompute levies, VAT and totals for every stored estimate
+
+        Used for audits when rates change. Estimates are streamed by id,
+        taxed a chunk at a time with compute_taxes_batch and written back
+        with executemany, one write-queue transaction per chunk.
+
+        Args:
+            rates: Basis point overrides for DEFAULT_RATES_BPS, e.g.
+                {'vat': 1250}; validated before anything is written
+
+        Returns:
+            int: Number of estimates updated
+        """
+        rates = tax_rates(rates)
+        total = 0
+        last_id = 0
+        while True:
+            # Read and write each chunk in one BEGIN IMMEDIATE transaction
+            # through the write coordinator, so a concurrent writer can't
+            # turn the read lock into SQLITE_BUSY halfway through
+            def write(cursor, after=last_id):
+                cursor.execute(
+                    "SELECT id, subtotal FROM estimates WHERE id > ? "
+                    "ORDER BY id LIMIT ?",
+                    (after, chunk_size),
+                )
+                rows = cursor.fetchall()
+                ids = [row[0] for row in rows]
+                if rows:
+                    cursor.executemany('''
+                        UPDATE estimates
+                        SET nhil = ?, getfund = ?, covid_levy = ?, vat = ?,
+                            total_amount = ?
+                        WHERE id = ?
+                    ''', tax_rows(ids, [row[1] for row in rows], rates))
+                return ids
+
+            ids = self.writes.submit(write)
+            if not ids:
+                break
+            for estimate_id in ids:
+                self.invalidate_estimate(estimate_id)
+            last_id = ids[-1]
+            total += len(ids)
+            if progress:
+                progress(total)
+        logging.info(f"Recomputed taxes for {total} estimates")
+        return total
+
     def get_inventory_items(self) -> List[Dict]:
         """
         Retrieve all inventory items
@@ -321,17 +1063,42 @@ class DatabaseManager:
         """
         with self.get_connection() as cursor:
             cursor.execute("SELECT * FROM inventory ORDER BY item_code")
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            return [_money_dict(row) for row in cursor.fetchall()]
+
+    def iter_inventory_items(self, chunk_size: int = 1000,
+                             after: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream inventory items in item_code order without materializing them
+
+        Args:
+            chunk_size: Number of rows fetched from the cursor at a time
+            after: Last item_code already read, to resume page by page
+
+        Yields:
+            Dict: One inventory item at a time
+        """
+        with self.get_connection() as cursor:
+            if after is None:
+                cursor.execute("SELECT * FROM inventory ORDER BY item_code")
+            else:
+                cursor.execute(
+                    "SELECT * FROM inventory WHERE item_code > ? "
+                    "ORDER BY item_code",
+                    (after,),
+                )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _money_dict(row)
 
     def add_job_card(self, data):
-        try:
-            query = """INSERT INTO job_cards 
-                       (estimate_id, description, start_date, end_date, status)
-                       VALUES (?, ?, ?, ?, ?)"""
-            cursor: sqlite3.Cursor = self.conn.cursor()
+        def write(cursor):
             cursor.execute(
-                query,
+                """INSERT INTO job_cards
+                   (estimate_id, description, start_date, end_date, status)
+                   VALUES (?, ?, ?, ?, ?)""",
                 (
                     data["estimate_id"],
                     data["description"],
@@ -340,7 +1107,9 @@ class DatabaseManager:
                     data["status"],
                 ),
             )
-            self.conn.commit()
+
+        try:
+            self.writes.submit(write)
             return True
         except sqlite3.Error as e:
             print(f"Database error: {e}")
@@ -348,43 +1117,38 @@ class DatabaseManager:
 
     def add_jobcard(self, jobcard_data: Dict) -> int:
         """Add new jobcard and return its ID"""
-        with self.get_connection() as cursor:
-            query = """
-                INSERT INTO jobcards (
+        params = (
+            jobcard_data["estimate_id"],
+            jobcard_data["status"],
+            jobcard_data["technician"],
+            jobcard_data["start_date"],
+            jobcard_data["completion_date"],
+            jobcard_data["labor_hours"],
+            jobcard_data["notes"],
+        )
+
+        def write(cursor):
+            cursor.execute("""
+                INSERT INTO job_cards (
                     estimate_id, status, technician,
                     start_date, completion_date,
                     labor_hours, notes
                 ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            cursor.execute(
-                query,
-                (
-                    jobcard_data["estimate_id"],
-                    jobcard_data["status"],
-                    jobcard_data["technician"],
-                    jobcard_data["start_date"],
-                    jobcard_data["completion_date"],
-                    jobcard_data["labor_hours"],
-                    jobcard_data["notes"],
-                ),
-            )
-            if cursor:
-                if cursor.lastrowid is not None:
-                    return cursor.lastrowid
-                else:
-                    raise sqlite3.DatabaseError("Failed to retrieve lastrowid")
-            else:
-                raise sqlite3.DatabaseError(
-                    "Cursor is None, cannot fetch lastrowid"
-                )
+            """, params)
+            if cursor.lastrowid is None:
+                raise sqlite3.DatabaseError("Failed to retrieve lastrowid")
+            return cursor.lastrowid
+
+        return self.writes.submit(write)
 
     def get_jobcards(self) -> List[Dict]:
         """Retrieve all jobcards"""
         with self.get_connection() as cursor:
             query = """
-                SELECT j.*, e.customer_name, e.vehicle_make, e.vehicle_model
-                FROM jobcards j
-                LEFT JOIN estimates e ON j.estimate_id = e.estimate_id
+                SELECT j.*, j.id AS jobcard_id,
+                       e.customer_name, e.vehicle_make, e.vehicle_model
+                FROM job_cards j
+                LEFT JOIN estimates e ON j.estimate_id = e.id
                 ORDER BY j.start_date DESC
             """
             cursor.execute(query)
@@ -396,8 +1160,9 @@ class DatabaseManager:
             with self.get_connection() as cursor:
                 query = """
                     SELECT j.*, e.customer_name,
-                           v.make as vehicle_make,
-                           v.model as vehicle_model
+                           COALESCE(v.make, e.vehicle_make) as vehicle_make,
+                           COALESCE(v.model, e.vehicle_model) as vehicle_model,
+                           v.vin as vehicle_vin
                     FROM job_cards j
                     LEFT JOIN estimates e ON j.estimate_id = e.id
                     LEFT JOIN vehicles v ON e.vehicle_id = v.id
@@ -410,16 +1175,106 @@ class DatabaseManager:
             print(f"Error fetching job cards: {e}")
             return []
 
+    def _record_own_changes(self, start: int, end: int) -> None:
+        if end <= start:
+            return
+        with self._own_changes_lock:
+            if self._own_changes and self._own_changes[-1][1] == start:
+                start = self._own_changes.pop()[0]
+            self._own_changes.append((start, end))
+
+    def is_own_change(self, seq: int) -> bool:
+        """True if change log entry seq was written through this manager"""
+        with self._own_changes_lock:
+            return any(start < seq <= end for start, end in self._own_changes)
+
+    def latest_change_seq(self) -> int:
+        """Sequence number of the newest change log entry, 0 if none"""
+        with self.get_connection() as cursor:
+            return latest_seq(cursor.connection)
+
+    def changes_since(self, seq: int, limit: int = 1000) -> List[Dict]:
+        """
+        Raw change log entries after seq, oldest first
+
+        Returns:
+            List[Dict]: Entries with 'seq', 'table', 'row_id', 'op'
+                ('insert', 'update' or 'delete') and 'changed_at'
+        """
+        with self.get_connection() as cursor:
+            return changes_since(cursor.connection, seq, limit)
+
+    def iter_change_deltas(self, since_seq: int = 0,
+                           chunk_size: int = 500) -> Iterator[Dict]:
+        """
+        Stream the current state of every row changed after since_seq
+
+        Each changed row is yielded once, at its newest sequence number,
+        with its current values under 'row'. Rows that no longer exist
+        come back as op 'delete' with row None. A consumer applying the
+        deltas in order and remembering the last 'seq' can resume from it.
+        """
+        with self.get_connection() as cursor:
+            conn = cursor.connection
+            for chunk in iter_latest_changes(conn, since_seq, chunk_size):
+                rows: Dict[tuple, Dict] = {}
+                ids_by_table: Dict[str, List[int]] = {}
+                for change in chunk:
+                    ids_by_table.setdefault(change['table'], []).append(
+                        change['row_id']
+                    )
+                for table, ids in ids_by_table.items():
+                    key = CHANGE_TABLES[table]
+                    placeholders = ','.join('?' * len(ids))
+                    cursor.execute(
+                        f"SELECT * FROM {table} WHERE {key} IN ({placeholders})",
+                        ids,
+                    )
+                    for row in cursor.fetchall():
+                        rows[table, row[key]] = _money_dict(row)
+                for change in chunk:
+                    row = rows.get((change['table'], change['row_id']))
+                    if row is None:
+                        change['op'] = 'delete'
+                    change['row'] = row
+                    yield change
+
+    def export_changes(self, output, since_seq: int = 0) -> Dict[str, int]:
+        """
+        Write the deltas after since_seq as JSON lines
+
+        Args:
+            output: Path or writable text file object
+            since_seq: Last sequence number the reader already has
+
+        Returns:
+            Dict: Number of 'rows' written and the 'last_seq' to resume from
+        """
+        if isinstance(output, (str, os.PathLike)):
+            with open(output, 'w', encoding='utf-8') as f:
+                return self.export_changes(f, since_seq)
+        count = 0
+        last_seq = since_seq
+        for change in self.iter_change_deltas(since_seq):
+            output.write(json.dumps(change, default=str) + '\n')
+            count += 1
+            last_seq = max(last_seq, change['seq'])
+        return {'rows': count, 'last_seq': last_seq}
+
+    def prune_change_log(self, before_seq: int) -> int:
+        """Drop change log entries every reader has caught up past"""
+        def write(cursor):
+            return prune_changes(cursor.connection, before_seq)
+
+        removed = self.writes.submit(write)
+        logging.info(f"Pruned {removed} change log entries")
+        return removed
+
     def close(self) -> None:
-        """Close database connection safely"""
-        if self.conn:
-            try:
-                self.conn.close()
-            except sqlite3.Error as e:
-                print(f"Error closing connection: {e}")
-            finally:
-                self.conn = None
-                self.cursor = None
+        """Close every connection opened by this manager safely"""
+        connections = getattr(self, '_connections', None)
+        if connections is not None:
+            connections.close_all()
 
     def __del__(self):
         """Destructor to ensure connection is closed"""
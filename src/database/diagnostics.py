@@ -0,0 +1,270 @@
+"""Per-call timing, histograms and slow-query logging for DatabaseManager"""
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+DEFAULT_SLOW_QUERY_MS = 200
+# Recent durations kept per name for percentiles
+SAMPLE_SIZE = 2048
+# Statements remembered per call for the slow-query log
+MAX_STATEMENTS = 20
+
+_EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def count_rows(result: Any) -> int:
+    """Rows a DatabaseManager call returned: list length, else 0 or 1"""
+    if isinstance(result, list):
+        return len(result)
+    if result is None or isinstance(result, (bool, int)):
+        return 0
+    return 1
+
+
+class QueryStat:
+    """Timing histogram and recent samples for one query name"""
+
+    def __init__(self):
+        self.count = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def add(self, milliseconds: float, rows: int) -> None:
+        self.count += 1
+        self.rows += rows
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+        self.samples.append(milliseconds)
+        for index, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if milliseconds <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'rows': self.rows,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'p50_ms': _percentile(ordered, 0.50),
+            'p90_ms': _percentile(ordered, 0.90),
+            'p99_ms': _percentile(ordered, 0.99),
+            'max_ms': self.max,
+            'histogram': list(self.buckets),
+        }
+
+
+class _Call:
+    """One in-progress instrumented call and the SQL it has run"""
+
+    __slots__ = ('name', 'statements')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.statements: List[tuple] = []
+
+    def add(self, conn, sql: str, params) -> None:
+        if len(self.statements) < MAX_STATEMENTS:
+            self.statements.append((conn, sql, params))
+
+
+class TracedCursor:
+    """Cursor proxy that records each statement for the slow-query log"""
+
+    def __init__(self, cursor, call: _Call):
+        self._cursor = cursor
+        self._call = call
+
+    def execute(self, sql, params=()):
+        self._call.add(self._cursor.connection, sql, params)
+        self._cursor.execute(sql, params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        first = seq_of_params[0] if isinstance(seq_of_params, list) \
+            and seq_of_params else None
+        self._call.add(self._cursor.connection, sql, first)
+        self._cursor.executemany(sql, seq_of_params)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class QueryMonitor:
+    """
+    Collects wall-clock timings per DatabaseManager call
+
+    Calls slower than slow_query_ms are logged with the SQL, parameters
+    and EXPLAIN QUERY PLAN of the statements they ran.
+    """
+
+    def __init__(self, slow_query_ms: Optional[float] = DEFAULT_SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self._stats: Dict[str, QueryStat] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[_Call]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def trace_cursor(self, cursor):
+        """Wrap a cursor so the current call records its statements"""
+        stack = self._stack()
+        return TracedCursor(cursor, stack[-1]) if stack else cursor
+
+    @contextmanager
+    def track(self, name: str):
+        """Time the body as one call; yields a dict to put 'rows' in"""
+        call = _Call(name)
+        stack = self._stack()
+        stack.append(call)
+        outcome = {'rows': 0}
+        start = time.perf_counter()
+        try:
+            yield outcome
+        finally:
+            milliseconds = (time.perf_counter() - start) * 1000
+            stack.pop()
+            if stack:
+                for statement in call.statements:
+                    stack[-1].add(*statement)
+            self._finish(call, milliseconds, outcome['rows'])
+
+    def iterate(self, name: str, generator):
+        """
+        Re-yield a generator's items, timing it as one call
+
+        Only the time spent producing items counts, not the time the
+        consumer spends between them.
+        """
+        call = _Call(name)
+        elapsed = 0.0
+        rows = 0
+        try:
+            while True:
+                stack = self._stack()
+                stack.append(call)
+                start = time.perf_counter()
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                    stack.pop()
+                rows += 1
+                yield item
+        finally:
+            generator.close()
+            self._finish(call, elapsed * 1000, rows)
+
+    def _finish(self, call: _Call, milliseconds: float, rows: int) -> None:
+        self.record(call.name, milliseconds, rows)
+        if self.slow_query_ms is not None \
+                and milliseconds >= self.slow_query_ms:
+            self._log_slow(call, milliseconds)
+
+    def record(self, name: str, milliseconds: float, rows: int = 0) -> None:
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = QueryStat()
+            stat.add(milliseconds, rows)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Summary per query name, slowest p90 first"""
+        with self._lock:
+            summaries = [
+                dict(stat.summary(), name=name)
+                for name, stat in self._stats.items()
+            ]
+        return sorted(summaries, key=lambda item: item['p90_ms'], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def _log_slow(self, call: _Call, milliseconds: float) -> None:
+        lines = [f"Slow query: {call.name} took {milliseconds:.1f} ms"]
+        for conn, sql, params in call.statements:
+            lines.append(f"  SQL: {' '.join(sql.split())}")
+            lines.append(f"  params: {params!r}")
+            for plan in self._explain(conn, sql, params):
+                lines.append(f"    plan: {plan}")
+        logging.warning("\n".join(lines))
+
+    @staticmethod
+    def _explain(conn, sql: str, params) -> List[str]:
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return []
+        try:
+            rows = conn.execute(
+                f"EXPLAIN QUERY PLAN {sql}", params or ()
+            ).fetchall()
+        except Exception as e:
+            return [f"unavailable ({e})"]
+        return [row[3] for row in rows]
+
+
+def _timed_generator(func, name):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self.monitor.iterate(name, func(self, *args, **kwargs))
+    return wrapper
+
+
+def _timed_method(func, name):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self.monitor.track(name) as outcome:
+            result = func(self, *args, **kwargs)
+            outcome['rows'] = count_rows(result)
+            return result
+    return wrapper
+
+
+def instrument_methods(exclude=()):
+    """
+    Class decorator timing every public method through self.monitor
+
+    Generator methods are recorded once, when they are exhausted or
+    closed, with the number of items they produced as the row count.
+    """
+    def decorate(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude \
+                    or not inspect.isfunction(member):
+                continue
+            if inspect.isgeneratorfunction(member):
+                setattr(cls, name, _timed_generator(member, name))
+            else:
+                setattr(cls, name, _timed_method(member, name))
+        return cls
+    return decorate
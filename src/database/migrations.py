@@ -0,0 +1,556 @@
+"""Versioned schema migrations keyed on PRAGMA user_version"""
+
+import logging
+import sqlite3
+from typing import Callable, List, Tuple
+
+from .changes import create_change_triggers
+from .customers import link_estimates
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Return the column names of a table, or [] if it does not exist"""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _add_missing_columns(
+    conn: sqlite3.Connection, table: str, columns: List[Tuple[str, str]]
+) -> None:
+    """Add any of the given (name, definition) columns a table lacks"""
+    existing = _table_columns(conn, table)
+    for name, definition in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+def _v1_baseline_schema(conn: sqlite3.Connection) -> None:
+    """Create the canonical schema and fold legacy variants into it"""
+    estimate_columns = _table_columns(conn, 'estimates')
+    if 'estimate_id' in estimate_columns and 'id' not in estimate_columns:
+        conn.execute("ALTER TABLE estimates RENAME COLUMN estimate_id TO id")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS estimates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_name TEXT NOT NULL,
+            customer_phone TEXT,
+            customer_email TEXT,
+            vehicle_make TEXT NOT NULL,
+            vehicle_model TEXT NOT NULL,
+            vehicle_year INTEGER,
+            vehicle_vin TEXT,
+            subtotal REAL NOT NULL,
+            nhil REAL,
+            getfund REAL,
+            covid_levy REAL,
+            vat REAL,
+            total_amount REAL NOT NULL,
+            date TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Pending',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # ALTER TABLE cannot add a column with a non-constant default
+    _add_missing_columns(conn, 'estimates', [('created_at', 'DATETIME')])
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS services (
+            service_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            estimate_id INTEGER,
+            description TEXT NOT NULL,
+            parts_cost REAL,
+            labor_cost REAL,
+            total_cost REAL,
+            FOREIGN KEY (estimate_id) REFERENCES estimates (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS inventory (
+            item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_code TEXT UNIQUE NOT NULL,
+            description TEXT NOT NULL,
+            quantity INTEGER DEFAULT 0,
+            unit_price REAL,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # job_cards is the superset of the old job_cards and jobcards layouts
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_cards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            estimate_id INTEGER,
+            description TEXT,
+            technician TEXT,
+            start_date TEXT,
+            end_date TEXT,
+            completion_date TEXT,
+            labor_hours REAL,
+            notes TEXT,
+            status TEXT,
+            FOREIGN KEY (estimate_id) REFERENCES estimates (id)
+        )
+    ''')
+    _add_missing_columns(conn, 'job_cards', [
+        ('technician', 'TEXT'),
+        ('completion_date', 'TEXT'),
+        ('labor_hours', 'REAL'),
+        ('notes', 'TEXT'),
+    ])
+
+    if _table_columns(conn, 'jobcards'):
+        conn.execute('''
+            INSERT INTO job_cards (
+                estimate_id, status, technician, start_date,
+                completion_date, labor_hours, notes
+            )
+            SELECT estimate_id, status, technician, start_date,
+                   completion_date, labor_hours, notes
+            FROM jobcards
+        ''')
+        conn.execute("DROP TABLE jobcards")
+
+
+def _v2_query_indexes(conn: sqlite3.Connection) -> None:
+    """Index the columns used for ordering, filtering and FK lookups"""
+    # id is the rowid, so idx_estimates_date also serves ORDER BY date, id
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_estimates_date ON estimates (date)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_estimates_status "
+        "ON estimates (status)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_services_estimate_id "
+        "ON services (estimate_id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_job_cards_estimate_start "
+        "ON job_cards (estimate_id, start_date)"
+    )
+
+
+def _v3_estimate_search_index(conn: sqlite3.Connection) -> None:
+    """Add an FTS5 index over estimate contact and vehicle fields"""
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS estimates_fts USING fts5(
+                customer_name, customer_phone, customer_email,
+                vehicle_make, vehicle_model, vehicle_vin,
+                content='estimates', content_rowid='id'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        # SQLite builds without FTS5 fall back to LIKE search
+        logging.warning(f"Full-text search unavailable: {e}")
+        return
+    _create_search_triggers(conn)
+    conn.execute("INSERT INTO estimates_fts (estimates_fts) VALUES ('rebuild')")
+
+
+def _create_search_triggers(conn: sqlite3.Connection) -> None:
+    """Keep the external-content estimates_fts table in sync by hand"""
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS estimates_fts_insert
+        AFTER INSERT ON estimates BEGIN
+            INSERT INTO estimates_fts (
+                rowid, customer_name, customer_phone, customer_email,
+                vehicle_make, vehicle_model, vehicle_vin
+            ) VALUES (
+                new.id, new.customer_name, new.customer_phone,
+                new.customer_email, new.vehicle_make, new.vehicle_model,
+                new.vehicle_vin
+            );
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS estimates_fts_delete
+        AFTER DELETE ON estimates BEGIN
+            INSERT INTO estimates_fts (
+                estimates_fts, rowid, customer_name, customer_phone,
+                customer_email, vehicle_make, vehicle_model, vehicle_vin
+            ) VALUES (
+                'delete', old.id, old.customer_name, old.customer_phone,
+                old.customer_email, old.vehicle_make, old.vehicle_model,
+                old.vehicle_vin
+            );
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS estimates_fts_update
+        AFTER UPDATE OF customer_name, customer_phone, customer_email,
+                        vehicle_make, vehicle_model, vehicle_vin
+        ON estimates BEGIN
+            INSERT INTO estimates_fts (
+                estimates_fts, rowid, customer_name, customer_phone,
+                customer_email, vehicle_make, vehicle_model, vehicle_vin
+            ) VALUES (
+                'delete', old.id, old.customer_name, old.customer_phone,
+                old.customer_email, old.vehicle_make, old.vehicle_model,
+                old.vehicle_vin
+            );
+            INSERT INTO estimates_fts (
+                rowid, customer_name, customer_phone, customer_email,
+                vehicle_make, vehicle_model, vehicle_vin
+            ) VALUES (
+                new.id, new.customer_name, new.customer_phone,
+                new.customer_email, new.vehicle_make, new.vehicle_model,
+                new.vehicle_vin
+            );
+        END
+    ''')
+
+
+_DAILY_TOTAL_COLUMNS = (
+    'subtotal', 'nhil', 'getfund', 'covid_levy', 'vat', 'total_amount'
+)
+
+
+def _daily_totals_upsert(row: str, sign: str) -> str:
+    """SQL adding (sign '+') or removing (sign '-') one estimate row"""
+    values = ", ".join(
+        f"{sign}COALESCE({row}.{column}, 0)" for column in _DAILY_TOTAL_COLUMNS
+    )
+    updates = ", ".join(
+        f"{column} = {column} + excluded.{column}"
+        for column in _DAILY_TOTAL_COLUMNS
+    )
+    return f'''
+        INSERT INTO daily_estimate_totals (
+            date, estimate_count, {", ".join(_DAILY_TOTAL_COLUMNS)}
+        ) VALUES ({row}.date, {sign}1, {values})
+        ON CONFLICT (date) DO UPDATE SET
+            estimate_count = estimate_count + excluded.estimate_count,
+            {updates};
+    '''
+
+
+def rebuild_daily_totals(conn: sqlite3.Connection) -> None:
+    """Recompute daily_estimate_totals from the estimates table"""
+    sums = ", ".join(
+        f"COALESCE(SUM({column}), 0)" for column in _DAILY_TOTAL_COLUMNS
+    )
+    conn.execute("DELETE FROM daily_estimate_totals")
+    conn.execute(f'''
+        INSERT INTO daily_estimate_totals (
+            date, estimate_count, {", ".join(_DAILY_TOTAL_COLUMNS)}
+        )
+        SELECT date, COUNT(*), {sums}
+        FROM estimates
+        GROUP BY date
+    ''')
+
+
+def _v4_daily_estimate_totals(conn: sqlite3.Connection) -> None:
+    """Add a per-day revenue and tax summary maintained by triggers"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS daily_estimate_totals (
+            date TEXT PRIMARY KEY,
+            estimate_count INTEGER NOT NULL DEFAULT 0,
+            subtotal REAL NOT NULL DEFAULT 0,
+            nhil REAL NOT NULL DEFAULT 0,
+            getfund REAL NOT NULL DEFAULT 0,
+            covid_levy REAL NOT NULL DEFAULT 0,
+            vat REAL NOT NULL DEFAULT 0,
+            total_amount REAL NOT NULL DEFAULT 0
+        )
+    ''')
+    _create_daily_totals_triggers(conn)
+    rebuild_daily_totals(conn)
+
+
+def _create_daily_totals_triggers(conn: sqlite3.Connection) -> None:
+    """Maintain daily_estimate_totals on estimate insert/update/delete"""
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS daily_totals_insert
+        AFTER INSERT ON estimates BEGIN
+            {_daily_totals_upsert('new', '')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS daily_totals_delete
+        AFTER DELETE ON estimates BEGIN
+            {_daily_totals_upsert('old', '-')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS daily_totals_update
+        AFTER UPDATE OF date, {", ".join(_DAILY_TOTAL_COLUMNS)}
+        ON estimates BEGIN
+            {_daily_totals_upsert('old', '-')}
+            {_daily_totals_upsert('new', '')}
+        END
+    ''')
+
+
+def _rebuild_with_integer_money(
+    conn: sqlite3.Connection,
+    table: str,
+    create_sql: str,
+    columns: Tuple[str, ...],
+    money_columns: Tuple[str, ...],
+) -> None:
+    """Recreate a table with money columns converted to minor units
+
+    SQLite cannot change a column's type in place, so the table is copied
+    into a new one and renamed. Triggers and indexes on the old table are
+    dropped with it and must be recreated by the caller.
+    """
+    sequence = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)
+    ).fetchone()
+    conn.execute(create_sql.format(name=f"{table}_new"))
+    select_list = ", ".join(
+        f"CAST(ROUND({column} * 100) AS INTEGER)"
+        if column in money_columns else column
+        for column in columns
+    )
+    conn.execute(f'''
+        INSERT INTO {table}_new ({", ".join(columns)})
+        SELECT {select_list} FROM {table}
+    ''')
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    if sequence:
+        # Keep AUTOINCREMENT from reusing ids of deleted rows
+        conn.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?",
+            (sequence[0], table),
+        )
+
+
+def _v5_integer_money(conn: sqlite3.Connection) -> None:
+    """Store every money amount as integer pesewas instead of REAL"""
+    _rebuild_with_integer_money(conn, 'estimates', '''
+        CREATE TABLE {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_name TEXT NOT NULL,
+            customer_phone TEXT,
+            customer_email TEXT,
+            vehicle_make TEXT NOT NULL,
+            vehicle_model TEXT NOT NULL,
+            vehicle_year INTEGER,
+            vehicle_vin TEXT,
+            subtotal INTEGER NOT NULL,
+            nhil INTEGER,
+            getfund INTEGER,
+            covid_levy INTEGER,
+            vat INTEGER,
+            total_amount INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Pending',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', (
+        'id', 'customer_name', 'customer_phone', 'customer_email',
+        'vehicle_make', 'vehicle_model', 'vehicle_year', 'vehicle_vin',
+        'subtotal', 'nhil', 'getfund', 'covid_levy', 'vat', 'total_amount',
+        'date', 'status', 'created_at',
+    ), _DAILY_TOTAL_COLUMNS)
+
+    _rebuild_with_integer_money(conn, 'services', '''
+        CREATE TABLE {name} (
+            service_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            estimate_id INTEGER,
+            description TEXT NOT NULL,
+            parts_cost INTEGER,
+            labor_cost INTEGER,
+            total_cost INTEGER,
+            FOREIGN KEY (estimate_id) REFERENCES estimates (id)
+        )
+    ''', (
+        'service_id', 'estimate_id', 'description',
+        'parts_cost', 'labor_cost', 'total_cost',
+    ), ('parts_cost', 'labor_cost', 'total_cost'))
+
+    _rebuild_with_integer_money(conn, 'inventory', '''
+        CREATE TABLE {name} (
+            item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_code TEXT UNIQUE NOT NULL,
+            description TEXT NOT NULL,
+            quantity INTEGER DEFAULT 0,
+            unit_price INTEGER,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', (
+        'item_id', 'item_code', 'description', 'quantity', 'unit_price',
+        'last_updated',
+    ), ('unit_price',))
+
+    conn.execute("DROP TABLE IF EXISTS daily_estimate_totals")
+    conn.execute('''
+        CREATE TABLE daily_estimate_totals (
+            date TEXT PRIMARY KEY,
+            estimate_count INTEGER NOT NULL DEFAULT 0,
+            subtotal INTEGER NOT NULL DEFAULT 0,
+            nhil INTEGER NOT NULL DEFAULT 0,
+            getfund INTEGER NOT NULL DEFAULT 0,
+            covid_levy INTEGER NOT NULL DEFAULT 0,
+            vat INTEGER NOT NULL DEFAULT 0,
+            total_amount INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    # Restore what was dropped along with the old tables
+    _v2_query_indexes(conn)
+    has_search_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'estimates_fts'"
+    ).fetchone()
+    if has_search_index:
+        _create_search_triggers(conn)
+    _create_daily_totals_triggers(conn)
+    rebuild_daily_totals(conn)
+
+
+def _v6_customers_and_vehicles(conn: sqlite3.Connection) -> None:
+    """Split customers and vehicles out of estimates, deduplicated"""
+    # Columns follow models.Customer / models.Car; *_key columns hold the
+    # normalised values the unique indexes deduplicate on
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT,
+            email TEXT,
+            address TEXT,
+            notes TEXT,
+            created_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            last_visit TEXT,
+            phone_key TEXT,
+            email_key TEXT,
+            name_key TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS vehicles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_id INTEGER,
+            make TEXT NOT NULL,
+            model TEXT NOT NULL,
+            year INTEGER,
+            vin TEXT,
+            mileage INTEGER,
+            color TEXT,
+            license_plate TEXT,
+            last_service_date TEXT,
+            vin_key TEXT,
+            FOREIGN KEY (customer_id) REFERENCES customers (id)
+        )
+    ''')
+    # Partial indexes: rows without the key are neither indexed nor
+    # deduplicated, and "key IS NULL" lookups use the other indexes
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_customers_phone_key "
+        "ON customers (phone_key) WHERE phone_key IS NOT NULL"
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_customers_email_key "
+        "ON customers (email_key) WHERE email_key IS NOT NULL"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_customers_name_key "
+        "ON customers (name_key)"
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_vehicles_vin_key "
+        "ON vehicles (vin_key) WHERE vin_key IS NOT NULL"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_vehicles_customer_id "
+        "ON vehicles (customer_id)"
+    )
+
+    # The contact and vehicle columns stay on estimates as the snapshot
+    # printed on each estimate; the ids link it to the shared records
+    _add_missing_columns(conn, 'estimates', [
+        ('customer_id', 'INTEGER REFERENCES customers (id)'),
+        ('vehicle_id', 'INTEGER REFERENCES vehicles (id)'),
+    ])
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_estimates_customer_date "
+        "ON estimates (customer_id, date)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_estimates_vehicle_date "
+        "ON estimates (vehicle_id, date)"
+    )
+    linked = link_estimates(conn)
+    logging.info(f"Linked {linked} estimates to customers and vehicles")
+
+
+def _v7_vehicle_service_tracking(conn: sqlite3.Connection) -> None:
+    """Record the odometer reading at each vehicle's last service"""
+    _add_missing_columns(conn, 'vehicles', [
+        ('last_service_mileage', 'INTEGER'),
+    ])
+
+
+def _v8_change_log(conn: sqlite3.Connection) -> None:
+    """Log row changes so readers can catch up from a sequence number"""
+    # AUTOINCREMENT so sequence numbers are never reused, even after the
+    # newest entries are pruned
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+            changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    create_change_triggers(conn)
+
+
+# (version, migration) pairs, applied in order to databases below version.
+# Migrations after CHANGE_LOG_VERSION are followed by create_change_triggers,
+# so columns they add are covered by the change log's update triggers.
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (1, _v1_baseline_schema),
+    (2, _v2_query_indexes),
+    (3, _v3_estimate_search_index),
+    (4, _v4_daily_estimate_totals),
+    (5, _v5_integer_money),
+    (6, _v6_customers_and_vehicles),
+    (7, _v7_vehicle_service_tracking),
+    (8, _v8_change_log),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+CHANGE_LOG_VERSION = 8
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version recorded in the database file"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Upgrade the database in place to the latest schema version
+
+    Each migration runs in its own transaction together with the
+    user_version bump, so a failed step leaves the previous version intact.
+
+    Returns:
+        int: The schema version after migrating
+    """
+    current = get_schema_version(conn)
+    for version, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            conn.execute("BEGIN")
+            migration(conn)
+            if version > CHANGE_LOG_VERSION:
+                create_change_triggers(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            logging.error(f"Schema migration to version {version} failed")
+            raise
+        logging.info(f"Database schema migrated to version {version}")
+        current = version
+    return current
@@ -0,0 +1,249 @@
+"""Serialized, retried and group-committed writes for DatabaseManager"""
+
+import logging
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# Defaults for DatabaseManager's write_queue overrides
+DEFAULT_WRITE_QUEUE = {
+    'max_batch': 64,  # writes committed together at most
+    'max_retries': 10,  # attempts after SQLITE_BUSY before giving up
+    'backoff_base': 0.005,  # seconds; doubled after every busy attempt
+    'backoff_max': 0.5,  # seconds
+}
+
+
+def is_lock_error(error: Exception) -> bool:
+    """True for SQLITE_BUSY / SQLITE_LOCKED, which are worth retrying"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+class _PendingWrite:
+    __slots__ = ('func', 'done', 'lead', 'result', 'error')
+
+    def __init__(self, func: Callable[[Any], Any]):
+        self.func = func
+        self.done = threading.Event()
+        self.lead = False
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class WriteCoordinator:
+    """
+    Runs write functions in BEGIN IMMEDIATE transactions, retrying on lock
+
+    Writes submitted while another thread is committing queue up and are
+    committed together by that thread (the leader) in one transaction,
+    each inside its own savepoint so a failing write only rolls back
+    itself. If the database is locked by another process, the whole batch
+    is retried with exponential backoff and jitter after the connection's
+    busy_timeout has run out; writes are never dropped silently, callers
+    get the final error instead.
+
+    Write functions receive a cursor, must not commit, and must not submit
+    further writes themselves.
+
+    If given, marker(conn) is read right after BEGIN IMMEDIATE and again
+    just before COMMIT, and on_commit(start, end) is called with both
+    readings once the batch has committed; with the write lock held in
+    between, everything between the two markers was written by this batch.
+    Errors from on_commit are logged; the writes still succeed.
+    """
+
+    def __init__(self, connection: Callable[[], sqlite3.Connection],
+                 cursor: Callable[[sqlite3.Connection], Any] = None,
+                 max_batch: int = DEFAULT_WRITE_QUEUE['max_batch'],
+                 max_retries: int = DEFAULT_WRITE_QUEUE['max_retries'],
+                 backoff_base: float = DEFAULT_WRITE_QUEUE['backoff_base'],
+                 backoff_max: float = DEFAULT_WRITE_QUEUE['backoff_max'],
+                 marker: Optional[Callable[[sqlite3.Connection], Any]] = None,
+                 on_commit: Optional[Callable[[Any, Any], None]] = None):
+        self._connection = connection
+        self._cursor = cursor or (lambda conn: conn.cursor())
+        self._marker = marker
+        self._on_commit = on_commit
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._queue: Deque[_PendingWrite] = deque()
+        self._lock = threading.Lock()
+        self._leader_active = False
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {
+            'writes': 0,
+            'batches': 0,
+            'largest_batch': 0,
+            'max_queue_depth': 0,
+            'retries': 0,
+            'lock_failures': 0,
+            'errors': 0,
+        }
+
+    def submit(self, func: Callable[[Any], Any]) -> Any:
+        """Run func(cursor) in a committed transaction and return its result"""
+        pending = _PendingWrite(func)
+        with self._lock:
+            self._queue.append(pending)
+            self._stats['max_queue_depth'] = max(
+                self._stats['max_queue_depth'], len(self._queue)
+            )
+            lead = not self._leader_active
+            self._leader_active = True
+        if not lead:
+            pending.done.wait()
+            if pending.lead:
+                # The previous leader handed over with writes still queued
+                pending.done.clear()
+                self._lead(pending)
+        else:
+            self._lead(pending)
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _lead(self, own: _PendingWrite) -> None:
+        """Commit queued batches until own is done, then hand over"""
+        batch: List[_PendingWrite] = []
+        try:
+            while True:
+                with self._lock:
+                    batch = [self._queue.popleft() for _ in
+                             range(min(self.max_batch, len(self._queue)))]
+                if batch:
+                    self._commit(batch)
+                batch = []
+                with self._lock:
+                    if own.done.is_set() or not self._queue:
+                        break
+        except BaseException as e:
+            # Fail the writes this leader took on rather than leave their
+            # callers waiting forever
+            with self._lock:
+                if not own.done.is_set() and own in self._queue:
+                    self._queue.remove(own)
+                    batch.append(own)
+            for pending in batch:
+                if not pending.done.is_set():
+                    pending.error = e
+                    pending.done.set()
+        finally:
+            with self._lock:
+                if self._queue:
+                    successor = self._queue[0]
+                    successor.lead = True
+                    successor.done.set()
+                else:
+                    self._leader_active = False
+
+    def _commit(self, batch: List[_PendingWrite]) -> None:
+        conn = None
+        failure = None
+        markers = None
+        attempt = 0
+        while True:
+            try:
+                if conn is None:
+                    conn = self._connection()
+                outcomes, markers = self._run_batch(conn, batch)
+                break
+            except Exception as e:
+                if conn is not None and conn.in_transaction:
+                    conn.rollback()
+                if not is_lock_error(e) or attempt >= self.max_retries:
+                    failure = e
+                    outcomes = [(None, e)] * len(batch)
+                    break
+            except BaseException:
+                # e.g. KeyboardInterrupt: don't leave the shared connection
+                # inside a transaction for the next leader
+                if conn is not None and conn.in_transaction:
+                    conn.rollback()
+                raise
+            delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            attempt += 1
+            with self._lock:
+                self._stats['retries'] += 1
+
+        with self._lock:
+            self._stats['writes'] += len(batch)
+            self._stats['batches'] += 1
+            self._stats['largest_batch'] = max(self._stats['largest_batch'],
+                                               len(batch))
+            if failure is not None:
+                key = 'lock_failures' if is_lock_error(failure) else 'errors'
+                self._stats[key] += len(batch)
+            else:
+                self._stats['errors'] += sum(
+                    1 for _, error in outcomes if error is not None
+                )
+        for pending, (result, error) in zip(batch, outcomes):
+            pending.result = result
+            pending.error = error
+        # The batch is committed whatever the hook does, so its errors must
+        # not reach the callers, who could otherwise retry and duplicate
+        # rows; it runs before they are woken so its effects are visible
+        if markers is not None and self._on_commit:
+            try:
+                self._on_commit(*markers)
+            except Exception as e:
+                logging.error(f"Write queue on_commit hook failed: {e}")
+        for pending in batch:
+            pending.done.set()
+
+    def _run_batch(self, conn: sqlite3.Connection,
+                   batch: List[_PendingWrite]) -> Tuple[List[tuple], tuple]:
+        """
+        Apply every write in one transaction; lock errors propagate
+
+        Returns the (result, error) outcome of each write and the
+        (start, end) marker readings.
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        start = self._marker(conn) if self._marker else None
+        outcomes = []
+        for pending in batch:
+            conn.execute("SAVEPOINT queued_write")
+            cursor = self._cursor(conn)
+            try:
+                outcomes.append((pending.func(cursor), None))
+            except Exception as e:
+                if is_lock_error(e):
+                    raise
+                conn.execute("ROLLBACK TO queued_write")
+                outcomes.append((None, e))
+            finally:
+                cursor.close()
+            conn.execute("RELEASE queued_write")
+        end = self._marker(conn) if self._marker else None
+        conn.commit()
+        return outcomes, (start, end)
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since the last reset plus the current queue depth"""
+        with self._lock:
+            stats = dict(self._stats, queue_depth=len(self._queue))
+        stats['mean_batch'] = (
+            stats['writes'] / stats['batches'] if stats['batches'] else 0.0
+        )
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = self._empty_stats()
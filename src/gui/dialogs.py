@@ -8,20 +8,31 @@ from PyQt6.QtWidgets import (
     QDialogButtonBox,
     QDoubleSpinBox,
     QFormLayout,
+    QHBoxLayout,
     QLineEdit,
     QMessageBox,
+    QPushButton,
     QSpinBox,
+    QTableWidget,
+    QTableWidgetItem,
     QVBoxLayout,
     QTextEdit,
     QLabel,
 )
 
+from models.money import Money
+from models.tax import compute_taxes
+from models.vin_decoder import decode_vin
+
 
 class NewEstimateDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         try:
             self.estimate_data = None
+            # Values last filled in from the VIN, so edits by hand are kept
+            self._decoded_make = None
+            self._decoded_year = None
             self.setup_ui()
         except Exception as e:
             logging.error(f"Error initializing NewEstimateDialog: {str(e)}")
@@ -39,6 +50,7 @@ class NewEstimateDialog(QDialog):
         self.vehicle_year = QSpinBox()
         self.vehicle_year.setRange(1900, QDate.currentDate().year())
         self.vehicle_vin = QLineEdit()
+        self.vehicle_vin.textChanged.connect(self.autofill_from_vin)
         
         # Initialize amount fields
         self.subtotal = QDoubleSpinBox()
@@ -67,14 +79,34 @@ class NewEstimateDialog(QDialog):
         
         self.setLayout(layout)
 
+    def autofill_from_vin(self, vin):
+        """Fill make and year from the VIN unless the user has typed them"""
+        try:
+            info = decode_vin(vin)
+        except (OSError, ValueError) as e:
+            logging.error(f"VIN decoding unavailable: {str(e)}")
+            return
+        if info is None:
+            return
+        make = self.vehicle_make.text()
+        if info.make and (not make or make == self._decoded_make):
+            self.vehicle_make.setText(info.make)
+            self._decoded_make = info.make
+        year = self.vehicle_year.value()
+        if info.model_year and (
+                year == self.vehicle_year.minimum()
+                or year == self._decoded_year):
+            self.vehicle_year.setValue(info.model_year)
+            self._decoded_year = self.vehicle_year.value()
+
     def calculate_totals(self):
-        subtotal = self.subtotal.value()
-        self.nhil = subtotal * 0.025
-        self.getfund = subtotal * 0.025
-        self.covid_levy = subtotal * 0.01
-        self.subtotal_with_levies = subtotal + self.nhil + self.getfund + self.covid_levy
-        self.vat = self.subtotal_with_levies * 0.15
-        self.total = self.subtotal_with_levies + self.vat
+        taxes = compute_taxes(self.subtotal.value())
+        self.nhil = taxes['nhil']
+        self.getfund = taxes['getfund']
+        self.covid_levy = taxes['covid_levy']
+        self.subtotal_with_levies = taxes['subtotal_with_levies']
+        self.vat = taxes['vat']
+        self.total = taxes['total_amount']
 
     def validate_and_accept(self):
         try:
@@ -97,7 +129,7 @@ class NewEstimateDialog(QDialog):
                 'vehicle_model': self.vehicle_model.text(),
                 'vehicle_year': self.vehicle_year.value(),
                 'vehicle_vin': self.vehicle_vin.text(),
-                'subtotal': self.subtotal.value(),
+                'subtotal': Money.from_decimal(self.subtotal.value()),
                 'nhil': self.nhil,
                 'getfund': self.getfund,
                 'covid_levy': self.covid_levy,
@@ -153,11 +185,13 @@ class ServiceEntryDialog(QDialog):
         self.accept()
 
     def get_data(self):
+        parts_cost = Money.from_decimal(self.parts_cost.value())
+        labor_cost = Money.from_decimal(self.labor_cost.value())
         return {
             'description': self.description.text(),
-            'parts_cost': self.parts_cost.value(),
-            'labor_cost': self.labor_cost.value(),
-            'total_cost': self.parts_cost.value() + self.labor_cost.value()
+            'parts_cost': parts_cost,
+            'labor_cost': labor_cost,
+            'total_cost': parts_cost + labor_cost
         }
 
 
@@ -182,7 +216,9 @@ class InventoryItemDialog(QDialog):
             self.item_code.setText(self.item_data.get('item_code', ''))
             self.description.setText(self.item_data.get('description', ''))
             self.quantity.setValue(self.item_data.get('quantity', 0))
-            self.unit_price.setValue(self.item_data.get('unit_price', 0.0))
+            self.unit_price.setValue(
+                float(self.item_data.get('unit_price') or 0)
+            )
         
         layout.addRow("Item Code*:", self.item_code)
         layout.addRow("Description*:", self.description)
@@ -215,7 +251,7 @@ class InventoryItemDialog(QDialog):
             'item_code': self.item_code.text(),
             'description': self.description.text(),
             'quantity': self.quantity.value(),
-            'unit_price': self.unit_price.value()
+            'unit_price': Money.from_decimal(self.unit_price.value())
         }
 
 
@@ -348,3 +384,84 @@ class JobCardDialog(QDialog):
             'start_date': datetime.now().isoformat(),
             'completion_date': None
         }
+
+
+class DiagnosticsDialog(QDialog):
+    """Latency percentiles for every DatabaseManager call this session"""
+
+    COLUMNS = [
+        ("Query", 'name'),
+        ("Calls", 'count'),
+        ("Rows", 'rows'),
+        ("Mean ms", 'mean_ms'),
+        ("p50 ms", 'p50_ms'),
+        ("p90 ms", 'p90_ms'),
+        ("p99 ms", 'p99_ms'),
+        ("Max ms", 'max_ms'),
+    ]
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.setWindowTitle("Diagnostics")
+        self.resize(760, 420)
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        threshold = self.db_manager.monitor.slow_query_ms
+        layout.addWidget(QLabel(
+            f"Slow-query log threshold: {threshold:g} ms"
+            if threshold is not None else "Slow-query log disabled"
+        ))
+
+        self.writes_label = QLabel()
+        layout.addWidget(self.writes_label)
+
+        self.stats_table = QTableWidget()
+        self.stats_table.setColumnCount(len(self.COLUMNS))
+        self.stats_table.setHorizontalHeaderLabels(
+            [title for title, _ in self.COLUMNS]
+        )
+        layout.addWidget(self.stats_table)
+
+        button_layout = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_btn)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        button_layout.addWidget(reset_btn)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        button_layout.addWidget(buttons)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        stats = self.db_manager.query_stats()
+        self.stats_table.setRowCount(len(stats))
+        for row, stat in enumerate(stats):
+            for col, (_, key) in enumerate(self.COLUMNS):
+                value = stat[key]
+                text = f"{value:.2f}" if isinstance(value, float) else str(value)
+                self.stats_table.setItem(row, col, QTableWidgetItem(text))
+        self.stats_table.resizeColumnsToContents()
+
+        writes = self.db_manager.write_stats()
+        self.writes_label.setText(
+            f"Writes: {writes['writes']} in {writes['batches']} commits "
+            f"(mean batch {writes['mean_batch']:.1f}, "
+            f"largest {writes['largest_batch']}), "
+            f"queue depth {writes['queue_depth']} "
+            f"(max {writes['max_queue_depth']}), "
+            f"lock retries {writes['retries']}, "
+            f"lock failures {writes['lock_failures']}"
+        )
+
+    def reset(self):
+        self.db_manager.reset_query_stats()
+        self.refresh()
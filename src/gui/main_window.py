@@ -1,11 +1,16 @@
 import logging
+from itertools import islice
 
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QAction
 from PyQt6.QtWidgets import (
+    QAbstractItemView,
     QHBoxLayout,  # Add this import
     QMainWindow,
     QMessageBox,
+    QProgressBar,
     QPushButton,
+    QTableView,
     QTableWidget,
     QTableWidgetItem,
     QTabWidget,
@@ -17,11 +22,19 @@ from PyQt6.QtWidgets import (
 from database.db_manager import DatabaseManager
 
 from .dialogs import (  # Add to imports
+    DiagnosticsDialog,
     InventoryItemDialog,
     JobCardDialog,
     NewEstimateDialog,
     ReportDialog,
 )
+from .models import EstimatesTableModel
+from .widgets import SearchBoxWidget
+from .workers import QueryExecutor
+
+# How often the change log is checked for writes by other instances
+CHANGE_POLL_MS = 5000
+CHANGE_POLL_LIMIT = 1000
 
 
 class MainWindow(QMainWindow):
@@ -30,10 +43,19 @@ class MainWindow(QMainWindow):
         try:
             # Rename db_manager attribute
             self.db_manager = db_manager
+            self.query_executor = QueryExecutor(self)
+            # Tab contents are built on first activation; until then
+            # these widgets do not exist
+            self.estimates_model = None
+            self.inventory_table = None
+            self.report_table = None
+            self.jobcards_table = None
             # Create status bar
             self.status_bar = self.statusBar()
+            self.create_busy_indicator()
             # Setup UI
             self.setup_ui()
+            self.start_change_polling()
             logging.info("MainWindow initialized successfully")
         except Exception as e:
             logging.error(f"Error initializing MainWindow: {str(e)}")
@@ -51,13 +73,114 @@ class MainWindow(QMainWindow):
         # Create toolbar
         self.create_toolbar()
 
-        # Create tab widget
-        tabs = QTabWidget()
-        tabs.addTab(self.create_estimates_tab(), "Estimates")
-        tabs.addTab(self.create_inventory_tab(), "Inventory")
-        tabs.addTab(self.create_reports_tab(), "Reports")
-        tabs.addTab(self.create_jobcard_tab(), "JobCards")
-        layout.addWidget(tabs)
+        # Create tab widget with empty pages, filled in by ensure_tab
+        self.tabs = QTabWidget()
+        self._tab_pages = {}
+        self._tab_builders = {}
+        for title, builder in (
+            ("Estimates", self.create_estimates_tab),
+            ("Inventory", self.create_inventory_tab),
+            ("Reports", self.create_reports_tab),
+            ("JobCards", self.create_jobcard_tab),
+        ):
+            page = QWidget()
+            QVBoxLayout(page).setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(page, title)
+            self._tab_pages[title] = page
+            self._tab_builders[page] = builder
+        self.tabs.currentChanged.connect(self.ensure_tab)
+        self.ensure_tab(self.tabs.currentIndex())
+        layout.addWidget(self.tabs)
+
+    def start_change_polling(self, interval_ms=CHANGE_POLL_MS):
+        """Refresh built tabs when another instance changes their data"""
+        self._change_seq = self.db_manager.latest_change_seq()
+        self.change_timer = QTimer(self)
+        self.change_timer.setInterval(interval_ms)
+        self.change_timer.timeout.connect(self.poll_changes)
+        self.change_timer.start()
+
+    def poll_changes(self):
+        # Reading one sequence number is cheap enough for the UI thread;
+        # the changed rows are only fetched when it moved
+        try:
+            latest = self.db_manager.latest_change_seq()
+        except Exception as e:
+            logging.error(f"Error polling for changes: {str(e)}")
+            return
+        if latest == self._change_seq:
+            return
+        self.query_executor.submit(
+            self.fetch_changes,
+            self._change_seq,
+            key="changes",
+            on_result=self.on_changes,
+            on_error=lambda error: logging.error(
+                f"Error fetching changes: {error}"
+            ),
+        )
+
+    def fetch_changes(self, since):
+        """Rows other instances changed after since, as (last seq, deltas)"""
+        last_seq = since
+        deltas = []
+        rows = self.db_manager.iter_change_deltas(since)
+        try:
+            # More than the limit left over is picked up on the next tick
+            for delta in islice(rows, CHANGE_POLL_LIMIT):
+                last_seq = delta["seq"]
+                # This window already shows what it wrote itself
+                if not self.db_manager.is_own_change(delta["seq"]):
+                    deltas.append(delta)
+        finally:
+            rows.close()
+        return last_seq, deltas
+
+    def on_changes(self, result):
+        last_seq, deltas = result
+        self._change_seq = max(self._change_seq, last_seq)
+        jobcards_changed = False
+        for delta in deltas:
+            table, row = delta["table"], delta["row"]
+            if table == "estimates" and self.estimates_model is not None:
+                if row is None:
+                    self.estimates_model.remove_row(delta["row_id"])
+                else:
+                    self.estimates_model.upsert_row((
+                        row["id"], row["customer_name"], row["vehicle_make"],
+                        row["vehicle_model"], row["date"],
+                        row["total_amount"], row["status"],
+                    ))
+            elif table == "inventory" and self.inventory_table is not None:
+                if row is None:
+                    self.remove_inventory_row(delta["row_id"])
+                else:
+                    self.upsert_inventory_row(row)
+            elif table == "job_cards":
+                jobcards_changed = True
+        if jobcards_changed and self.jobcards_table is not None:
+            self.refresh_jobcards_table()
+
+    def ensure_tab(self, index):
+        """Build a tab's widgets the first time it is shown"""
+        page = self.tabs.widget(index)
+        builder = self._tab_builders.pop(page, None)
+        if builder is not None:
+            page.layout().addWidget(builder())
+
+    def show_tab(self, title):
+        self.tabs.setCurrentWidget(self._tab_pages[title])
+
+    def create_busy_indicator(self):
+        # Indeterminate progress bar shown while background queries run
+        self.busy_indicator = QProgressBar()
+        self.busy_indicator.setRange(0, 0)
+        self.busy_indicator.setMaximumWidth(120)
+        self.busy_indicator.setVisible(False)
+        self.status_bar.addPermanentWidget(self.busy_indicator)
+        self.query_executor.busy_changed.connect(
+            self.busy_indicator.setVisible
+        )
 
     def create_toolbar(self):
         toolbar = QToolBar()
@@ -78,23 +201,31 @@ class MainWindow(QMainWindow):
         generate_report_action.triggered.connect(self.show_report_dialog)
         toolbar.addAction(generate_report_action)
 
+        # Query timing percentiles
+        diagnostics_action = QAction("Diagnostics", self)
+        diagnostics_action.triggered.connect(self.show_diagnostics_dialog)
+        toolbar.addAction(diagnostics_action)
+
     def create_estimates_tab(self):
         widget = QWidget()
         layout = QVBoxLayout(widget)
 
-        # Estimates table
-        self.estimates_table = QTableWidget()
-        self.estimates_table.setColumnCount(7)
-        self.estimates_table.setHorizontalHeaderLabels(
-            [
-                "ID",
-                "Customer",
-                "Vehicle",
-                "Date",
-                "Amount",
-                "Status",
-                "Actions",
-            ]
+        # Search box, debounced and executed off the UI thread
+        self.estimates_search = SearchBoxWidget(
+            "Search by customer, phone, email, vehicle or VIN..."
+        )
+        self.estimates_search.search_requested.connect(self.search_estimates)
+        layout.addWidget(self.estimates_search)
+
+        # Estimates table, backed by a model that loads pages in the
+        # background as the view scrolls
+        self.estimates_model = EstimatesTableModel(
+            self.db_manager, self, executor=self.query_executor
+        )
+        self.estimates_table = QTableView()
+        self.estimates_table.setModel(self.estimates_model)
+        self.estimates_table.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
         )
         layout.addWidget(self.estimates_table)
 
@@ -103,7 +234,7 @@ class MainWindow(QMainWindow):
         new_estimate_btn.clicked.connect(self.show_new_estimate_dialog)
         layout.addWidget(new_estimate_btn)
 
-        self.refresh_estimates_table()
+        # The view pulls the first page once it is laid out on screen
         return widget
 
     def create_inventory_tab(self):
@@ -143,6 +274,23 @@ class MainWindow(QMainWindow):
         )
         layout.addWidget(inventory_report_btn)
 
+        # Revenue and tax breakdown for the last estimates report
+        self.report_table = QTableWidget()
+        self.report_table.setColumnCount(8)
+        self.report_table.setHorizontalHeaderLabels(
+            [
+                "Date",
+                "Estimates",
+                "Subtotal",
+                "NHIL",
+                "GETFund",
+                "COVID Levy",
+                "VAT",
+                "Total",
+            ]
+        )
+        layout.addWidget(self.report_table)
+
         return widget
 
     def create_jobcard_tab(self):
@@ -172,38 +320,57 @@ class MainWindow(QMainWindow):
         button_layout.addWidget(new_jobcard_btn)
         layout.addLayout(button_layout)
 
+        self.refresh_jobcards_table()
         return widget
 
     def show_new_estimate_dialog(self):
         try:
             dialog = NewEstimateDialog(self)
             if dialog.exec():
-                self.db_manager.create_estimate(dialog.estimate_data)
-                self.refresh_estimates_table()
-                self.status_bar.showMessage(
-                    "Estimate created successfully", 3000
+                self.query_executor.submit(
+                    self.db_manager.create_estimate,
+                    dialog.estimate_data,
+                    return_row=True,
+                    on_result=self.on_estimate_created,
+                    on_error=self.on_estimate_failed,
                 )
-                logging.info("New estimate created successfully")
         except Exception as e:
-            error_msg = f"Failed to create estimate: {str(e)}"
-            logging.error(error_msg)
-            self.status_bar.showMessage(error_msg, 5000)
-            QMessageBox.critical(self, "Error", error_msg)
+            self.on_estimate_failed(str(e))
+
+    def on_estimate_created(self, estimate_row):
+        if self.estimates_model is not None:
+            self.estimates_model.upsert_row(estimate_row)
+        self.status_bar.showMessage("Estimate created successfully", 3000)
+        logging.info("New estimate created successfully")
+
+    def on_estimate_failed(self, error):
+        error_msg = f"Failed to create estimate: {error}"
+        logging.error(error_msg)
+        self.status_bar.showMessage(error_msg, 5000)
+        QMessageBox.critical(self, "Error", error_msg)
 
     def show_new_inventory_dialog(self):
         dialog = InventoryItemDialog(self)
         if dialog.exec():
             item_data = dialog.get_data()
-            try:
-                self.db_manager.update_inventory(item_data)
-                self.refresh_inventory_table()
-                self.status_bar.showMessage(
-                    "Inventory updated successfully", 3000
-                )
-            except Exception as e:
-                QMessageBox.critical(
-                    self, "Error", f"Failed to update inventory: {str(e)}"
-                )
+            self.query_executor.submit(
+                self.db_manager.update_inventory,
+                item_data,
+                return_row=True,
+                on_result=self.on_inventory_updated,
+                on_error=lambda error: QMessageBox.critical(
+                    self, "Error", f"Failed to update inventory: {error}"
+                ),
+            )
+
+    def on_inventory_updated(self, item):
+        if not item:
+            QMessageBox.critical(self, "Error", "Failed to update inventory")
+            return
+        # An unbuilt inventory tab loads the new item when first shown
+        if self.inventory_table is not None:
+            self.upsert_inventory_row(item)
+        self.status_bar.showMessage("Inventory updated successfully", 3000)
 
     def show_report_dialog(self, report_type=None):
         dialog = ReportDialog(self)
@@ -213,27 +380,43 @@ class MainWindow(QMainWindow):
             report_data = dialog.get_data()
             self.generate_report(report_data)
 
+    def show_diagnostics_dialog(self):
+        DiagnosticsDialog(self.db_manager, self).exec()
+
     def show_new_jobcard_dialog(self):
         """Show dialog to create new job card"""
         dialog = JobCardDialog(self)
         if dialog.exec():
             jobcard_data = dialog.get_data()
-            try:
-                self.db_manager.add_jobcard(jobcard_data)
-                self.refresh_jobcards_table()
-                self.status_bar.showMessage(
-                    "Job card created successfully", 3000
-                )
-            except Exception as e:
-                QMessageBox.critical(
-                    self, "Error", f"Failed to create job card: {str(e)}"
-                )
+            self.query_executor.submit(
+                self.db_manager.add_jobcard,
+                jobcard_data,
+                on_result=self.on_jobcard_created,
+                on_error=lambda error: QMessageBox.critical(
+                    self, "Error", f"Failed to create job card: {error}"
+                ),
+            )
+
+    def on_jobcard_created(self, jobcard_id):
+        if self.jobcards_table is not None:
+            self.refresh_jobcards_table()
+        self.status_bar.showMessage("Job card created successfully", 3000)
 
     def refresh_jobcards_table(self):
         """Refresh job cards table with latest data"""
+        # A newer refresh supersedes one still in flight
+        self.query_executor.submit(
+            self.db_manager.get_jobcards,
+            key="jobcards",
+            on_result=self.populate_jobcards_table,
+            on_error=lambda error: self.status_bar.showMessage(
+                f"Error loading job cards: {error}", 5000
+            ),
+        )
+
+    def populate_jobcards_table(self, jobcards):
         self.jobcards_table.setRowCount(0)
         try:
-            jobcards = self.db_manager.get_jobcards()
             for row, jobcard in enumerate(jobcards):
                 self.jobcards_table.insertRow(row)
                 self.jobcards_table.setItem(
@@ -261,53 +444,147 @@ class MainWindow(QMainWindow):
 
     def refresh_estimates_table(self):
         try:
-            estimates = self.db_manager.get_all_estimates()
-            self.estimates_table.setRowCount(0)
-            for row, estimate in enumerate(estimates):
-                self.estimates_table.insertRow(row)
-                for col, value in enumerate(estimate):
-                    self.estimates_table.setItem(
-                        row, col, QTableWidgetItem(str(value))
-                    )
+            self.estimates_model.refresh()
         except Exception as e:
             error_msg = f"Failed to refresh estimates: {str(e)}"
             logging.error(error_msg)
             self.status_bar.showMessage(error_msg, 5000)
 
+    def search_estimates(self, text):
+        if not text.strip():
+            self.query_executor.cancel("estimates_search")
+            self.refresh_estimates_table()
+            return
+        # Each keystroke pause supersedes the previous search
+        self.query_executor.submit(
+            self.db_manager.search_estimates,
+            text,
+            key="estimates_search",
+            on_result=self.on_search_finished,
+            on_error=lambda error: self.status_bar.showMessage(
+                f"Search failed: {error}", 5000
+            ),
+        )
+
+    def on_search_finished(self, rows):
+        self.estimates_model.set_rows(rows)
+        self.status_bar.showMessage(f"{len(rows)} matching estimates", 3000)
+
     def refresh_inventory_table(self):
+        self.query_executor.submit(
+            self.db_manager.get_inventory_items,
+            key="inventory",
+            on_result=self.populate_inventory_table,
+            on_error=lambda error: self.status_bar.showMessage(
+                f"Error loading inventory: {error}", 5000
+            ),
+        )
+
+    def populate_inventory_table(self, inventory_items):
         self.inventory_table.setRowCount(0)
         try:
-            inventory_items = self.db_manager.get_inventory_items()
             for row, item in enumerate(inventory_items):
                 self.inventory_table.insertRow(row)
-                self.inventory_table.setItem(
-                    row, 0, QTableWidgetItem(item["item_code"])
-                )
-                self.inventory_table.setItem(
-                    row, 1, QTableWidgetItem(item["description"])
-                )
-                self.inventory_table.setItem(
-                    row, 2, QTableWidgetItem(str(item["quantity"]))
-                )
-                self.inventory_table.setItem(
-                    row, 3, QTableWidgetItem(f"${item['unit_price']:.2f}")
-                )
+                self.set_inventory_row(row, item)
         except Exception as e:
             error_message = f"Error loading inventory: {str(e)}"
             self.status_bar.showMessage(error_message, 5000)
 
+    def set_inventory_row(self, row, item):
+        code_item = QTableWidgetItem(item["item_code"])
+        code_item.setData(Qt.ItemDataRole.UserRole, item.get("item_id"))
+        self.inventory_table.setItem(row, 0, code_item)
+        self.inventory_table.setItem(
+            row, 1, QTableWidgetItem(item["description"])
+        )
+        self.inventory_table.setItem(
+            row, 2, QTableWidgetItem(str(item["quantity"]))
+        )
+        self.inventory_table.setItem(
+            row, 3, QTableWidgetItem(f"${item['unit_price']:.2f}")
+        )
+
+    def remove_inventory_row(self, item_id):
+        """Drop the row of a deleted item, found by the item_id it keeps"""
+        for row in range(self.inventory_table.rowCount()):
+            cell = self.inventory_table.item(row, 0)
+            if cell.data(Qt.ItemDataRole.UserRole) == item_id:
+                self.inventory_table.removeRow(row)
+                return
+
+    def upsert_inventory_row(self, item):
+        """Update or insert one item, keeping the item_code sort order"""
+        # Binary search on the item code column, which the table is sorted by
+        low, high = 0, self.inventory_table.rowCount()
+        while low < high:
+            middle = (low + high) // 2
+            if self.inventory_table.item(middle, 0).text() < item["item_code"]:
+                low = middle + 1
+            else:
+                high = middle
+        existing = self.inventory_table.item(low, 0)
+        if existing is None or existing.text() != item["item_code"]:
+            self.inventory_table.insertRow(low)
+        self.set_inventory_row(low, item)
+
     def generate_report(self, report_data):
         try:
-            # This would be implemented based on your specific reporting needs
             report_message = (
                 f"Generating {report_data['report_type']} report..."
             )
             self.status_bar.showMessage(report_message, 3000)
+            on_error = lambda error: QMessageBox.critical(
+                self, "Error", f"Failed to generate report: {error}"
+            )
+            if report_data['report_type'] == "Estimates":
+                self.query_executor.submit(
+                    self.db_manager.get_revenue_report,
+                    report_data['date_from'].isoformat(),
+                    report_data['date_to'].isoformat(),
+                    key="revenue_report",
+                    on_result=self.populate_report_table,
+                    on_error=on_error,
+                )
+            else:
+                # fpdf is only loaded the first time a PDF is produced
+                from utils.pdf_generator import PDFGenerator
+
+                self.query_executor.submit(
+                    lambda: PDFGenerator().generate_inventory_report_stream(
+                        self.db_manager.iter_inventory_items()
+                    ),
+                    on_result=lambda filename: self.status_bar.showMessage(
+                        f"Inventory report saved to {filename}", 5000
+                    ),
+                    on_error=on_error,
+                )
         except Exception as e:
             QMessageBox.critical(
                 self, "Error", f"Failed to generate report: {str(e)}"
             )
 
+    def populate_report_table(self, report):
+        self.show_tab("Reports")
+        rows = report['daily'] + [dict(report['totals'], date="Total")]
+        self.report_table.setRowCount(len(rows))
+        for row, day in enumerate(rows):
+            self.report_table.setItem(row, 0, QTableWidgetItem(day['date']))
+            self.report_table.setItem(
+                row, 1, QTableWidgetItem(str(day['estimate_count']))
+            )
+            for col, key in enumerate(
+                ('subtotal', 'nhil', 'getfund', 'covid_levy', 'vat',
+                 'total_amount'),
+                start=2,
+            ):
+                self.report_table.setItem(
+                    row, col, QTableWidgetItem(f"${day[key]:.2f}")
+                )
+        self.status_bar.showMessage(
+            f"Report ready: {report['totals']['estimate_count']} estimates",
+            3000,
+        )
+
     def create_estimate(self):
         try:
             dialog = NewEstimateDialog(self)
@@ -317,11 +594,17 @@ class MainWindow(QMainWindow):
                 if 'subtotal' not in dialog.estimate_data:
                     raise ValueError("Subtotal is required")
                 
-                self.db_manager.create_estimate(dialog.estimate_data)
-                self.refresh_estimates_table()
-                self.status_bar.showMessage("Estimate created successfully", 3000)
+                self.query_executor.submit(
+                    self.db_manager.create_estimate,
+                    dialog.estimate_data,
+                    return_row=True,
+                    on_result=self.on_estimate_created,
+                    on_error=self.on_estimate_failed,
+                )
         except Exception as e:
-            error_msg = f"Failed to create estimate: {str(e)}"
-            logging.error(error_msg)
-            self.status_bar.showMessage(error_msg, 5000)
-            QMessageBox.critical(self, "Error", error_msg)
+            self.on_estimate_failed(str(e))
+
+    def closeEvent(self, event):
+        # Let queued writes finish before the window goes away
+        self.query_executor.wait_for_done(5000)
+        super().closeEvent(event)
@@ -0,0 +1,238 @@
+import logging
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from database.db_manager import DatabaseManager
+
+
+class EstimatesTableModel(QAbstractTableModel):
+    """Lazily populated table model for the estimates list"""
+
+    HEADERS = ["ID", "Customer", "Vehicle", "Date", "Amount", "Status"]
+    PAGE_SIZE = 200
+    PAGE_REQUEST = "estimates_page"
+
+    def __init__(self, db_manager: DatabaseManager, parent=None,
+                 executor=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        # QueryExecutor that loads pages off the GUI thread; without one
+        # pages are fetched synchronously
+        self.executor = executor
+        # True while a page request is running on the executor
+        self._fetching = False
+        self._rows = []
+        # estimate id -> (date, id) sort key of every loaded row, so a row
+        # is found by bisecting instead of scanning
+        self._keys = {}
+        # estimate id -> position, for fixed result sets in search order
+        self._positions = {}
+        self._exhausted = False
+        # True while showing a fixed result set such as search hits
+        self._fixed = False
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        (estimate_id, customer, make, model,
+         date, amount, status) = self._rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return str(estimate_id)
+        if column == 1:
+            return customer
+        if column == 2:
+            return f"{make} {model}"
+        if column == 3:
+            return date
+        if column == 4:
+            return f"${amount:.2f}"
+        return status
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._exhausted and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._fetching:
+            return
+        after = None
+        if self._rows:
+            last = self._rows[-1]
+            after = (last[4], last[0])
+        if self.executor is None:
+            try:
+                page = self.db_manager.get_estimates_page(after, self.PAGE_SIZE)
+            except Exception as e:
+                self._on_page_failed(str(e))
+                return
+            self._append_page(page)
+            return
+        # The view asks again once the rows arrive and it still has room
+        self._fetching = True
+        self.executor.submit(
+            self.db_manager.get_estimates_page,
+            after,
+            self.PAGE_SIZE,
+            key=self.PAGE_REQUEST,
+            on_result=self._append_page,
+            on_error=self._on_page_failed,
+        )
+
+    def _append_page(self, page):
+        self._fetching = False
+        if len(page) < self.PAGE_SIZE:
+            self._exhausted = True
+        # Skip rows an upsert already placed while the page was loading
+        page = [tuple(row) for row in page if row[0] not in self._keys]
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self._keys.update((row[0], (row[4], row[0])) for row in page)
+        self.endInsertRows()
+
+    def _on_page_failed(self, error):
+        logging.error(f"Failed to fetch estimates page: {error}")
+        self._fetching = False
+        self._exhausted = True
+
+    def _cancel_fetch(self):
+        if self._fetching:
+            self.executor.cancel(self.PAGE_REQUEST)
+            self._fetching = False
+
+    def set_rows(self, rows):
+        """Show a fixed result set, such as search hits, without paging"""
+        self._cancel_fetch()
+        self.beginResetModel()
+        self._rows = [tuple(row) for row in rows]
+        self._keys = {row[0]: (row[4], row[0]) for row in self._rows}
+        self._positions = {
+            row[0]: position for position, row in enumerate(self._rows)
+        }
+        self._exhausted = True
+        self._fixed = True
+        self.endResetModel()
+
+    def upsert_row(self, row):
+        """
+        Insert, update or move a single row in place
+
+        Only the affected row is signalled to the view, so selection and
+        scroll position survive. Rows that now sort beyond the loaded
+        window are left for fetchMore (and dropped if they were loaded),
+        and search results are only updated, never extended.
+        """
+        row = tuple(row)
+        old_position = self._find_row(row[0])
+        if old_position is None:
+            if self._fixed:
+                return
+            position = self._sorted_position((row[4], row[0]))
+            if position == len(self._rows) and not self._exhausted:
+                return
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._rows.insert(position, row)
+            self._keys[row[0]] = (row[4], row[0])
+            self.endInsertRows()
+            return
+
+        old_row = self._rows.pop(old_position)
+        position = old_position
+        if not self._fixed and (old_row[4], old_row[0]) != (row[4], row[0]):
+            position = self._sorted_position((row[4], row[0]))
+            if position == len(self._rows) and not self._exhausted:
+                # Its page is not loaded yet; fetchMore brings it back
+                self._rows.insert(old_position, old_row)
+                self.remove_row(row[0])
+                return
+        self._keys[row[0]] = (row[4], row[0])
+        if position == old_position:
+            self._rows.insert(position, row)
+            self.dataChanged.emit(
+                self.index(position, 0),
+                self.index(position, self.columnCount() - 1),
+            )
+            return
+        # Qt expects the destination as an index into the pre-move list
+        destination = position + 1 if position > old_position else position
+        self._rows.insert(old_position, old_row)
+        self.beginMoveRows(
+            QModelIndex(), old_position, old_position,
+            QModelIndex(), destination,
+        )
+        del self._rows[old_position]
+        self._rows.insert(position, row)
+        self.endMoveRows()
+        self.dataChanged.emit(
+            self.index(position, 0),
+            self.index(position, self.columnCount() - 1),
+        )
+
+    def remove_row(self, estimate_id):
+        """Drop one row, e.g. after another instance deleted it"""
+        position = self._find_row(estimate_id)
+        if position is None:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self._rows[position]
+        del self._keys[estimate_id]
+        if self._fixed:
+            self._positions = {
+                row[0]: index for index, row in enumerate(self._rows)
+            }
+        self.endRemoveRows()
+
+    def _find_row(self, estimate_id):
+        if self._fixed:
+            return self._positions.get(estimate_id)
+        key = self._keys.get(estimate_id)
+        if key is None:
+            return None
+        # (date, id) keys are unique, so the row sits where its key sorts
+        return self._sorted_position(key)
+
+    def _sorted_position(self, key):
+        # Rows are ordered by (date, id) descending
+        low, high = 0, len(self._rows)
+        while low < high:
+            middle = (low + high) // 2
+            existing = self._rows[middle]
+            if (existing[4], existing[0]) > key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def refresh(self):
+        """Drop loaded rows and fetch the first page again"""
+        self._cancel_fetch()
+        self.beginResetModel()
+        self._rows = []
+        self._keys = {}
+        self._positions = {}
+        self._exhausted = False
+        self._fixed = False
+        self.endResetModel()
+        self.fetchMore()
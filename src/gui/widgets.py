@@ -1,4 +1,4 @@
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtWidgets import (
     QDoubleSpinBox,
     QHBoxLayout,
@@ -13,6 +13,8 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from models.money import Money
+
 
 class ServiceTableWidget(QTableWidget):
     """Custom table widget for managing services"""
@@ -38,26 +40,29 @@ class ServiceTableWidget(QTableWidget):
 
         if service_data:
             self.setItem(row, 0, QTableWidgetItem(service_data["description"]))
-            self.setItem(
-                row, 1, QTableWidgetItem(f"${service_data['parts_cost']:.2f}")
-            )
-            self.setItem(
-                row, 2, QTableWidgetItem(f"${service_data['labor_cost']:.2f}")
-            )
-            self.setItem(
-                row, 3, QTableWidgetItem(f"${service_data['total_cost']:.2f}")
-            )
+            for col, key in enumerate(
+                ("parts_cost", "labor_cost", "total_cost"), start=1
+            ):
+                self.setItem(row, col, self.money_item(service_data[key]))
 
         self.service_changed.emit()
 
+    @staticmethod
+    def money_item(amount):
+        # Keep the exact amount on the item so it never has to be re-parsed
+        amount = Money.from_decimal(amount)
+        item = QTableWidgetItem(f"${amount:.2f}")
+        item.setData(Qt.ItemDataRole.UserRole, amount)
+        return item
+
     def get_all_services(self):
         services = []
         for row in range(self.rowCount()):
             service = {
                 "description": self.item(row, 0).text(),
-                "parts_cost": float(self.item(row, 1).text().replace("$", "")),
-                "labor_cost": float(self.item(row, 2).text().replace("$", "")),
-                "total_cost": float(self.item(row, 3).text().replace("$", "")),
+                "parts_cost": self.item(row, 1).data(Qt.ItemDataRole.UserRole),
+                "labor_cost": self.item(row, 2).data(Qt.ItemDataRole.UserRole),
+                "total_cost": self.item(row, 3).data(Qt.ItemDataRole.UserRole),
             }
             services.append(service)
         return services
@@ -149,9 +154,17 @@ class SearchBoxWidget(QWidget):
     """Custom search box with clear button"""
 
     search_changed = pyqtSignal(str)
+    # Emitted once typing pauses for debounce_ms
+    search_requested = pyqtSignal(str)
 
-    def __init__(self, placeholder="Search...", parent=None):
+    def __init__(self, placeholder="Search...", parent=None, debounce_ms=250):
         super().__init__(parent)
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(
+            lambda: self.search_requested.emit(self.text())
+        )
         self.setup_ui(placeholder)
 
     def setup_ui(self, placeholder):
@@ -161,6 +174,9 @@ class SearchBoxWidget(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText(placeholder)
         self.search_input.textChanged.connect(self.search_changed.emit)
+        self.search_input.textChanged.connect(
+            lambda _text: self.debounce_timer.start()
+        )
 
         self.clear_button = QPushButton("×")
         self.clear_button.setFixedSize(20, 20)
@@ -197,3 +213,10 @@ class MoneySpinBox(QDoubleSpinBox):
         self.setAlignment(Qt.AlignmentFlag.AlignRight)
         self.setButtonSymbols(QDoubleSpinBox.ButtonSymbols.PlusMinus)
 
+    def money(self):
+        """Current value as an exact Money amount"""
+        return Money.from_decimal(self.value())
+
+    def set_money(self, amount):
+        self.setValue(float(Money.from_decimal(amount)))
+
@@ -0,0 +1,118 @@
+import logging
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class QuerySignals(QObject):
+    """Signals emitted by a QueryRunnable back on the GUI thread"""
+
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class QueryRunnable(QRunnable):
+    """Run a database call on a QThreadPool worker thread"""
+
+    def __init__(self, request_id, func, *args, **kwargs):
+        super().__init__()
+        self.request_id = request_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = QuerySignals()
+
+    def run(self):
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            logging.error(f"Background query failed: {str(e)}")
+            self.signals.failed.emit(self.request_id, str(e))
+            return
+        self.signals.finished.emit(self.request_id, result)
+
+
+class QueryExecutor(QObject):
+    """
+    Runs DatabaseManager calls off the GUI thread
+
+    Worker threads get their own SQLite connection from DatabaseManager's
+    per-thread connection layer. Requests submitted with a key supersede
+    any earlier request with the same key: a queued one is dropped and a
+    running one has its result discarded.
+    """
+
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, max_threads=2):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        # Keep the workers for the whole session: each holds a database
+        # connection, and retired threads would leave theirs behind
+        self.pool.setExpiryTimeout(-1)
+        self._next_request_id = 0
+        # request_id -> (key, runnable, on_result, on_error)
+        self._pending = {}
+        # key -> request_id of the newest request for that key
+        self._latest = {}
+        self._busy = False
+
+    def submit(self, func, *args, key=None, on_result=None, on_error=None,
+               **kwargs):
+        """Queue func(*args, **kwargs) and return its request id"""
+        if key is not None:
+            self.cancel(key)
+        self._next_request_id += 1
+        request_id = self._next_request_id
+        runnable = QueryRunnable(request_id, func, *args, **kwargs)
+        runnable.signals.finished.connect(self._on_finished)
+        runnable.signals.failed.connect(self._on_failed)
+        self._pending[request_id] = (key, runnable, on_result, on_error)
+        if key is not None:
+            self._latest[key] = request_id
+        self.pool.start(runnable)
+        self._update_busy()
+        return request_id
+
+    def cancel(self, key):
+        """Cancel the outstanding request submitted under key, if any"""
+        request_id = self._latest.pop(key, None)
+        if request_id is None:
+            return
+        entry = self._pending.pop(request_id, None)
+        if entry is not None:
+            # Only succeeds if the runnable has not started yet
+            self.pool.tryTake(entry[1])
+        self._update_busy()
+
+    def is_busy(self):
+        return bool(self._pending)
+
+    def wait_for_done(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def _take(self, request_id):
+        entry = self._pending.pop(request_id, None)
+        if entry is None:
+            return None
+        key = entry[0]
+        if key is not None and self._latest.get(key) == request_id:
+            del self._latest[key]
+        self._update_busy()
+        return entry
+
+    def _on_finished(self, request_id, result):
+        entry = self._take(request_id)
+        if entry is not None and entry[2] is not None:
+            entry[2](result)
+
+    def _on_failed(self, request_id, error):
+        entry = self._take(request_id)
+        if entry is not None and entry[3] is not None:
+            entry[3](error)
+
+    def _update_busy(self):
+        busy = self.is_busy()
+        if busy != self._busy:
+            self._busy = busy
+            self.busy_changed.emit(busy)
@@ -1,15 +1,16 @@
+import argparse
 import logging
 import sys
 import os
 from datetime import datetime
 from pathlib import Path
 
-from PyQt6.QtWidgets import QApplication
-
-from database.db_manager import DatabaseManager
-from gui.main_window import MainWindow
 from utils.config import load_config
 from utils.logger import setup_logger
+from utils.profiling import StartupProfiler
+
+# PyQt6, the database layer and the GUI are imported inside the functions
+# that need them so --startup-profile can time each import separately
 
 # Configure application constants
 APP_NAME = "Car Management System"
@@ -42,10 +43,40 @@ def setup_environment():
     return config
 
 
+def parse_args(argv):
+    """Split our own switches from the arguments passed on to Qt"""
+    parser = argparse.ArgumentParser(prog="car-manager", add_help=False)
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="print how long each startup phase took",
+    )
+    return parser.parse_known_args(argv[1:])
+
+
 def initialize_database(config: dict):
     """Initialize database connection"""
+    from database.db_manager import DatabaseManager
+    from database.diagnostics import DEFAULT_SLOW_QUERY_MS
+
     try:
         db_config = config.get('database', {})
+        server_url = db_config.get('server_url')
+        if server_url:
+            # Another machine owns the database; talk to its API server
+            from api.client import RemoteDatabaseManager
+
+            db_manager = RemoteDatabaseManager(
+                server_url,
+                slow_query_ms=db_config.get(
+                    'slow_query_ms', DEFAULT_SLOW_QUERY_MS
+                ),
+                token=db_config.get('server_token'),
+            )
+            db_manager.initialize_tables()
+            logging.info(f"Using database server at: {server_url}")
+            return db_manager
+
         db_path = os.path.join(
             db_config.get('path', 'data'),
             db_config.get('name', 'car_management.db')
@@ -54,7 +85,13 @@ def initialize_database(config: dict):
         # Create data directory
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
-        db_manager = DatabaseManager(db_path)
+        db_manager = DatabaseManager(
+            db_path,
+            pragmas=db_config.get('pragmas'),
+            cache_size=db_config.get('estimate_cache_size', 256),
+            slow_query_ms=db_config.get('slow_query_ms', DEFAULT_SLOW_QUERY_MS),
+            write_queue=db_config.get('write_queue'),
+        )
         db_manager.initialize_tables()
         logging.info(f"Database initialized at: {db_path}")
         return db_manager
@@ -64,9 +101,11 @@ def initialize_database(config: dict):
         raise
 
 
-def setup_application():
+def setup_application(argv=None):
     """Setup Qt application with configurations"""
-    app = QApplication(sys.argv)
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication(argv if argv is not None else sys.argv)
     app.setApplicationName(APP_NAME)
     app.setApplicationVersion(APP_VERSION)
 
@@ -81,20 +120,43 @@ def setup_application():
 
 def main():
     """Main application entry point"""
+    args, qt_args = parse_args(sys.argv)
+    profiler = StartupProfiler()
     try:
         # Setup environment and logging
-        config = setup_environment()
+        with profiler.phase("config and logging"):
+            config = setup_environment()
         logging.info(f"Starting {APP_NAME} v{APP_VERSION}")
 
         # Initialize Qt Application
-        app = setup_application()
+        with profiler.phase("import PyQt6"):
+            import PyQt6.QtWidgets
+        with profiler.phase("create QApplication"):
+            app = setup_application(sys.argv[:1] + qt_args)
 
         # Initialize database
-        db_manager = initialize_database(config)
-
-        # Create and show main window
-        main_window = MainWindow(db_manager)
-        main_window.show()
+        with profiler.phase("import database layer"):
+            import database.db_manager
+        with profiler.phase("open and migrate database"):
+            db_manager = initialize_database(config)
+
+        # Create and show main window; tabs and their data load lazily
+        with profiler.phase("import GUI"):
+            from gui.main_window import MainWindow
+        with profiler.phase("build main window"):
+            main_window = MainWindow(db_manager)
+        with profiler.phase("show main window"):
+            main_window.show()
+
+        if args.startup_profile:
+            from PyQt6.QtCore import QTimer
+
+            def print_profile():
+                profiler.mark("first event loop pass")
+                print(profiler.report())
+
+            # Runs once the event loop has painted the window
+            QTimer.singleShot(0, print_profile)
 
         # Start application event loop
         exit_code = app.exec()
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional
+
+from .validation import BatchValidation, validate_cars
 
 
 @dataclass
@@ -75,6 +77,12 @@ class Car:
             )
         return cls(**data)
 
+    @classmethod
+    def validate_many(cls, rows: Iterable[dict],
+                      check_digit: bool = True) -> BatchValidation:
+        """Validate many car dicts at once, reporting errors per row"""
+        return validate_cars(rows, check_digit=check_digit)
+
     def get_full_name(self) -> str:
         """Get full car name (year make model)"""
         return f"{self.year} {self.make} {self.model}"
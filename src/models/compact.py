@@ -0,0 +1,301 @@
+"""Memory-compact representations of Car and Customer collections"""
+
+import dataclasses
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from .car import Car
+from .customer import Customer
+from .optional import numpy
+
+# Sentinel stored in integer columns for a missing value
+MISSING = -(2 ** 63)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(value: Optional[datetime]) -> int:
+    """Datetime to int64 epoch seconds, MISSING for None
+
+    Naive datetimes are taken as-is (no local timezone conversion) so the
+    round trip through from_epoch is exact to the second.
+    """
+    if value is None:
+        return MISSING
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(seconds=1)
+
+
+def from_epoch(value: int) -> Optional[datetime]:
+    """Inverse of to_epoch"""
+    if value == MISSING:
+        return None
+    return _EPOCH + timedelta(seconds=value)
+
+
+def _optional_int(value: Optional[int]) -> int:
+    return MISSING if value is None else value
+
+
+def _numpy_column(column: array):
+    """Zero-copy int64/int16 NumPy view of an array column"""
+    np = numpy()
+    if np is None:
+        raise RuntimeError("NumPy is not installed")
+    return np.frombuffer(column, dtype=np.dtype(column.typecode))
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    # Makes, models and colours repeat heavily across a fleet
+    return sys.intern(value) if value is not None else None
+
+
+def slotted_dataclass(cls: type, name: str) -> type:
+    """
+    Copy a dataclass into an equivalent class that uses __slots__
+
+    Python 3.9 has no dataclass(slots=True), so this does the same thing:
+    the generated __init__ already carries the field defaults, so the
+    class attributes holding them can be dropped in favour of slots.
+    """
+    field_names = tuple(field.name for field in dataclasses.fields(cls))
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in field_names and key not in ('__dict__', '__weakref__')
+    }
+    namespace['__slots__'] = field_names
+    namespace['__qualname__'] = name
+    return type(cls)(name, cls.__bases__, namespace)
+
+
+# Drop-in variants without a per-instance __dict__
+SlottedCar = slotted_dataclass(Car, 'SlottedCar')
+SlottedCustomer = slotted_dataclass(Customer, 'SlottedCustomer')
+
+
+class CarTable:
+    """Columnar collection of cars
+
+    Numeric fields live in typed ``array`` columns and dates as int64
+    epoch seconds, so a fleet costs a few bytes per field instead of a
+    Python object per car. Rows convert to and from the Car.to_dict
+    format and Car objects.
+    """
+
+    def __init__(self):
+        self.make: List[str] = []
+        self.model: List[str] = []
+        self.year = array('h')
+        self.vin: List[Optional[str]] = []
+        self.mileage = array('q')
+        self.color: List[Optional[str]] = []
+        self.license_plate: List[Optional[str]] = []
+        self.last_service_date = array('q')
+
+    def __len__(self) -> int:
+        return len(self.year)
+
+    def append(self, car: Union[Car, Dict]) -> None:
+        """Add a Car, or a dict in Car.to_dict format (not re-validated)"""
+        if isinstance(car, dict):
+            car = _CarRow(car)
+        self.make.append(_intern(car.make))
+        self.model.append(_intern(car.model))
+        self.year.append(car.year)
+        self.vin.append(car.vin)
+        self.mileage.append(_optional_int(car.mileage))
+        self.color.append(_intern(car.color))
+        self.license_plate.append(car.license_plate)
+        self.last_service_date.append(to_epoch(car.last_service_date))
+
+    def extend(self, cars: Iterable[Union[Car, Dict]]) -> None:
+        for car in cars:
+            self.append(car)
+
+    @classmethod
+    def from_cars(cls, cars: Iterable[Car]) -> 'CarTable':
+        table = cls()
+        table.extend(cars)
+        return table
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[Dict]) -> 'CarTable':
+        table = cls()
+        table.extend(rows)
+        return table
+
+    def numpy(self, name: str):
+        """NumPy view of year, mileage or last_service_date"""
+        return _numpy_column(getattr(self, name))
+
+    def row_dict(self, index: int) -> Dict:
+        """Row in Car.to_dict format"""
+        mileage = self.mileage[index]
+        last_service = from_epoch(self.last_service_date[index])
+        return {
+            'make': self.make[index],
+            'model': self.model[index],
+            'year': self.year[index],
+            'vin': self.vin[index],
+            'mileage': None if mileage == MISSING else mileage,
+            'color': self.color[index],
+            'license_plate': self.license_plate[index],
+            'last_service_date': (
+                last_service.isoformat() if last_service else None
+            ),
+        }
+
+    def to_dicts(self) -> Iterator[Dict]:
+        for index in range(len(self)):
+            yield self.row_dict(index)
+
+    def __getitem__(self, index: int) -> Car:
+        return Car.from_dict(self.row_dict(index))
+
+    def __iter__(self) -> Iterator[Car]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+class CustomerTable:
+    """Columnar collection of customers
+
+    Dates are int64 epoch seconds. Visit histories are flattened into one
+    ``visits`` array with ``visit_offsets`` marking where each customer's
+    visits start (customer i owns visits[offsets[i]:offsets[i + 1]]).
+    """
+
+    def __init__(self):
+        self.name: List[str] = []
+        self.phone: List[Optional[str]] = []
+        self.email: List[Optional[str]] = []
+        self.address: List[Optional[str]] = []
+        self.notes: List[Optional[str]] = []
+        self.created_date = array('q')
+        self.last_visit = array('q')
+        self.visits = array('q')
+        self.visit_offsets = array('q', [0])
+
+    def __len__(self) -> int:
+        return len(self.created_date)
+
+    def append(self, customer: Union[Customer, Dict]) -> None:
+        """Add a Customer, or a dict in Customer.to_dict format"""
+        if isinstance(customer, dict):
+            customer = _CustomerRow(customer)
+        self.name.append(customer.name)
+        self.phone.append(customer.phone)
+        self.email.append(customer.email)
+        self.address.append(customer.address)
+        self.notes.append(customer.notes)
+        self.created_date.append(to_epoch(customer.created_date))
+        self.last_visit.append(to_epoch(customer.last_visit))
+        self.visits.extend(to_epoch(visit) for visit in customer.visit_history)
+        self.visit_offsets.append(len(self.visits))
+
+    def extend(self, customers: Iterable[Union[Customer, Dict]]) -> None:
+        for customer in customers:
+            self.append(customer)
+
+    @classmethod
+    def from_customers(cls, customers: Iterable[Customer]) -> 'CustomerTable':
+        table = cls()
+        table.extend(customers)
+        return table
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[Dict]) -> 'CustomerTable':
+        table = cls()
+        table.extend(rows)
+        return table
+
+    def numpy(self, name: str):
+        """NumPy view of created_date, last_visit, visits or visit_offsets"""
+        return _numpy_column(getattr(self, name))
+
+    def visit_history(self, index: int) -> array:
+        """Epoch-second visit timestamps for one customer"""
+        start, end = self.visit_offsets[index], self.visit_offsets[index + 1]
+        return self.visits[start:end]
+
+    def visit_count(self, index: int) -> int:
+        return self.visit_offsets[index + 1] - self.visit_offsets[index]
+
+    def row_dict(self, index: int) -> Dict:
+        """Row in Customer.to_dict format"""
+        last_visit = from_epoch(self.last_visit[index])
+        return {
+            'name': self.name[index],
+            'phone': self.phone[index],
+            'email': self.email[index],
+            'address': self.address[index],
+            'notes': self.notes[index],
+            'created_date': from_epoch(self.created_date[index]).isoformat(),
+            'last_visit': last_visit.isoformat() if last_visit else None,
+            'visit_history': [
+                from_epoch(visit).isoformat()
+                for visit in self.visit_history(index)
+            ],
+        }
+
+    def to_dicts(self) -> Iterator[Dict]:
+        for index in range(len(self)):
+            yield self.row_dict(index)
+
+    def __getitem__(self, index: int) -> Customer:
+        return Customer.from_dict(self.row_dict(index))
+
+    def __iter__(self) -> Iterator[Customer]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+class _CarRow:
+    """Attribute view over a Car.to_dict row, parsing its dates"""
+
+    __slots__ = (
+        'make', 'model', 'year', 'vin', 'mileage', 'color',
+        'license_plate', 'last_service_date',
+    )
+
+    def __init__(self, data: Dict):
+        self.make = data['make']
+        self.model = data['model']
+        self.year = data['year']
+        self.vin = data.get('vin')
+        self.mileage = data.get('mileage')
+        self.color = data.get('color')
+        self.license_plate = data.get('license_plate')
+        self.last_service_date = _parse_datetime(data.get('last_service_date'))
+
+
+class _CustomerRow:
+    """Attribute view over a Customer.to_dict row, parsing its dates"""
+
+    __slots__ = (
+        'name', 'phone', 'email', 'address', 'notes', 'created_date',
+        'last_visit', 'visit_history',
+    )
+
+    def __init__(self, data: Dict):
+        self.name = data['name']
+        self.phone = data.get('phone')
+        self.email = data.get('email')
+        self.address = data.get('address')
+        self.notes = data.get('notes')
+        self.created_date = (
+            _parse_datetime(data.get('created_date')) or datetime.now()
+        )
+        self.last_visit = _parse_datetime(data.get('last_visit'))
+        self.visit_history = [
+            _parse_datetime(visit) for visit in data.get('visit_history', [])
+        ]
@@ -1,8 +1,11 @@
-import re
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from datetime import datetime
 
+from .validation import (
+    EMAIL_PATTERN, BatchValidation, format_phone, validate_customers
+)
+
 
 @dataclass
 class Customer:
@@ -34,23 +37,22 @@ class Customer:
 
     def validate_phone(self):
         """Validate phone number format"""
-        # Remove any non-numeric characters
-        phone = re.sub(r'\D', '', self.phone)
-        if len(phone) < 10 or len(phone) > 15:
+        phone = format_phone(self.phone)
+        if phone is None:
             raise ValueError("Invalid phone number length")
-        # Format phone number as (XXX) XXX-XXXX
-        if len(phone) == 10:
-            self.phone = f"({phone[:3]}) {phone[3:6]}-{phone[6:]}"
-        else:
-            self.phone = phone
+        self.phone = phone
 
     def validate_email(self):
         """Validate email format"""
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, self.email):
+        if not EMAIL_PATTERN.match(self.email):
             raise ValueError("Invalid email format")
         self.email = self.email.lower()
 
+    @classmethod
+    def validate_many(cls, rows: Iterable[dict]) -> BatchValidation:
+        """Validate many customer dicts at once, reporting errors per row"""
+        return validate_customers(rows)
+
     def add_visit(self, visit_date: datetime = None):
         """Record a customer visit"""
         if visit_date is None:
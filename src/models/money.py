@@ -0,0 +1,110 @@
+"""Exact money amounts stored as integer minor units (pesewas/cents)"""
+
+from decimal import ROUND_HALF_UP, Decimal
+from functools import total_ordering
+from typing import Any, Optional
+
+MINOR_UNITS = 100
+_CENT = Decimal('0.01')
+
+
+@total_ordering
+class Money:
+    """An amount of money held as an integer number of minor units"""
+
+    __slots__ = ('minor',)
+
+    def __init__(self, minor: int = 0):
+        self.minor = int(minor)
+
+    @classmethod
+    def from_decimal(cls, value: Any) -> 'Money':
+        """Build from a major-unit amount (float, str, int or Decimal)"""
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, float):
+            # repr gives the shortest round-trip form, e.g. '0.1'
+            value = repr(value)
+        amount = Decimal(str(value).strip() or '0')
+        amount = amount.quantize(_CENT, rounding=ROUND_HALF_UP)
+        return cls(int(amount * MINOR_UNITS))
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.minor).scaleb(-2)
+
+    def __float__(self) -> float:
+        return self.minor / MINOR_UNITS
+
+    def __add__(self, other):
+        if isinstance(other, Money):
+            return Money(self.minor + other.minor)
+        if other == 0:
+            return self
+        return NotImplemented
+
+    # Lets the builtin sum() start from 0
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Money):
+            return Money(self.minor - other.minor)
+        return NotImplemented
+
+    def __neg__(self):
+        return Money(-self.minor)
+
+    def __mul__(self, factor):
+        if isinstance(factor, int):
+            return Money(self.minor * factor)
+        if isinstance(factor, float):
+            factor = Decimal(repr(factor))
+        if isinstance(factor, Decimal):
+            product = Decimal(self.minor) * factor
+            return Money(int(product.quantize(Decimal(1), ROUND_HALF_UP)))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.minor == other.minor
+        if other == 0:
+            return self.minor == 0
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, Money):
+            return self.minor < other.minor
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.minor)
+
+    def __bool__(self):
+        return self.minor != 0
+
+    def __format__(self, spec: str) -> str:
+        # Supports the f"${amount:.2f}" formatting used by the views
+        return format(self.to_decimal(), spec) if spec else str(self)
+
+    def __str__(self) -> str:
+        return f"{self.to_decimal():.2f}"
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+
+def to_minor(value: Any) -> Optional[int]:
+    """Convert a Money or major-unit amount to integer minor units"""
+    if value is None:
+        return None
+    if isinstance(value, Money):
+        return value.minor
+    return Money.from_decimal(value).minor
+
+
+def from_minor(value: Optional[int]) -> Optional[Money]:
+    """Wrap an integer minor-unit value read from the database"""
+    if value is None:
+        return None
+    return Money(value)
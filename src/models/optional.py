@@ -0,0 +1,17 @@
+"""Optional dependencies, imported on first use"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def numpy():
+    """Return the numpy module, or None if it is not installed
+
+    NumPy takes a noticeable share of startup, and only the batch paths
+    use it, so it is not imported until one of them runs.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
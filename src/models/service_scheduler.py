@@ -0,0 +1,176 @@
+"""Fleet-wide service-due tracking kept in a priority queue"""
+
+import heapq
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Same thresholds Car.needs_service uses for a single car
+SERVICE_INTERVAL_DAYS = 180
+SERVICE_INTERVAL_MILEAGE = 5000
+
+# Heap key for vehicles already past their mileage limit, so they sort
+# ahead of every date
+_OVERDUE_NOW = date.min.toordinal()
+
+
+@dataclass
+class ServiceDue:
+    """When a vehicle next needs a service"""
+    vehicle_id: int
+    due_date: date
+    due_mileage: Optional[int] = None
+    mileage: Optional[int] = None
+
+    @property
+    def overdue_by_mileage(self) -> bool:
+        return (self.due_mileage is not None and self.mileage is not None
+                and self.mileage >= self.due_mileage)
+
+    @property
+    def sort_key(self) -> int:
+        if self.overdue_by_mileage:
+            return _OVERDUE_NOW
+        return self.due_date.toordinal()
+
+
+def _as_date(value: Union[str, date, datetime]) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+class ServiceScheduler:
+    """
+    Priority queue of vehicles ordered by next service due
+
+    Load the whole fleet once (DatabaseManager.get_service_due_rows does
+    the due-date arithmetic in SQL), then keep it current with
+    record_service, or let DatabaseManager.load_service_scheduler do both
+    and update it on every recorded service or odometer reading.
+    Superseded heap entries are skipped lazily and the heap is compacted
+    when they make up half of it.
+    """
+
+    def __init__(self, interval_days: int = SERVICE_INTERVAL_DAYS,
+                 mileage_interval: int = SERVICE_INTERVAL_MILEAGE):
+        self.interval_days = interval_days
+        self.mileage_interval = mileage_interval
+        # (sort key, vehicle_id, version) entries
+        self._heap: List[Tuple[int, int, int]] = []
+        # vehicle_id -> (version, ServiceDue) of the live entry
+        self._entries: Dict[int, Tuple[int, ServiceDue]] = {}
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, rows: Iterable[tuple]) -> None:
+        """
+        Replace the schedule with (vehicle_id, due_date, due_mileage,
+        mileage) rows, heapifying them in one pass
+        """
+        self._heap = []
+        self._entries = {}
+        for vehicle_id, due_date, due_mileage, mileage in rows:
+            self._version += 1
+            due = ServiceDue(vehicle_id, _as_date(due_date), due_mileage,
+                             mileage)
+            self._entries[vehicle_id] = (self._version, due)
+            self._heap.append((due.sort_key, vehicle_id, self._version))
+        heapq.heapify(self._heap)
+
+    def update_row(self, row: tuple) -> ServiceDue:
+        """Replace one vehicle's entry from a get_service_due_rows row"""
+        vehicle_id, due_date, due_mileage, mileage = row
+        due = ServiceDue(vehicle_id, _as_date(due_date), due_mileage,
+                         mileage)
+        self.update(due)
+        return due
+
+    def update(self, due: ServiceDue) -> None:
+        """Replace one vehicle's entry without touching the others"""
+        self._version += 1
+        self._entries[due.vehicle_id] = (self._version, due)
+        heapq.heappush(self._heap,
+                       (due.sort_key, due.vehicle_id, self._version))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def record_service(self, vehicle_id: int,
+                       service_date: Union[str, date, datetime],
+                       mileage: Optional[int] = None) -> ServiceDue:
+        """Reschedule a vehicle from a service done on service_date"""
+        due = ServiceDue(
+            vehicle_id,
+            _as_date(service_date) + timedelta(days=self.interval_days),
+            mileage + self.mileage_interval if mileage is not None else None,
+            mileage,
+        )
+        self.update(due)
+        return due
+
+    def update_mileage(self, vehicle_id: int, mileage: int) -> None:
+        """Record a new odometer reading for a scheduled vehicle"""
+        entry = self._entries.get(vehicle_id)
+        if entry is None:
+            return
+        old = entry[1]
+        self.update(ServiceDue(vehicle_id, old.due_date, old.due_mileage,
+                               mileage))
+
+    def remove(self, vehicle_id: int) -> None:
+        self._entries.pop(vehicle_id, None)
+
+    def get(self, vehicle_id: int) -> Optional[ServiceDue]:
+        entry = self._entries.get(vehicle_id)
+        return entry[1] if entry else None
+
+    def _is_live(self, item: Tuple[int, int, int]) -> bool:
+        entry = self._entries.get(item[1])
+        return entry is not None and entry[0] == item[2]
+
+    def _compact(self) -> None:
+        self._heap = [item for item in self._heap if self._is_live(item)]
+        heapq.heapify(self._heap)
+
+    def due_within(self, days: int,
+                   today: Optional[date] = None) -> List[ServiceDue]:
+        """
+        Vehicles due on or before today + days, soonest first
+
+        Walks only the part of the heap at or under the cut-off, since a
+        node's children are never due earlier than the node itself.
+        """
+        cutoff = ((today or date.today()) + timedelta(days=days)).toordinal()
+        heap = self._heap
+        found = []
+        stack = [0] if heap else []
+        while stack:
+            index = stack.pop()
+            item = heap[index]
+            if item[0] > cutoff:
+                continue
+            if self._is_live(item):
+                found.append(item)
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    stack.append(child)
+        found.sort()
+        return [self._entries[item[1]][1] for item in found]
+
+    def next_n(self, n: int) -> List[ServiceDue]:
+        """The n vehicles due soonest, without popping them"""
+        heap = self._heap
+        result = []
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and len(result) < n:
+            item, index = heapq.heappop(frontier)
+            if self._is_live(item):
+                result.append(self._entries[item[1]][1])
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return result
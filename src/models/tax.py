@@ -0,0 +1,132 @@
+"""Ghana levy and VAT computation for estimates"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .money import Money
+from .optional import numpy
+
+
+# Rates in basis points so minor-unit amounts can be taxed with exact
+# integer arithmetic, rounding half up to the nearest pesewa.
+NHIL_BPS = 250
+GETFUND_BPS = 250
+COVID_LEVY_BPS = 100
+VAT_BPS = 1500
+
+NHIL_RATE = NHIL_BPS / 10000
+GETFUND_RATE = GETFUND_BPS / 10000
+COVID_LEVY_RATE = COVID_LEVY_BPS / 10000
+VAT_RATE = VAT_BPS / 10000
+
+# Current rates by levy; pass a mapping like this (or a partial one) as
+# `rates` to tax at other rates, e.g. to recompute after a rate change
+DEFAULT_RATES_BPS = {
+    'nhil': NHIL_BPS,
+    'getfund': GETFUND_BPS,
+    'covid_levy': COVID_LEVY_BPS,
+    'vat': VAT_BPS,
+}
+
+TAX_FIELDS = ('nhil', 'getfund', 'covid_levy', 'vat', 'total_amount')
+
+
+def tax_rates(rates: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """DEFAULT_RATES_BPS with the given basis point overrides applied"""
+    if not rates:
+        return DEFAULT_RATES_BPS
+    unknown = set(rates) - set(DEFAULT_RATES_BPS)
+    if unknown:
+        raise ValueError(f"Unknown tax rates: {', '.join(sorted(unknown))}")
+    return {**DEFAULT_RATES_BPS, **{
+        name: int(bps) for name, bps in rates.items()
+    }}
+
+
+def _apply_rate(minor: int, bps: int) -> int:
+    """Tax a non-negative minor-unit amount, rounding half up"""
+    return (minor * bps + 5000) // 10000
+
+
+def compute_taxes(subtotal: Any,
+                  rates: Optional[Dict[str, int]] = None) -> Dict[str, Money]:
+    """
+    Compute levies, VAT and total for a single subtotal
+
+    NHIL, GETFund and the COVID levy apply to the subtotal; VAT applies to
+    the subtotal plus those levies. Each amount is rounded to the pesewa
+    before it is added, so totals match what the PDF prints. rates
+    overrides DEFAULT_RATES_BPS.
+    """
+    rates = tax_rates(rates)
+    minor = Money.from_decimal(subtotal).minor
+    nhil = _apply_rate(minor, rates['nhil'])
+    getfund = _apply_rate(minor, rates['getfund'])
+    covid_levy = _apply_rate(minor, rates['covid_levy'])
+    subtotal_with_levies = minor + nhil + getfund + covid_levy
+    vat = _apply_rate(subtotal_with_levies, rates['vat'])
+    return {
+        'nhil': Money(nhil),
+        'getfund': Money(getfund),
+        'covid_levy': Money(covid_levy),
+        'subtotal_with_levies': Money(subtotal_with_levies),
+        'vat': Money(vat),
+        'total_amount': Money(subtotal_with_levies + vat),
+    }
+
+
+def compute_taxes_batch(
+    subtotals: Iterable[int],
+    rates: Optional[Dict[str, int]] = None,
+) -> Dict[str, List[int]]:
+    """
+    Compute taxes for a whole column of minor-unit subtotals at once
+
+    Uses NumPy int64 array arithmetic when it is installed and falls back
+    to plain Python otherwise; both give the same results as compute_taxes.
+    rates overrides DEFAULT_RATES_BPS.
+
+    Returns:
+        Dict[str, List[int]]: Minor-unit amounts per field, aligned with
+            subtotals
+    """
+    rates = tax_rates(rates)
+    np = numpy()
+    if np is not None:
+        subtotal = np.asarray(list(subtotals), dtype=np.int64)
+        nhil = (subtotal * rates['nhil'] + 5000) // 10000
+        getfund = (subtotal * rates['getfund'] + 5000) // 10000
+        covid_levy = (subtotal * rates['covid_levy'] + 5000) // 10000
+        subtotal_with_levies = subtotal + nhil + getfund + covid_levy
+        vat = (subtotal_with_levies * rates['vat'] + 5000) // 10000
+        return {
+            'nhil': nhil.tolist(),
+            'getfund': getfund.tolist(),
+            'covid_levy': covid_levy.tolist(),
+            'subtotal_with_levies': subtotal_with_levies.tolist(),
+            'vat': vat.tolist(),
+            'total_amount': (subtotal_with_levies + vat).tolist(),
+        }
+
+    columns: Dict[str, List[int]] = {
+        'nhil': [], 'getfund': [], 'covid_levy': [],
+        'subtotal_with_levies': [], 'vat': [], 'total_amount': [],
+    }
+    for subtotal in subtotals:
+        for field, value in compute_taxes(Money(subtotal), rates).items():
+            columns[field].append(value.minor)
+    return columns
+
+
+def levies_total(estimate_data: Dict) -> Money:
+    """Subtotal plus the stored NHIL, GETFund and COVID levy amounts"""
+    return sum(
+        Money.from_decimal(estimate_data.get(field) or 0)
+        for field in ('subtotal', 'nhil', 'getfund', 'covid_levy')
+    )
+
+
+def tax_rows(ids: Sequence[int], subtotals: Sequence[int],
+             rates: Optional[Dict[str, int]] = None) -> List[tuple]:
+    """Build (nhil, getfund, covid_levy, vat, total_amount, id) UPDATE rows"""
+    taxes = compute_taxes_batch(subtotals, rates)
+    return list(zip(*(taxes[field] for field in TAX_FIELDS), ids))
@@ -0,0 +1,200 @@
+"""Offline VIN decoding backed by a memory-mapped WMI table"""
+
+import csv
+import mmap
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+DEFAULT_TABLE_PATH = os.path.join(DATA_DIR, 'vin_wmi.bin')
+DEFAULT_SOURCE_PATH = os.path.join(DATA_DIR, 'vin_wmi.csv')
+
+# File layout: header, then fixed-size records sorted by WMI, then a pool of
+# length-prefixed UTF-8 strings the records point into.
+MAGIC = b'VWMI'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHI')        # magic, version, record size, count
+RECORD = struct.Struct('<3sxII')        # wmi, make offset, country offset
+STRING_LENGTH = struct.Struct('<H')
+
+# Position 10 model year codes, repeating every 30 years from 1980
+YEAR_CODES = 'ABCDEFGHJKLMNPRSTVWXY123456789'
+YEAR_CYCLE = len(YEAR_CODES)
+FIRST_MODEL_YEAR = 1980
+
+
+@dataclass
+class VinInfo:
+    """What the VIN prefix says about a vehicle; unknown parts are None"""
+    wmi: str
+    make: Optional[str] = None
+    country: Optional[str] = None
+    model_year: Optional[int] = None
+
+
+def build_wmi_table(source_path: str = DEFAULT_SOURCE_PATH,
+                    table_path: str = DEFAULT_TABLE_PATH) -> int:
+    """
+    Compile the wmi,make,country CSV into the binary lookup table
+
+    Returns:
+        int: Number of WMI records written
+    """
+    with open(source_path, newline='', encoding='utf-8') as source:
+        entries = {
+            row['wmi'].strip().upper(): (row['make'].strip(),
+                                         row['country'].strip())
+            for row in csv.DictReader(source)
+        }
+
+    pool = bytearray()
+    offsets = {}
+
+    def intern(text: str) -> int:
+        if text not in offsets:
+            encoded = text.encode('utf-8')
+            offsets[text] = len(pool)
+            pool.extend(STRING_LENGTH.pack(len(encoded)) + encoded)
+        return offsets[text]
+
+    records = bytearray()
+    for wmi in sorted(entries):
+        if len(wmi) != 3:
+            raise ValueError(f"WMI must be 3 characters: {wmi!r}")
+        make, country = entries[wmi]
+        records.extend(RECORD.pack(
+            wmi.encode('ascii'), intern(make), intern(country)
+        ))
+
+    tmp_path = f"{table_path}.tmp"
+    with open(tmp_path, 'wb') as table:
+        table.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size,
+                                len(entries)))
+        table.write(records)
+        table.write(pool)
+    os.replace(tmp_path, table_path)
+    return len(entries)
+
+
+def decode_model_year(vin: str) -> Optional[int]:
+    """
+    Model year from position 10, or None if absent or not a year code
+
+    The code repeats every 30 years. For North American VINs a letter in
+    position 7 marks the 2010+ cycle; otherwise the latest year that is
+    not after next year is used.
+    """
+    if len(vin) < 10:
+        return None
+    index = YEAR_CODES.find(vin[9])
+    if index < 0:
+        return None
+    earlier = FIRST_MODEL_YEAR + index
+    later = earlier + YEAR_CYCLE
+    if vin[0] in '12345' and vin[6].isalpha():
+        return later
+    if vin[0] in '12345' and vin[6].isdigit():
+        return earlier
+    return later if later <= datetime.now().year + 1 else earlier
+
+
+class VinDecoder:
+    """
+    Look up makes and countries by WMI in a memory-mapped sorted table
+
+    Nothing is read until the first lookup; after that each lookup is a
+    binary search over fixed-size records in the mapped file, so only
+    the touched pages are ever loaded.
+    """
+
+    def __init__(self, table_path: str = DEFAULT_TABLE_PATH):
+        self.table_path = table_path
+        self._map = None
+        self._count = 0
+        self._strings_offset = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        with self._lock:
+            if self._map is not None:
+                return
+            with open(self.table_path, 'rb') as table:
+                mapped = mmap.mmap(table.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, record_size, count = HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or version != FORMAT_VERSION \
+                    or record_size != RECORD.size:
+                mapped.close()
+                raise ValueError(f"Not a VIN WMI table: {self.table_path}")
+            self._count = count
+            self._strings_offset = HEADER.size + count * RECORD.size
+            self._map = mapped
+
+    def _string(self, offset: int) -> str:
+        start = self._strings_offset + offset
+        (length,) = STRING_LENGTH.unpack_from(self._map, start)
+        start += STRING_LENGTH.size
+        return self._map[start:start + length].decode('utf-8')
+
+    def lookup_wmi(self, wmi: str) -> Optional[Tuple[str, str]]:
+        """Return (make, country) for a 3 character WMI, or None"""
+        if len(wmi) != 3 or not wmi.isascii():
+            return None
+        if self._map is None:
+            self._open()
+        key = wmi.upper().encode('ascii')
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            start = HEADER.size + middle * RECORD.size
+            current = self._map[start:start + 3]
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                _, make_offset, country_offset = RECORD.unpack_from(
+                    self._map, start
+                )
+                return self._string(make_offset), self._string(country_offset)
+        return None
+
+    def decode(self, vin: str) -> Optional[VinInfo]:
+        """
+        Decode as much as the (possibly partial) VIN allows
+
+        Three characters give the make and country, ten give the model
+        year. Returns None for fewer than three characters.
+        """
+        vin = vin.replace(" ", "").upper()
+        if len(vin) < 3:
+            return None
+        info = VinInfo(wmi=vin[:3], model_year=decode_model_year(vin))
+        match = self.lookup_wmi(info.wmi)
+        if match is not None:
+            info.make, info.country = match
+        return info
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+
+_default_decoder: Optional[VinDecoder] = None
+
+
+def decode_vin(vin: str) -> Optional[VinInfo]:
+    """Decode with a shared decoder over the bundled WMI table"""
+    global _default_decoder
+    if _default_decoder is None:
+        _default_decoder = VinDecoder()
+    return _default_decoder.decode(vin)
+
+
+if __name__ == '__main__':
+    print(f"Wrote {build_wmi_table()} WMI records to {DEFAULT_TABLE_PATH}")
@@ -1,9 +1,16 @@
 from .config import load_config
-from .error_handler import setup_exception_handling
 from .logger import setup_logger
 
 __all__ = [
     'load_config',
     'setup_exception_handling',
     'setup_logger'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # error_handler imports PyQt6, so load it only when it is asked for
+    if name == 'setup_exception_handling':
+        from .error_handler import setup_exception_handling
+        return setup_exception_handling
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
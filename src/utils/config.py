@@ -1,5 +1,4 @@
 import os
-import yaml
 from typing import Dict, Any
 
 
@@ -21,6 +20,8 @@ def load_config(config_file: str) -> Dict[str, Any]:
     
     try:
         if os.path.exists(config_file):
+            # Deferred so startup only pays for yaml when a config exists
+            import yaml
             with open(config_file, 'r') as f:
                 config = yaml.safe_load(f)
                 return config if config else default_config
@@ -1,9 +1,45 @@
 from fpdf import FPDF
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Any, Iterable, List, Dict, Optional
 import os
+import time
+
+from models.money import Money
+from models.tax import levies_total
+
+class _PDFBuffer:
+    """Append-only stand-in for FPDF's document buffer string
+
+    FPDF 1.7 grows its output with ``self.buffer += ...`` and reads
+    ``len(self.buffer)`` for object offsets, which is quadratic once a
+    report runs to thousands of pages. This keeps the chunks in a list.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._length = 0
+
+    def __iadd__(self, text):
+        self._chunks.append(text)
+        self._length += len(text)
+        return self
+
+    def __len__(self):
+        return self._length
+
+    def __str__(self):
+        return ''.join(self._chunks)
+
+    def encode(self, *args, **kwargs):
+        return str(self).encode(*args, **kwargs)
+
 
 class CarSystemPDF(FPDF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buffer = _PDFBuffer()
+
     def header(self):
         # Logo
         if os.path.exists('assets/logo.png'):
@@ -20,15 +56,20 @@ class CarSystemPDF(FPDF):
         self.cell(-10, 10, datetime.now().strftime('%Y-%m-%d %H:%M'), 0, 0, 'R')
 
 class PDFGenerator:
-    def __init__(self):
+    def __init__(self, output_dir: str = 'reports'):
+        self.output_dir = output_dir
         self.pdf = CarSystemPDF()
         self.pdf.alias_nb_pages()
         self.pdf.add_page()
         self.pdf.set_auto_page_break(auto=True, margin=15)
 
-    def generate_estimate(self, estimate_data: Dict, services: List[Dict]) -> str:
+    def generate_estimate(self, estimate_data: Dict, services: List[Dict],
+                          filename: Optional[str] = None) -> str:
         """Generate PDF for an estimate"""
-        filename = f"reports/estimate_{estimate_data['estimate_id']}.pdf"
+        if filename is None:
+            filename = os.path.join(
+                self.output_dir, f"estimate_{estimate_data['estimate_id']}.pdf"
+            )
         
         # Customer Information
         self.pdf.set_font('Arial', 'B', 12)
@@ -63,7 +104,7 @@ class PDFGenerator:
         
         # Table Content
         self.pdf.set_font('Arial', '', 10)
-        total = 0
+        total = Money(0)
         for service in services:
             self.pdf.cell(90, 6, service['description'], 1)
             self.pdf.cell(30, 6, f"${service['parts_cost']:.2f}", 1)
@@ -87,7 +128,7 @@ class PDFGenerator:
         self.pdf.cell(0, 6, f"NHIL (2.5%): ${estimate_data['nhil']:.2f}", 0, 1)
         self.pdf.cell(0, 6, f"GETFUND (2.5%): ${estimate_data['getfund']:.2f}", 0, 1)
         self.pdf.cell(0, 6, f"COVID Levy (1%): ${estimate_data['covid_levy']:.2f}", 0, 1)
-        self.pdf.cell(0, 6, f"Total with Levies: ${estimate_data['subtotal'] * 1.06:.2f}", 0, 1)
+        self.pdf.cell(0, 6, f"Total with Levies: ${levies_total(estimate_data):.2f}", 0, 1)
         self.pdf.cell(0, 6, f"VAT (15%): ${estimate_data['vat']:.2f}", 0, 1)
         self.pdf.set_font('Arial', 'B', 12)
         self.pdf.cell(0, 8, f"Grand Total: ${estimate_data['total_amount']:.2f}", 0, 1)
@@ -97,7 +138,10 @@ class PDFGenerator:
 
     def generate_inventory_report(self, inventory_items: List[Dict]) -> str:
         """Generate PDF for inventory report"""
-        filename = f"reports/inventory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        filename = os.path.join(
+            self.output_dir,
+            f"inventory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        )
         
         self.pdf.set_font('Arial', 'B', 14)
         self.pdf.cell(0, 10, 'Inventory Report', 0, 1, 'C')
@@ -123,9 +167,115 @@ class PDFGenerator:
         self.pdf.output(filename)
         return filename
 
+    def generate_inventory_report_stream(self, inventory_items: Iterable[Dict]) -> str:
+        """
+        Generate an inventory report from a stream of items
+
+        Items are consumed one at a time (e.g. from
+        DatabaseManager.iter_inventory_items), so no item list is held in
+        memory. Long descriptions wrap, the table header repeats on every
+        page, and the stock value footer is summed in the same pass.
+        """
+        filename = os.path.join(
+            self.output_dir,
+            f"inventory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        )
+        os.makedirs(self.output_dir, exist_ok=True)
+        pdf = CarSystemPDF()
+        pdf.alias_nb_pages()
+        pdf.set_auto_page_break(auto=False, margin=15)
+        pdf.add_page()
+
+        pdf.set_font('Arial', 'B', 14)
+        pdf.cell(0, 10, 'Inventory Report', 0, 1, 'C')
+        pdf.ln(10)
+
+        widths = (35, 75, 25, 25, 30)
+        headers = ('Item Code', 'Description', 'Quantity', 'Unit Price', 'Value')
+        line_height = 6
+
+        def draw_header():
+            pdf.set_font('Arial', 'B', 10)
+            for width, header in zip(widths, headers):
+                pdf.cell(width, 7, header, 1)
+            pdf.ln()
+            pdf.set_font('Arial', '', 10)
+
+        draw_header()
+        item_count = 0
+        total_quantity = 0
+        total_value = Money(0)
+        for item in inventory_items:
+            quantity = item['quantity'] or 0
+            unit_price = item['unit_price'] or Money(0)
+            value = quantity * unit_price
+            item_count += 1
+            total_quantity += quantity
+            total_value += value
+
+            lines = self._wrap_text(pdf, str(item['description']), widths[1] - 2)
+            row_height = line_height * len(lines)
+            if pdf.get_y() + row_height > pdf.page_break_trigger:
+                pdf.add_page()
+                draw_header()
+
+            x, y = pdf.get_x(), pdf.get_y()
+            pdf.cell(widths[0], row_height, str(item['item_code']), 1)
+            pdf.multi_cell(widths[1], line_height, "\n".join(lines), 1)
+            pdf.set_xy(x + widths[0] + widths[1], y)
+            pdf.cell(widths[2], row_height, str(quantity), 1, 0, 'R')
+            pdf.cell(widths[3], row_height, f"${unit_price:.2f}", 1, 0, 'R')
+            pdf.cell(widths[4], row_height, f"${value:.2f}", 1, 0, 'R')
+            pdf.ln(row_height)
+
+        # Summary footer
+        if pdf.get_y() + 3 * line_height > pdf.page_break_trigger:
+            pdf.add_page()
+        pdf.ln(4)
+        pdf.set_font('Arial', 'B', 10)
+        pdf.cell(0, line_height, f"Items: {item_count}", 0, 1)
+        pdf.cell(0, line_height, f"Total Units: {total_quantity}", 0, 1)
+        pdf.cell(0, line_height, f"Total Stock Value: ${total_value:.2f}", 0, 1)
+
+        pdf.output(filename)
+        return filename
+
+    @staticmethod
+    def _wrap_text(pdf: FPDF, text: str, width: float) -> List[str]:
+        """Greedy word wrap of text to the given width in the current font"""
+        if pdf.get_string_width(text) <= width:
+            return [text]
+        space_width = pdf.get_string_width(' ')
+        lines = []
+        current = ''
+        current_width = 0.0
+        for word in text.split():
+            word_width = pdf.get_string_width(word)
+            if current and current_width + space_width + word_width <= width:
+                current = f"{current} {word}"
+                current_width += space_width + word_width
+                continue
+            if current:
+                lines.append(current)
+            # Hard-split single words wider than the column
+            while word_width > width and len(word) > 1:
+                cut = len(word)
+                while cut > 1 and pdf.get_string_width(word[:cut]) > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+                word_width = pdf.get_string_width(word)
+            current = word
+            current_width = word_width
+        lines.append(current)
+        return lines
+
     def generate_service_history(self, customer_data: Dict, service_history: List[Dict]) -> str:
         """Generate PDF for service history"""
-        filename = f"reports/service_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        filename = os.path.join(
+            self.output_dir,
+            f"service_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        )
         
         # Customer Information
         self.pdf.set_font('Arial', 'B', 12)
@@ -156,7 +306,9 @@ class PDFGenerator:
 
     def generate_jobcard(self, jobcard_data: Dict) -> str:
         """Generate PDF for a jobcard"""
-        filename = f"reports/jobcard_{jobcard_data['jobcard_id']}.pdf"
+        filename = os.path.join(
+            self.output_dir, f"jobcard_{jobcard_data['jobcard_id']}.pdf"
+        )
         
         self.pdf.add_page()
         self.pdf.set_font('Arial', 'B', 16)
@@ -169,4 +321,71 @@ class PDFGenerator:
         self.pdf.cell(0, 10, f"Status: {jobcard_data['status']}", 0, 1)
         
         self.pdf.output(filename)
-        return filename
\ No newline at end of file
+        return filename
+
+    def generate_estimates_batch(
+        self,
+        db_manager,
+        estimate_ids: Optional[Iterable[int]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Render many estimates in parallel, one PDF document per estimate
+
+        Rows are streamed from db_manager and handed to a process pool with
+        a bounded number of jobs in flight. Each file is written under a
+        temporary name and renamed into place once complete.
+
+        Returns:
+            List[Dict]: Manifest entries with estimate_id, path, seconds and
+                error (None on success)
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        rows = db_manager.iter_estimates_with_services(
+            estimate_ids, date_from, date_to
+        )
+        manifest = []
+        max_workers = max_workers or os.cpu_count() or 1
+        max_in_flight = max_workers * 4
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = set()
+            for estimate_data, services in rows:
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(
+                        in_flight, return_when=FIRST_COMPLETED
+                    )
+                    manifest.extend(future.result() for future in done)
+                in_flight.add(executor.submit(
+                    _render_estimate_file,
+                    estimate_data, services, self.output_dir
+                ))
+            manifest.extend(future.result() for future in wait(in_flight).done)
+        manifest.sort(key=lambda entry: entry['estimate_id'])
+        return manifest
+
+
+def _render_estimate_file(estimate_data: Dict, services: List[Dict],
+                          output_dir: str) -> Dict[str, Any]:
+    """Process pool worker: render one estimate into its own document"""
+    start = time.perf_counter()
+    estimate_id = estimate_data['estimate_id']
+    path = os.path.join(output_dir, f"estimate_{estimate_id}.pdf")
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        PDFGenerator(output_dir).generate_estimate(
+            estimate_data, services, temp_path
+        )
+        os.replace(temp_path, path)
+        error = None
+    except Exception as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        error = str(e)
+    return {
+        'estimate_id': estimate_id,
+        'path': path if error is None else None,
+        'seconds': time.perf_counter() - start,
+        'error': error,
+    }
@@ -0,0 +1,40 @@
+"""Phase timing for the --startup-profile switch"""
+
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+
+class StartupProfiler:
+    """Records how long each named startup phase takes"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def mark(self, name: str) -> None:
+        """Record the time since the previous phase ended as name"""
+        accounted = sum(seconds for _, seconds in self.phases)
+        elapsed = time.perf_counter() - self.started
+        self.phases.append((name, max(elapsed - accounted, 0.0)))
+
+    def report(self) -> str:
+        """Table of phases with milliseconds and share of the total"""
+        total = time.perf_counter() - self.started
+        width = max([len(name) for name, _ in self.phases] + [5])
+        lines = [f"{'Phase':<{width}}  {'ms':>9}  {'share':>6}"]
+        for name, seconds in self.phases:
+            share = seconds / total * 100 if total else 0.0
+            lines.append(
+                f"{name:<{width}}  {seconds * 1000:>9.1f}  {share:>5.1f}%"
+            )
+        lines.append(f"{'Total':<{width}}  {total * 1000:>9.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,44 @@
+"""Shared fixtures; src is put on sys.path by pytest's pythonpath option"""
+
+import os
+
+import pytest
+
+from database.db_manager import DatabaseManager
+from models.money import Money
+from models.tax import compute_taxes
+
+# GUI tests run without a display
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+def make_estimate(number: int = 0, date: str = '2024-01-15',
+                  subtotal: int = 100000, **fields) -> dict:
+    """Estimate in create_estimate format for customer `number`"""
+    taxes = compute_taxes(Money(subtotal))
+    estimate = {
+        'customer_name': f"Customer {number}",
+        'customer_phone': f"0200{number:06d}",
+        'customer_email': f"customer{number}@example.com",
+        'vehicle_make': 'Toyota',
+        'vehicle_model': 'Corolla',
+        'vehicle_year': 2015,
+        'vehicle_vin': f"VIN{number:014d}",
+        'subtotal': Money(subtotal),
+        'nhil': taxes['nhil'],
+        'getfund': taxes['getfund'],
+        'covid_levy': taxes['covid_levy'],
+        'vat': taxes['vat'],
+        'total_amount': taxes['total_amount'],
+        'date': date,
+        'status': 'Pending',
+    }
+    estimate.update(fields)
+    return estimate
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'test.db'))
+    yield manager
+    manager.close()
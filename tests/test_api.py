@@ -0,0 +1,122 @@
+import socket
+
+import pytest
+
+from api.client import RemoteDatabaseManager, RemoteError
+from api.server import ApiServer
+
+from conftest import make_estimate
+
+TOKEN = 'test-token'
+
+
+@pytest.fixture
+def server(db):
+    server = ApiServer(db, port=0, token=TOKEN)
+    server.start_in_thread()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def remote(server):
+    client = RemoteDatabaseManager(f"http://127.0.0.1:{server.port}",
+                                   timeout=10, token=TOKEN)
+    yield client
+    client.close()
+
+
+def _raw(server, request: bytes) -> bytes:
+    with socket.create_connection(('127.0.0.1', server.port), 5) as sock:
+        sock.sendall(request)
+        return sock.recv(4096).split(b'\r\n', 1)[0]
+
+
+def test_estimates_round_trip(db, remote):
+    estimate_id = remote.create_estimate(make_estimate(1, subtotal=123456))
+    service_id = remote.add_service({
+        'estimate_id': estimate_id, 'description': 'Timing belt',
+        'parts_cost': '900.10', 'labor_cost': '334.46',
+        'total_cost': '1234.56',
+    })
+
+    estimate = remote.get_estimate(estimate_id)
+    assert estimate == db.get_estimate(estimate_id)
+    assert estimate['total_amount'] == make_estimate(
+        1, subtotal=123456)['total_amount']
+    services = remote.get_services_for_estimate(estimate_id)
+    assert [service['service_id'] for service in services] == [service_id]
+    assert services[0]['total_cost'].minor == 123456
+
+    assert remote.update_estimate_status(estimate_id, 'Approved')
+    assert db.get_estimate(estimate_id)['status'] == 'Approved'
+
+
+def test_paged_streams_match_local_results(db, remote):
+    db.bulk_create_estimates(
+        make_estimate(number, date=f"2024-02-{number % 28 + 1:02d}")
+        for number in range(25)
+    )
+    for number in range(7):
+        db.update_inventory({'item_code': f"ITEM-{number}",
+                             'description': 'Part', 'quantity': number,
+                             'unit_price': '1.50'})
+
+    local = [(estimate['id'], len(services)) for estimate, services in
+             db.iter_estimates_with_services()]
+    paged = [(estimate['id'], len(services)) for estimate, services in
+             remote.iter_estimates_with_services(chunk_size=4)]
+    assert paged == local
+    assert [item['item_code'] for item in
+            remote.iter_inventory_items(chunk_size=3)] == \
+        [item['item_code'] for item in db.iter_inventory_items()]
+    assert [change['seq'] for change in
+            remote.iter_change_deltas(0, chunk_size=5)] == \
+        [change['seq'] for change in db.iter_change_deltas(0)]
+    assert remote.latest_change_seq() == db.latest_change_seq()
+
+
+def test_server_errors_reach_the_client(remote):
+    with pytest.raises(RemoteError) as error:
+        remote.request('GET', '/no-such-route')
+    assert error.value.status == 404
+    assert remote.get_estimate(999) is None
+
+
+def test_requests_need_the_token(server):
+    client = RemoteDatabaseManager(f"127.0.0.1:{server.port}")
+    try:
+        with pytest.raises(RemoteError) as error:
+            client.request('GET', '/health')
+        assert error.value.status == 401
+    finally:
+        client.close()
+
+
+def test_public_bind_requires_a_token(db):
+    with pytest.raises(ValueError):
+        ApiServer(db, host='0.0.0.0', port=0).start_in_thread()
+
+
+def test_malformed_content_length_is_rejected(server):
+    auth = f"Authorization: Bearer {TOKEN}\r\n".encode()
+    assert _raw(server, b"POST /estimates HTTP/1.1\r\n" + auth +
+                b"Content-Length: ten\r\n\r\n") == b"HTTP/1.1 400 Bad Request"
+    assert _raw(server, b"POST /estimates HTTP/1.1\r\n" + auth +
+                b"Content-Length: 99999999999\r\n\r\n") == \
+        b"HTTP/1.1 413 Payload Too Large"
+
+
+def test_timed_out_writes_are_not_resent(db, server):
+    client = RemoteDatabaseManager(f"127.0.0.1:{server.port}",
+                                   timeout=0.05, token=TOKEN)
+    try:
+        with pytest.raises(OSError):
+            client.bulk_create_estimates(
+                (make_estimate(number) for number in range(3000)),
+                batch_size=3000,
+            )
+    finally:
+        client.close()
+    server.stop()  # waits for the queued write to finish
+    assert len(db.get_all_estimates()) == 3000
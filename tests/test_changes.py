@@ -0,0 +1,109 @@
+from database.db_manager import DatabaseManager
+
+from conftest import make_estimate
+
+
+def _entries(changes):
+    return [(change['table'], change['row_id'], change['op'])
+            for change in changes]
+
+
+def test_writes_are_logged_in_order(db):
+    first = db.create_estimate(make_estimate(1))
+    second = db.create_estimate(make_estimate(2))
+    service = db.add_service({
+        'estimate_id': first, 'description': 'Brake pads',
+        'parts_cost': '80.00', 'labor_cost': '20.00', 'total_cost': '100.00',
+    })
+    db.update_estimate_status(second, 'Approved')
+    db.update_inventory({'item_code': 'PAD-01', 'description': 'Brake pad',
+                         'quantity': 4, 'unit_price': '20.00'})
+
+    changes = db.changes_since(0)
+    # Linking estimates to customers and vehicles is not a logged update
+    assert _entries(changes) == [
+        ('estimates', first, 'insert'),
+        ('estimates', second, 'insert'),
+        ('services', service, 'insert'),
+        ('estimates', second, 'update'),
+        ('inventory', 1, 'insert'),
+    ]
+    seqs = [change['seq'] for change in changes]
+    assert seqs == sorted(seqs)
+    assert db.latest_change_seq() == seqs[-1]
+    assert _entries(db.changes_since(seqs[1], limit=2)) == [
+        ('services', service, 'insert'),
+        ('estimates', second, 'update'),
+    ]
+
+
+def test_deltas_carry_each_rows_latest_state_once(db):
+    estimate_id = db.create_estimate(make_estimate(1))
+    since = db.latest_change_seq()
+    db.update_estimate_status(estimate_id, 'Approved')
+    db.update_estimate_status(estimate_id, 'Completed')
+    other = db.create_estimate(make_estimate(2))
+    with db.get_connection() as cursor:
+        cursor.execute("DELETE FROM estimates WHERE id = ?", (other,))
+
+    deltas = list(db.iter_change_deltas(since, chunk_size=1))
+    assert [(delta['row_id'], delta['op']) for delta in deltas] == [
+        (estimate_id, 'update'), (other, 'delete'),
+    ]
+    assert deltas[0]['row']['status'] == 'Completed'
+    assert deltas[0]['row']['total_amount'] == \
+        make_estimate(1)['total_amount']
+    assert deltas[1]['row'] is None
+    assert deltas[-1]['seq'] == db.latest_change_seq()
+    assert list(db.iter_change_deltas(db.latest_change_seq())) == []
+
+
+def test_prune_keeps_sequence_numbers_increasing(db):
+    db.create_estimate(make_estimate(1))
+    last = db.latest_change_seq()
+    assert db.prune_change_log(last) == 1
+    assert db.changes_since(0) == []
+    assert db.latest_change_seq() == last
+    db.create_estimate(make_estimate(2))
+    assert db.changes_since(0)[0]['seq'] == last + 1
+
+
+def test_own_changes_are_told_apart_from_other_instances(db):
+    other = DatabaseManager(db.db_path)
+    try:
+        db.create_estimate(make_estimate(1))
+        other.create_estimate(make_estimate(2))
+        db.update_estimate_status(1, 'Approved')
+    finally:
+        other.close()
+
+    own = [db.is_own_change(change['seq']) for change in db.changes_since(0)]
+    assert own == [True, False, True]
+
+
+def test_columns_added_by_later_migrations_are_logged(tmp_path, monkeypatch):
+    from database import migrations
+
+    path = str(tmp_path / 'later.db')
+    DatabaseManager(path).close()
+
+    def add_notes(conn):
+        conn.execute("ALTER TABLE estimates ADD COLUMN notes TEXT")
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS',
+                        migrations.MIGRATIONS + [(99, add_notes)])
+    db = DatabaseManager(path)
+    try:
+        estimate_id = db.create_estimate(make_estimate(1))
+        since = db.latest_change_seq()
+        with db.get_connection() as cursor:
+            cursor.execute("UPDATE estimates SET notes = 'Waiting on parts' "
+                           "WHERE id = ?", (estimate_id,))
+            # Linking columns stay out of the log
+            cursor.execute("UPDATE estimates SET vehicle_id = vehicle_id "
+                           "WHERE id = ?", (estimate_id,))
+        assert _entries(db.changes_since(since)) == [
+            ('estimates', estimate_id, 'update'),
+        ]
+    finally:
+        db.close()
@@ -0,0 +1,122 @@
+import pytest
+
+from gui.models import EstimatesTableModel
+from gui.workers import QueryExecutor
+
+from conftest import make_estimate
+
+
+@pytest.fixture
+def model(qtbot, db):
+    # 12 estimates on distinct days, newest id on the newest day
+    db.bulk_create_estimates(
+        make_estimate(number, date=f"2024-03-{number + 1:02d}")
+        for number in range(12)
+    )
+    model = EstimatesTableModel(db)
+    model.PAGE_SIZE = 5
+    model.fetchMore()
+    return model
+
+
+def _ids(model):
+    return [int(model.data(model.index(row, 0)))
+            for row in range(model.rowCount())]
+
+
+def _ordered(model, db):
+    expected = sorted(((row[4], row[0]) for row in db.get_all_estimates()),
+                      reverse=True)
+    return [estimate_id for _, estimate_id in expected[:model.rowCount()]]
+
+
+def test_pages_load_newest_first(model, db, qtmodeltester):
+    assert _ids(model) == [12, 11, 10, 9, 8]
+    while model.canFetchMore():
+        model.fetchMore()
+    assert _ids(model) == list(range(12, 0, -1))
+    qtmodeltester.check(model)
+
+
+def test_upsert_updates_in_place(model, qtbot):
+    row = list(model._rows[1])
+    row[6] = 'Approved'
+    with qtbot.assertNotEmitted(model.modelReset), \
+            qtbot.waitSignal(model.dataChanged):
+        model.upsert_row(row)
+    assert model.data(model.index(1, 5)) == 'Approved'
+    assert _ids(model) == [12, 11, 10, 9, 8]
+
+
+def test_upsert_moves_and_inserts_in_order(model, db):
+    row = list(model._rows[0])
+    row[4] = '2024-03-09T12'
+    model.upsert_row(row)
+    new_row = db.create_estimate(make_estimate(50, date='2024-03-10'),
+                                 return_row=True)
+    model.upsert_row(new_row)
+    db.conn.execute("UPDATE estimates SET date = ? WHERE id = 12", (row[4],))
+    db.conn.commit()
+    assert _ids(model) == _ordered(model, db)
+    assert model._find_row(new_row[0]) == _ids(model).index(new_row[0])
+
+
+def test_remove_row(model):
+    model.remove_row(10)
+    model.remove_row(999)
+    assert _ids(model) == [12, 11, 9, 8]
+    assert model._find_row(9) == 2
+
+
+@pytest.fixture
+def executor(qtbot):
+    executor = QueryExecutor()
+    yield executor
+    executor.wait_for_done(5000)
+
+
+def test_pages_load_in_the_background(qtbot, db, executor):
+    db.bulk_create_estimates(make_estimate(number) for number in range(8))
+    model = EstimatesTableModel(db, executor=executor)
+    model.PAGE_SIZE = 5
+
+    with qtbot.waitSignal(model.rowsInserted):
+        model.fetchMore()
+        # Nothing is loaded on the GUI thread, and no second request is
+        # made while the first one runs
+        assert model.rowCount() == 0
+        assert not model.canFetchMore()
+    assert model.rowCount() == 5
+
+    with qtbot.waitSignal(model.rowsInserted):
+        model.fetchMore()
+    assert _ids(model) == list(range(8, 0, -1))
+    assert not model.canFetchMore()
+
+
+def test_refresh_discards_a_page_still_loading(qtbot, db, executor):
+    db.bulk_create_estimates(make_estimate(number) for number in range(3))
+    model = EstimatesTableModel(db, executor=executor)
+    model.fetchMore()
+    model.set_rows([])
+    executor.wait_for_done(5000)
+    qtbot.wait(50)
+    assert model.rowCount() == 0
+
+    with qtbot.waitSignal(model.rowsInserted):
+        model.refresh()
+    assert _ids(model) == [3, 2, 1]
+
+
+def test_row_moved_past_the_window_is_loaded_once(model, db):
+    row = list(model._rows[0])
+    row[4] = '2024-01-01'
+    db.conn.execute("UPDATE estimates SET date = ? WHERE id = ?",
+                    (row[4], row[0]))
+    db.conn.commit()
+    model.upsert_row(row)
+    assert _ids(model) == [11, 10, 9, 8]
+
+    while model.canFetchMore():
+        model.fetchMore()
+    assert _ids(model) == list(range(11, 0, -1)) + [12]
@@ -0,0 +1,147 @@
+import sqlite3
+
+from database.db_manager import DatabaseManager
+from database.migrations import SCHEMA_VERSION, get_schema_version
+
+# Schema the application shipped with before versioned migrations
+BASELINE_SCHEMA = '''
+CREATE TABLE estimates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_name TEXT NOT NULL,
+    customer_phone TEXT,
+    customer_email TEXT,
+    vehicle_make TEXT NOT NULL,
+    vehicle_model TEXT NOT NULL,
+    vehicle_year INTEGER,
+    vehicle_vin TEXT,
+    subtotal REAL NOT NULL,
+    nhil REAL,
+    getfund REAL,
+    covid_levy REAL,
+    vat REAL,
+    total_amount REAL NOT NULL,
+    date TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'Pending',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE services (
+    service_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    estimate_id INTEGER,
+    description TEXT NOT NULL,
+    parts_cost REAL,
+    labor_cost REAL,
+    total_cost REAL,
+    FOREIGN KEY (estimate_id) REFERENCES estimates (estimate_id)
+);
+CREATE TABLE inventory (
+    item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_code TEXT UNIQUE NOT NULL,
+    description TEXT NOT NULL,
+    quantity INTEGER DEFAULT 0,
+    unit_price REAL,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE job_cards (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    estimate_id INTEGER,
+    description TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    status TEXT,
+    FOREIGN KEY (estimate_id) REFERENCES estimates(id)
+);
+'''
+
+
+def _baseline_database(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute('''
+        INSERT INTO estimates (
+            customer_name, customer_phone, customer_email, vehicle_make,
+            vehicle_model, vehicle_year, vehicle_vin, subtotal, nhil,
+            getfund, covid_levy, vat, total_amount, date, status
+        ) VALUES ('Ama Mensah', '0244000001', 'ama@example.com', 'Toyota',
+                  'Corolla', 2012, 'VIN1', 100.1, 2.5, 2.5, 1.0, 15.92,
+                  122.02, '2024-03-01', 'Approved')
+    ''')
+    conn.execute('''
+        INSERT INTO services (estimate_id, description, parts_cost,
+                              labor_cost, total_cost)
+        VALUES (1, 'Oil change', 60.55, 39.55, 100.1)
+    ''')
+    conn.execute('''
+        INSERT INTO inventory (item_code, description, quantity, unit_price)
+        VALUES ('OIL-5W30', 'Engine oil', 12, 45.3)
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def test_baseline_schema_migrates_to_latest(tmp_path):
+    path = str(tmp_path / 'baseline.db')
+    _baseline_database(path)
+
+    db = DatabaseManager(path)
+    try:
+        assert get_schema_version(db.conn) == SCHEMA_VERSION
+
+        estimate = db.get_estimate(1)
+        assert estimate['customer_name'] == 'Ama Mensah'
+        assert estimate['subtotal'].minor == 10010
+        assert estimate['total_amount'].minor == 12202
+        services = db.get_services_for_estimate(1)
+        assert [service['total_cost'].minor for service in services] == [10010]
+        assert db.get_inventory_items()[0]['unit_price'].minor == 4530
+
+        # v6 linked the existing estimate to a customer and vehicle
+        customer = db.find_customer(phone='0244000001')
+        assert customer is not None
+        vehicles = db.get_customer_vehicles(customer['id'])
+        assert [vehicle['vin'] for vehicle in vehicles] == ['VIN1']
+        assert [row[0] for row in
+                db.get_estimates_for_customer(customer['id'])] == [1]
+
+        # v8: writes after migrating are logged, the migration itself not
+        assert db.latest_change_seq() == 0
+        db.update_estimate_status(1, 'Completed')
+        assert [(change['table'], change['row_id'], change['op'])
+                for change in db.changes_since(0)] == [
+            ('estimates', 1, 'update')
+        ]
+    finally:
+        db.close()
+
+
+def test_legacy_estimate_id_column_is_renamed(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        BASELINE_SCHEMA.replace('id INTEGER PRIMARY KEY AUTOINCREMENT,\n'
+                                '    customer_name',
+                                'estimate_id INTEGER PRIMARY KEY '
+                                'AUTOINCREMENT,\n    customer_name', 1)
+    )
+    conn.close()
+
+    db = DatabaseManager(path)
+    try:
+        columns = [row[1] for row in
+                   db.conn.execute("PRAGMA table_info(estimates)")]
+        assert 'id' in columns and 'estimate_id' not in columns
+        assert get_schema_version(db.conn) == SCHEMA_VERSION
+    finally:
+        db.close()
+
+
+def test_migrations_are_idempotent(tmp_path):
+    path = str(tmp_path / 'twice.db')
+    _baseline_database(path)
+    DatabaseManager(path).close()
+
+    db = DatabaseManager(path)
+    try:
+        assert get_schema_version(db.conn) == SCHEMA_VERSION
+        assert len(db.get_all_estimates()) == 1
+    finally:
+        db.close()
@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+from conftest import make_estimate
+
+
+@pytest.fixture(params=['local', 'remote'])
+def manager(request, db):
+    if request.param == 'local':
+        yield db
+        return
+    from api.client import RemoteDatabaseManager
+    from api.server import ApiServer
+
+    server = ApiServer(db, port=0)
+    server.start_in_thread()
+    client = RemoteDatabaseManager(f"127.0.0.1:{server.port}", timeout=10)
+    yield client
+    client.close()
+    server.stop()
+
+
+def _vehicle_of(manager, estimate_id):
+    return manager.get_estimate(estimate_id)['vehicle_id']
+
+
+def test_new_vehicles_join_a_loaded_scheduler(manager):
+    first = manager.create_estimate(make_estimate(1, date='2024-05-01'))
+    scheduler = manager.load_service_scheduler()
+    assert len(scheduler) == 1
+
+    second = manager.create_estimate(make_estimate(2, date='2024-04-01'))
+    vehicle = _vehicle_of(manager, second)
+    assert scheduler.get(vehicle).due_date == date(2024, 4, 1)
+
+    manager.bulk_create_estimates([make_estimate(3, date='2024-03-01'),
+                                   make_estimate(4, date='2024-02-01')])
+    assert len(scheduler) == 4
+    assert [due.vehicle_id for due in scheduler.next_n(2)] == [
+        _vehicle_of(manager, first + 3), _vehicle_of(manager, first + 2),
+    ]
+
+
+def test_earlier_visit_moves_an_unserviced_vehicle_forward(manager):
+    estimate_id = manager.create_estimate(make_estimate(1, date='2024-05-01'))
+    vehicle = _vehicle_of(manager, estimate_id)
+    scheduler = manager.load_service_scheduler()
+
+    manager.create_estimate(make_estimate(1, date='2024-01-10'))
+    assert scheduler.get(vehicle).due_date == date(2024, 1, 10)
+
+    manager.record_service(vehicle, '2024-06-01', 50000)
+    due = scheduler.get(vehicle)
+    assert due.due_date > date(2024, 6, 1)
+    assert due.mileage == 50000
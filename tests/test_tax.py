@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from models import tax
+from models.money import Money
+from models.tax import compute_taxes, compute_taxes_batch, tax_rows
+
+_rng = random.Random(7)
+SUBTOTALS = [0, 1, 19, 20, 199, 200, 10000, 12345, 99999999, 2 ** 40] + [
+    _rng.randrange(1, 10 ** 9) for _ in range(500)
+]
+
+
+def _single(subtotals, rates=None):
+    columns = {}
+    for subtotal in subtotals:
+        for field, value in compute_taxes(Money(subtotal), rates).items():
+            columns.setdefault(field, []).append(value.minor)
+    return columns
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def batch_path(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(tax, 'numpy', lambda: None)
+    return request.param
+
+
+@pytest.mark.parametrize('rates', [None, {'vat': 1250}, {
+    'nhil': 0, 'getfund': 333, 'covid_levy': 1, 'vat': 2000,
+}])
+def test_batch_matches_single(batch_path, rates):
+    assert compute_taxes_batch(SUBTOTALS, rates) == _single(SUBTOTALS, rates)
+
+
+def test_known_amounts():
+    taxes = compute_taxes('100.00')
+    assert taxes['nhil'] == Money(250)
+    assert taxes['covid_levy'] == Money(100)
+    assert taxes['subtotal_with_levies'] == Money(10600)
+    assert taxes['vat'] == Money(1590)
+    assert taxes['total_amount'] == Money(12190)
+    # Half a pesewa rounds up
+    assert compute_taxes(Money(20))['nhil'] == Money(1)
+    assert compute_taxes(Money(19))['nhil'] == Money(0)
+
+
+def test_tax_rows_order(batch_path):
+    rows = tax_rows([7, 8], [10000, 20000])
+    assert rows[0] == (250, 250, 100, 1590, 12190, 7)
+    assert rows[1][-1] == 8
+
+
+def test_unknown_rate_is_rejected(batch_path):
+    with pytest.raises(ValueError):
+        compute_taxes_batch([100], {'sales': 100})
+    with pytest.raises(ValueError):
+        compute_taxes(Money(100), {'sales': 100})
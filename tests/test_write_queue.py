@@ -0,0 +1,181 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database.write_queue import WriteCoordinator
+
+
+class Interrupted(BaseException):
+    """Stands in for KeyboardInterrupt inside a leader"""
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'queue.db'),
+                           check_same_thread=False, isolation_level=None)
+    conn.execute("CREATE TABLE items (value INTEGER UNIQUE)")
+    yield conn
+    conn.close()
+
+
+def _insert(value):
+    def write(cursor):
+        cursor.execute("INSERT INTO items (value) VALUES (?)", (value,))
+        return value
+    return write
+
+
+def _values(conn):
+    return sorted(row[0] for row in conn.execute("SELECT value FROM items"))
+
+
+def _submit_in_thread(writes, func, results):
+    def run():
+        try:
+            results.append(writes.submit(func))
+        except BaseException as e:
+            results.append(e)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _wait_until(condition):
+    for _ in range(500):
+        if condition():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("timed out waiting for the write queue")
+
+
+def test_writes_queued_behind_a_leader_commit_together(conn):
+    writes = WriteCoordinator(lambda: conn)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(cursor):
+        started.set()
+        release.wait(5)
+        return _insert(0)(cursor)
+
+    results = []
+    leader = _submit_in_thread(writes, blocking, results)
+    started.wait(5)
+    followers = [_submit_in_thread(writes, _insert(value), results)
+                 for value in range(1, 6)]
+    _wait_until(lambda: writes.queue_depth() == 5)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert sorted(results) == list(range(6))
+    assert _values(conn) == list(range(6))
+    stats = writes.stats()
+    assert stats['writes'] == 6
+    assert stats['batches'] == 2
+    assert stats['largest_batch'] == 5
+    assert stats['errors'] == 0
+
+
+def test_failing_write_only_rolls_back_itself(conn):
+    writes = WriteCoordinator(lambda: conn)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(cursor):
+        started.set()
+        release.wait(5)
+        return _insert(1)(cursor)
+
+    results = []
+    leader = _submit_in_thread(writes, blocking, results)
+    started.wait(5)
+    threads = [_submit_in_thread(writes, _insert(value), results)
+               for value in (2, 2, 3)]
+    _wait_until(lambda: writes.queue_depth() == 3)
+    release.set()
+    for thread in [leader, *threads]:
+        thread.join(5)
+
+    errors = [result for result in results
+              if isinstance(result, sqlite3.IntegrityError)]
+    assert len(errors) == 1
+    assert _values(conn) == [1, 2, 3]
+    assert writes.stats()['errors'] == 1
+
+
+def test_interrupted_leader_hands_over_to_queued_writes(conn):
+    started, release = threading.Event(), threading.Event()
+    markers = []
+
+    def marker(connection):
+        markers.append(None)
+        # The end marker of the first batch: interrupt its leader
+        if len(markers) == 2:
+            raise Interrupted()
+
+    writes = WriteCoordinator(lambda: conn, marker=marker)
+
+    def blocking(cursor):
+        started.set()
+        release.wait(5)
+        return _insert(1)(cursor)
+
+    results = []
+    leader = _submit_in_thread(writes, blocking, results)
+    started.wait(5)
+    followers = [_submit_in_thread(writes, _insert(value), results)
+                 for value in (2, 3)]
+    _wait_until(lambda: writes.queue_depth() == 2)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+        assert not thread.is_alive()
+
+    assert [r for r in results if isinstance(r, Interrupted)]
+    assert sorted(r for r in results if isinstance(r, int)) == [2, 3]
+    # The interrupted batch was rolled back and the queue still works
+    assert not conn.in_transaction
+    assert writes.submit(_insert(4)) == 4
+    assert _values(conn) == [2, 3, 4]
+    assert not writes._leader_active
+
+
+def test_lock_errors_are_retried(tmp_path, conn):
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    conn.execute("PRAGMA busy_timeout = 0")
+    blocker = sqlite3.connect(path, isolation_level=None,
+                              check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+    timer = threading.Timer(0.1, blocker.rollback)
+    timer.start()
+    try:
+        writes = WriteCoordinator(lambda: conn, backoff_base=0.01,
+                                  backoff_max=0.05, max_retries=50)
+        assert writes.submit(_insert(7)) == 7
+    finally:
+        timer.join()
+        blocker.close()
+    assert _values(conn) == [7]
+    assert writes.stats()['retries'] > 0
+    assert writes.stats()['lock_failures'] == 0
+
+
+def test_on_commit_errors_do_not_fail_committed_writes(conn, caplog):
+    committed = []
+
+    def on_commit(start, end):
+        committed.append((start, end))
+        raise RuntimeError("hook broke")
+
+    writes = WriteCoordinator(
+        lambda: conn,
+        marker=lambda connection: connection.execute(
+            "SELECT COUNT(*) FROM items").fetchone()[0],
+        on_commit=on_commit,
+    )
+    assert writes.submit(_insert(1)) == 1
+    assert writes.submit(_insert(2)) == 2
+    assert committed == [(0, 1), (1, 2)]
+    assert _values(conn) == [1, 2]
+    assert writes.stats()['errors'] == 0
+    assert "hook broke" in caplog.text